@@ -1,189 +1,445 @@
-# run.py
-
-import subprocess
-from datetime import datetime
-from pathlib import Path
-import zipfile
-import time
-import os
-import smtplib
-import logging
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from dotenv import load_dotenv
-from typing import Tuple, List, Optional
-
-# --- CONFIGURATION ---
-
-PYTHON_EXECUTABLE = "python"
-SCRIPTS_TO_RUN = [
-    #"src/scrapers/1_page_acceuil_carrousels_card_voir_plus.py",
-    #"src/scrapers/2_page_en_vedette_carrousels_card_voir_plus.py",
-    #"src/scrapers/3_page_jeunesse_carrousels_card_voir_plus.py",
-    "src/scrapers/4_page_sur_demande_carrousels_card_voir_plus.py",
-]
-OUTPUT_DIR = Path("output")
-LOG_DIR = Path("logs")
-OUTPUT_DIR.mkdir(exist_ok=True)
-LOG_DIR.mkdir(exist_ok=True)
-
-
-# --- LOGGING SETUP ---
-
-def setup_logging():
-    """Configure logging to file and console."""
-    log_filename = LOG_DIR / f"run_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] - %(message)s",
-        handlers=[
-            logging.FileHandler(log_filename, encoding='utf-8'),
-            logging.StreamHandler()  # To also print to console
-        ]
-    )
-
-
-# --- SCRIPT LOGIC ---
-
-def run_scraper(script_path: str) -> bool:
-    """Exécute un script de scraping en tant que module et attend sa fin."""
-    if not Path(script_path).exists():
-        logging.error(f"Script non trouvé : {script_path}")
-        return False
-
-    logging.info(f"Lancement du scraper : {script_path}")
-    try:
-        module_name = script_path.replace('/', '.').replace('\\', '.').removesuffix('.py')
-        result = subprocess.run(
-            [PYTHON_EXECUTABLE, "-m", module_name],
-            check=True, capture_output=True, text=True, encoding='utf-8',
-            errors='ignore', env={**os.environ, "LOG_MINIMAL": "1"}
-        )
-        logging.info(f"Scraper {script_path} terminé avec succès.")
-        if result.stdout: logging.info("Sortie du scraper:\n" + result.stdout)
-        if result.stderr: logging.warning("Erreurs (stderr) du scraper:\n" + result.stderr)
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error(f"ERREUR lors de l'exécution de {script_path}!")
-        logging.error("--- SORTIE (stdout) ---\n" + e.stdout)
-        logging.error("--- ERREURS (stderr) ---\n" + e.stderr)
-        return False
-    except Exception as e:
-        logging.error(f"Erreur inattendue : {e}")
-        return False
-
-
-def create_zip_archive() -> Optional[Tuple[Path, List[Path]]]:
-    """Archive les rapports et retourne le chemin du ZIP et la liste des fichiers sources."""
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    zip_filename = OUTPUT_DIR / f"rapport_hebdomadaire_{date_str}.zip"
-    logging.info(f"Création de l'archive ZIP : {zip_filename}")
-
-    files_to_archive = [p for p in OUTPUT_DIR.glob(f"*{date_str}*") if p.suffix in ['.csv', '.xlsx']]
-    if not files_to_archive:
-        logging.warning("Aucun fichier de rapport trouvé pour aujourd'hui. L'archive ne sera pas créée.")
-        return None
-
-    try:
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in files_to_archive:
-                zipf.write(file, arcname=file.name)
-                logging.info(f"Ajouté à l'archive : {file.name}")
-        logging.info(f"Archive {zip_filename} créée avec succès.")
-        return zip_filename, files_to_archive
-    except Exception as e:
-        logging.error(f"ERREUR lors de la création de l'archive ZIP : {e}")
-        return None
-
-
-def send_email_with_attachment(attachment_path: Path) -> bool:
-    """Envoie un email avec pièce jointe et retourne True si succès, False si échec."""
-    logging.info("Préparation de l'envoi de l'email...")
-    to_emails = [email.strip() for email in os.getenv("EMAIL_TO", "").split(',') if email.strip()]
-    cc_emails = [email.strip() for email in os.getenv("EMAIL_CC", "").split(',') if email.strip()]
-
-    if not to_emails:
-        logging.error("Aucun destinataire (EMAIL_TO) n'est configuré dans le fichier .env.")
-        return False
-
-    msg = MIMEMultipart()
-    msg['From'] = os.getenv("EMAIL_FROM")
-    msg['To'] = ", ".join(to_emails)
-    msg['Cc'] = ", ".join(cc_emails)
-    msg['Subject'] = f"Rapport Hebdomadaire de Données - {datetime.now().strftime('%d/%m/%Y')}"
-    msg.attach(MIMEText(
-        "===== Test de Tasiana: envoi automatique d'un rapport depuis le Planificateur de tâches. ===== Bonjour,\n\nVeuillez trouver ci-joint le rapport hebdomadaire des données collectées.\n\nCordialement,\nTatsiana.",
-        'plain', 'utf-8'))
-
-    try:
-        with open(attachment_path, "rb") as f:
-            part = MIMEApplication(f.read(), Name=attachment_path.name)
-        part['Content-Disposition'] = f'attachment; filename="{attachment_path.name}"'
-        msg.attach(part)
-    except Exception as e:
-        logging.error(f"ERREUR lors de l'attachement du fichier {attachment_path}: {e}")
-        return False
-
-    try:
-        logging.info(f"Connexion au serveur SMTP : {os.getenv('SMTP_SERVER')}:{os.getenv('SMTP_PORT')}")
-        server = smtplib.SMTP(os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT")))
-        server.starttls()
-        server.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD"))
-        all_recipients = to_emails + cc_emails
-        server.sendmail(msg['From'], all_recipients, msg.as_string())
-        server.quit()
-        logging.info(f"Email envoyé avec succès à : {', '.join(all_recipients)}")
-        return True
-    except Exception as e:
-        logging.error(f"ERREUR lors de l'envoi de l'email : {e}")
-        return False
-
-
-def cleanup_files(files_to_delete: List[Path]):
-    """Supprime les fichiers spécifiés."""
-    logging.info("--- Nettoyage des fichiers sources ---")
-    for file in files_to_delete:
-        try:
-            file.unlink()
-            logging.info(f"--- Fichier supprimé --- : {file.name}")
-        except Exception as e:
-            logging.error(f"ERREUR lors de la suppression de {file.name}: {e}")
-    logging.info("--- Nettoyage terminé. Seul le fichier ZIP a été conservé. ---")
-
-
-def main():
-    """Fonction principale pour orchestrer tout le processus."""
-    setup_logging()
-    load_dotenv()
-    start_time = time.time()
-    logging.info("=" * 50)
-    logging.info("Début du processus d'automatisation.")
-    logging.info("=" * 50)
-
-    all_ok = True
-    for script in SCRIPTS_TO_RUN:
-        if not run_scraper(script):
-            all_ok = False
-            logging.critical(f"Processus arrêté à cause d'une erreur critique dans {script}.")
-            break
-
-    if all_ok:
-        logging.info("Tous les scrapers ont terminé avec succès.")
-        archive_result = create_zip_archive()
-        if archive_result:
-            zip_file_path, source_files = archive_result
-            email_sent_successfully = send_email_with_attachment(zip_file_path)
-
-            if email_sent_successfully:
-                cleanup_files(source_files)
-
-    end_time = time.time()
-    logging.info("=" * 50)
-    logging.info(f"Processus terminé. Durée totale : {end_time - start_time:.2f} secondes.")
-    logging.info("=" * 50)
-
-
-if __name__ == "__main__":
-    main()
-
+# run.py
+
+import subprocess
+from datetime import datetime
+from pathlib import Path
+import zipfile
+import time
+import os
+import smtplib
+import logging
+import re
+import threading
+import argparse
+from contextlib import suppress
+from dotenv import load_dotenv
+from typing import Callable, Collection, List, Optional
+
+from src.common.export_utils import EXPORT_PREFIX, archive_path, export_rows, read_exports, replace_exports
+from src.common.link_checker import validate_urls
+from src.common.detail_enricher import DETAIL_COLUMNS, DetailCache, enrich_urls
+from src.common.mail_utils import open_smtp, send_archive
+from src.common.resolution_store import ResolutionStore
+from src.common.sharding import parse_shard, merge_shards
+from src.common import budget
+from src.common.retry_queue import FAILURE_COLUMNS, RetryQueue, failure_rows
+from src.common.week_diff import CHANGE_COLUMNS, week_changes
+from src.common.log_setup import LEVELS, default_level, relay, setup_logging
+from src.common.pipeline import Dag
+from src.common.profiling import MODES as PROFILE_MODES
+from src.common.records import CARD_COLUMNS
+
+# --- CONFIGURATION ---
+
+PYTHON_EXECUTABLE = "python"
+SCRIPTS_TO_RUN = [
+    #"src/scrapers/1_page_acceuil_carrousels_card_voir_plus.py",
+    #"src/scrapers/2_page_en_vedette_carrousels_card_voir_plus.py",
+    #"src/scrapers/3_page_jeunesse_carrousels_card_voir_plus.py",
+    "src/scrapers/4_page_sur_demande_carrousels_card_voir_plus.py",
+]
+OUTPUT_DIR = Path("output")
+LOG_DIR = Path("logs")
+POST_WORKERS = int(os.getenv("RUN_POST_WORKERS", "3"))   # post-traitements menés en parallèle des scrapers
+SCRAPER_GRACE_S = 120        # au-delà de l'échéance + cette marge, un scraper bloqué est arrêté
+URL_COL = "URL détail"
+STATUS_COL = "Statut HTTP"
+LATENCY_COL = "Latence (ms)"
+OUTPUT_DIR.mkdir(exist_ok=True)
+LOG_DIR.mkdir(exist_ok=True)
+
+
+# --- SCRIPT LOGIC ---
+
+def run_scraper(script_path: str, extra_args: List[str] = ()) -> bool:
+    """Exécute un script de scraping en tant que module et attend sa fin."""
+    if not Path(script_path).exists():
+        logging.error(f"Script non trouvé : {script_path}")
+        return False
+
+    logging.info(f"Lancement du scraper : {script_path}")
+    module_name = script_path.replace('/', '.').replace('\\', '.').removesuffix('.py')
+    scraper = Path(script_path).stem
+    left = budget.remaining()
+    try:
+        # Événements JSON sur stdout, relayés au fil de l'eau dans le journal du run
+        proc = subprocess.Popen(
+            [PYTHON_EXECUTABLE, "-m", module_name, *extra_args],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+            errors='replace', env={**os.environ, "LOG_FORMAT": "json", "PYTHONIOENCODING": "utf-8"},
+        )
+    except Exception as e:
+        logging.error(f"Erreur inattendue : {e}")
+        return False
+    relais = [threading.Thread(target=relay, args=(proc.stdout, scraper), daemon=True),
+              threading.Thread(target=relay, args=(proc.stderr, scraper, logging.WARNING), daemon=True)]
+    for t in relais:
+        t.start()
+    try:
+        code = proc.wait(timeout=max(left, 0) + SCRAPER_GRACE_S if left is not None else None)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        logging.error(f"Scraper {script_path} arrêté : budget de temps dépassé.")
+        return False
+    finally:
+        for t in relais:
+            t.join(timeout=5)
+    if code != 0:
+        logging.error(f"ERREUR lors de l'exécution de {script_path} (code {code}) : voir les événements ci-dessus.")
+        return False
+    logging.info(f"Scraper {script_path} terminé avec succès.")
+    return True
+
+
+def get_today_archive() -> Optional[Path]:
+    """Retourne l'archive du jour, alimentée directement par les exporteurs des scrapers."""
+    zip_filename = archive_path(OUTPUT_DIR)
+    if not zip_filename.exists():
+        logging.warning("Aucune archive de rapport trouvée pour aujourd'hui. Rien ne sera envoyé.")
+        return None
+
+    try:
+        with zipfile.ZipFile(zip_filename) as zipf:
+            for info in zipf.infolist():
+                logging.info(f"Contenu de l'archive : {info.filename} ({info.file_size} octets)")
+        return zip_filename
+    except zipfile.BadZipFile as e:
+        logging.error(f"ERREUR : archive {zip_filename} illisible : {e}")
+        return None
+
+
+def scraper_page(script_path: str) -> Optional[str]:
+    """Nom de page (constante PAGE) d'un script de scraping, lu sans importer le module."""
+    with suppress(OSError):
+        m = re.search(r'^PAGE\s*=\s*["\']([^"\']+)["\']', Path(script_path).read_text(encoding="utf-8"), re.M)
+        return m.group(1) if m else None
+    return None
+
+
+def export_page(base: str) -> str:
+    """Page d'un export (carrousels_cards_url_<page>_<date> → <page>)."""
+    return base.removeprefix(EXPORT_PREFIX).rsplit("_", 1)[0]
+
+
+def validate_exports(zip_file_path: Path, pages: Optional[Collection[str]], bases: list) -> bool:
+    """
+    Prend en charge les exports des pages `pages` (toutes avec None), c'est-à-dire ceux
+    que l'étape précédente vient d'écrire (ajoutés à `bases` pour les étapes suivantes),
+    et vérifie leur forme. Les exports des autres pages, même présents dans l'archive du
+    jour (run relancé), restent à l'étape de leur propre scraper.
+    """
+    if pages is not None and not pages:
+        return True
+    if not zip_file_path.exists():
+        logging.error(f"Archive absente : {zip_file_path}")
+        return False
+    exports = read_exports(zip_file_path)
+    nouveaux = [b for b in exports if pages is None or export_page(b) in pages]
+    if not nouveaux:
+        logging.warning(f"Aucun export pour {', '.join(pages or [])} dans {zip_file_path}.")
+    ok = True
+    for base in nouveaux:
+        cols, rows = exports[base]
+        if cols[:len(CARD_COLUMNS)] != CARD_COLUMNS or not rows:
+            logging.error(f"Export {base} invalide : {len(rows)} ligne(s), colonnes {cols}")
+            ok = False
+            continue
+        i = cols.index(URL_COL)
+        vides = sum(1 for r in rows if len(r) != len(cols) or not r[i])
+        logging.info(f"Export {base} : {len(rows)} ligne(s)" + (f", {vides} sans URL" if vides else ""))
+        bases.append(base)
+    return ok
+
+
+def check_links(zip_file_path: Path, bases: Optional[Collection[str]] = None) -> bool:
+    """Valide les URLs collectées et ajoute les colonnes statut HTTP / latence aux exports (tous, ou seulement ceux de `bases`)."""
+    if bases is not None and not bases:
+        return True
+    exports = {b: e for b, e in read_exports(zip_file_path).items() if bases is None or b in bases}
+    urls = [row[cols.index(URL_COL)] for cols, rows in exports.values() if URL_COL in cols for row in rows]
+    if not urls:
+        logging.warning("Aucune URL à valider dans l'archive.")
+        return True
+
+    start = time.time()
+    try:
+        results = validate_urls(
+            urls,
+            concurrency=int(os.getenv("LINK_CHECK_CONCURRENCY", "50")),
+            per_host_rps=float(os.getenv("LINK_CHECK_RPS", "20")),
+        )
+    except Exception as e:
+        logging.error(f"ERREUR lors de la validation des liens : {e}")
+        return False
+    ko = [r for r in results.values() if r.status is None or r.status >= 400]
+    logging.info(f"{len(results)} URL(s) validée(s) en {time.time() - start:.2f} s, {len(ko)} en erreur.")
+    for r in ko:
+        logging.warning(f"Lien en erreur : {r.url} → {r.status or r.error}")
+
+    for base, (cols, rows) in exports.items():
+        if URL_COL not in cols:
+            continue
+        i = cols.index(URL_COL)
+        # archive déjà validée (run relancé) : seules les colonnes statut / latence sont remplacées
+        garder = [k for k, c in enumerate(cols) if c not in (STATUS_COL, LATENCY_COL)]
+        cols[:] = [cols[k] for k in garder] + [STATUS_COL, LATENCY_COL]
+        for row in rows:
+            res = results.get(row[i])
+            row[:] = [row[k] for k in garder] + [(res.status or res.error) if res else "", res.latency_ms if res else ""]
+    replace_exports(zip_file_path, exports)
+    return True
+
+
+def enrich_details(zip_file_path: Path, bases: Optional[Collection[str]] = None) -> bool:
+    """Lit les pages de détail (en parallèle, avec cache) et ajoute leurs métadonnées aux exports (tous, ou seulement ceux de `bases`)."""
+    if bases is not None and not bases:
+        return True
+    exports = {b: e for b, e in read_exports(zip_file_path).items() if bases is None or b in bases}
+    urls = [row[cols.index(URL_COL)] for cols, rows in exports.values() if URL_COL in cols for row in rows]
+    if not urls:
+        return True
+
+    start = time.time()
+    try:
+        with DetailCache() as cache:
+            cache.purge_expired()
+            details = enrich_urls(urls, cache)
+            logging.info(f"{len(details)} page(s) de détail en {time.time() - start:.2f} s "
+                         f"({cache.hits} depuis le cache).")
+    except Exception as e:
+        logging.error(f"ERREUR lors de l'enrichissement des détails : {e}")
+        return False
+    # colonnes laissées vides pour ces pages : l'erreur n'apparaît que dans le log
+    illisibles = [d for d in details.values() if d.error]
+    for d in illisibles:
+        logging.warning(f"Page de détail illisible : {d.url} → {d.error}")
+    if illisibles:
+        logging.warning(f"{len(illisibles)} page(s) de détail illisible(s) : colonnes de détail vides pour ces lignes.")
+
+    for base, (cols, rows) in exports.items():
+        if URL_COL not in cols:
+            continue
+        i = cols.index(URL_COL)
+        # archive déjà enrichie (run relancé) : les anciennes valeurs sont remplacées
+        garder = [k for k, c in enumerate(cols) if c not in DETAIL_COLUMNS]
+        cols[:] = [cols[k] for k in garder] + DETAIL_COLUMNS
+        for row in rows:
+            d = details.get(row[i])
+            row[:] = [row[k] for k in garder] + (d.cells() if d else [""] * len(DETAIL_COLUMNS))
+    replace_exports(zip_file_path, exports)
+    return True
+
+
+def send_email_with_attachment(attachment_path: Path, notes: List[str] = (), failures: int = 0,
+                               changes: List[str] = ()) -> bool:
+    """Envoie un email avec pièce jointe et retourne True si succès, False si échec."""
+    logging.info("Préparation de l'envoi de l'email...")
+    to_emails = [email.strip() for email in os.getenv("EMAIL_TO", "").split(',') if email.strip()]
+    cc_emails = [email.strip() for email in os.getenv("EMAIL_CC", "").split(',') if email.strip()]
+
+    if not to_emails:
+        logging.error("Aucun destinataire (EMAIL_TO) n'est configuré dans le fichier .env.")
+        return False
+
+    sender = os.getenv("EMAIL_FROM")
+    subject = f"Rapport Hebdomadaire de Données - {datetime.now().strftime('%d/%m/%Y')}"
+    body = "===== Test de Tasiana: envoi automatique d'un rapport depuis le Planificateur de tâches. ===== Bonjour,\n\nVeuillez trouver ci-joint le rapport hebdomadaire des données collectées.\n\nCordialement,\nTatsiana."
+    if notes:
+        body += "\n\nCouverture du run :\n" + "\n".join(f"- {n}" for n in notes)
+    if failures:
+        body += f"\n\n{failures} échec(s) définitif(s) : voir la feuille « echecs » de l'archive."
+    if changes:
+        body += "\n\nChangements depuis le run précédent (feuille « changements ») :\n" + "\n".join(f"- {c}" for c in changes)
+    max_mb = float(os.getenv("EMAIL_MAX_SIZE_MB", "0") or 0)
+    max_bytes = int(max_mb * 1024 * 1024) or None
+
+    try:
+        logging.info(f"Connexion au serveur SMTP : {os.getenv('SMTP_SERVER')}:{os.getenv('SMTP_PORT')}")
+        server = open_smtp(os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT")),
+                           os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD"),
+                           allow_plaintext=os.getenv("SMTP_ALLOW_PLAINTEXT") == "1")
+        try:
+            all_recipients = to_emails + cc_emails
+            sent = send_archive(server, sender, to_emails, cc_emails, subject, body,
+                                attachment_path, max_message_bytes=max_bytes, log=logging.info)
+        finally:
+            with suppress(smtplib.SMTPException, OSError):
+                server.quit()
+        logging.info(f"{sent} email(s) envoyé(s) avec succès à : {', '.join(all_recipients)}")
+        return True
+    except Exception as e:
+        logging.error(f"ERREUR lors de l'envoi de l'email : {e}")
+        return False
+
+
+def add_post_stages(dag: Dag, zip_f: Path, after: str, tag: str, pages: Callable[[], Optional[Collection[str]]],
+                    strict: bool = True, enrich: bool = True, links: bool = True) -> str:
+    """
+    Validation → enrichissement → liens des exports des pages `pages()` (évaluées au lancement,
+    None = toutes), après l'étape `after` ; retourne le nom de la dernière étape.
+    """
+    bases = []
+    last = dag.add(f"valider:{tag}", lambda: validate_exports(zip_f, pages(), bases),
+                   after=[after] if strict else [], wait=[] if strict else [after])
+    if enrich:
+        last = dag.add(f"enrichir:{tag}", lambda: enrich_details(zip_f, bases), after=[last])
+    if links:
+        last = dag.add(f"liens:{tag}", lambda: check_links(zip_f, bases), after=[last])
+    return last
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collecte hebdomadaire, archive et envoi par e-mail.")
+    parser.add_argument("--inventory", action="store_true",
+                        help="Inventaire seul : rapporte ce qui a changé sur chaque page, sans crawl, archive ni e-mail.")
+    parser.add_argument("--force", action="store_true",
+                        help="Recrawle tous les carrousels, même ceux inchangés depuis le dernier run.")
+    parser.add_argument("--skip-link-check", action="store_true",
+                        help="Ne valide pas les URLs collectées avant l'envoi.")
+    parser.add_argument("--log-level", choices=LEVELS, default=default_level(),
+                        help="Niveau du journal du run et des scrapers (défaut : LOG_LEVEL ou INFO).")
+    parser.add_argument("--skip-enrich", action="store_true",
+                        help="N'ajoute pas les métadonnées des pages de détail aux exports.")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="N'exécute que la part i de N de chaque scraper (sorties partielles, ni archive ni e-mail).")
+    parser.add_argument("--merge", action="store_true",
+                        help="Fusionne les sorties partielles des shards du jour dans l'archive, puis valide et envoie.")
+    parser.add_argument("--profile", nargs="?", const="sampling", choices=PROFILE_MODES,
+                        help="Profile chaque scraper (défaut : sampling) ; fichiers dans output/profiles/.")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Chaque scraper enregistre un instantané DOM de sa page (output/snapshots/) "
+                             "pour une ré-extraction sans navigateur.")
+    parser.add_argument("--budget", type=float, metavar="MINUTES",
+                        default=float(os.getenv("RUN_BUDGET_MINUTES", "0") or 0),
+                        help="Durée maximale du run ; les scrapers exportent ce qu'ils ont avant l'échéance "
+                             "(défaut : RUN_BUDGET_MINUTES, 0 = illimité).")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Fonction principale pour orchestrer tout le processus."""
+    load_dotenv()   # avant parse_args : RUN_BUDGET_MINUTES peut venir du .env
+    args = parse_args()
+    # niveau transmis aux scrapers (LOG_LEVEL de leur environnement)
+    os.environ["LOG_LEVEL"] = args.log_level
+    setup_logging("run", args.log_level, log_dir=LOG_DIR)
+    start_time = time.time()
+    logging.info("=" * 50)
+    logging.info("Début du processus d'automatisation.")
+    logging.info("=" * 50)
+
+    # Identifiant partagé par les scrapers : une carte résolue par l'un est reprise par les suivants
+    # (en mode shard, tous les shards du jour et la fusion partagent le même identifiant :
+    # la couverture et les échecs des shards sont ceux du rapport fusionné)
+    run_id = datetime.now().strftime('%Y-%m-%d' if args.shard or args.merge else '%Y-%m-%d_%H-%M-%S')
+    os.environ.setdefault("COLLECTOR_RUN_ID", run_id)
+    with ResolutionStore() as store:
+        store.purge_other_runs()
+
+    # Budget de temps : les scrapers s'arrêtent assez tôt pour laisser l'archive et l'e-mail se faire
+    if args.budget > 0:
+        reserve = float(os.getenv("RUN_BUDGET_RESERVE_MIN", "10"))
+        os.environ["RUN_DEADLINE"] = str(start_time + max(args.budget - reserve, 1) * 60)
+        logging.info(f"Budget de temps : {args.budget:g} min (échéance des scrapers à "
+                     f"{datetime.fromtimestamp(float(os.environ['RUN_DEADLINE'])):%H:%M:%S}).")
+
+    scraper_args = [flag for flag, on in (("--inventory", args.inventory), ("--force", args.force)) if on]
+    if args.shard:
+        scraper_args += ["--shard", f"{args.shard[0]}/{args.shard[1]}"]
+    if args.profile:
+        scraper_args += ["--profile", args.profile]
+    if args.snapshot:
+        scraper_args.append("--snapshot")
+
+    # Exécution en DAG : chaque export est validé, enrichi et ses liens vérifiés dès la fin
+    # de son scraper, pendant que les suivants naviguent ; il ne reste ensuite que l'e-mail.
+    dag = Dag(workers=1 + POST_WORKERS, log=logging.info)
+    zip_f = archive_path(OUTPUT_DIR)
+    reporting = not args.inventory and not args.shard
+    echecs = RetryQueue("scrapers")
+    relances: set = set()   # pages des scrapers mis en reprise
+
+    def post_stages(after: str, tag: str, pages: Callable[[], Optional[Collection[str]]], strict: bool = True) -> str:
+        return add_post_stages(dag, zip_f, after, tag, pages, strict,
+                               enrich=not args.skip_enrich, links=not args.skip_link_check)
+
+    def scraper_stage(script: str):
+        def stage() -> bool:
+            if budget.nearly_spent():
+                logging.warning(f"Budget de temps épuisé : {script} n'est pas lancé.")
+                return False
+            if run_scraper(script, scraper_args):
+                return True
+            if not budget.nearly_spent():   # arrêté par l'échéance : on envoie ce qui a été collecté
+                logging.error(f"{script} en échec : nouvelle tentative en fin de run.")
+                echecs.add("scraper", "échec du scraper (voir le journal du run)", label=script)
+                relances.add(scraper_page(script))
+            return False
+        return stage
+
+    def retry_stage() -> bool:
+        # Un scraper en échec n'arrête pas le run : il est relancé (nouveau processus,
+        # donc navigateur neuf) après les autres, avec un délai croissant entre les tours
+        echecs.retry(lambda _, f: run_scraper(f.label, scraper_args), log=logging.warning)
+        for f in echecs.pending:
+            logging.critical(f"Scraper en échec après {f.attempts} tentative(s) : {f.label}")
+        echecs.write(f".part-{args.shard[0]}-of-{args.shard[1]}" if args.shard else "")
+        return not echecs
+
+    def report_stage() -> bool:
+        merged = not args.merge or dag.stages["fusion"].status == "ok"
+        logging.info("Tous les scrapers ont terminé avec succès." if merged and not echecs
+                     else "Des scrapers sont en échec : envoi de ce qui a été collecté.")
+        couverture = budget.coverage_report()
+        for ligne in couverture:
+            logging.info(ligne)
+        # Échecs définitifs du jour (cartes, carrousels, scrapers) : feuille « echecs » de l'archive
+        echecs_rows = failure_rows()
+        if echecs_rows:
+            export_rows(echecs_rows, FAILURE_COLUMNS, OUTPUT_DIR, "echecs")
+            logging.warning(f"{len(echecs_rows)} échec(s) définitif(s) ajouté(s) à l'archive.")
+        # Ce qui a changé depuis le run précédent de chaque page (historique Parquet) : feuille « changements »
+        changements, resume = week_changes()
+        for ligne in resume:
+            logging.info(ligne)
+        if changements:
+            export_rows(changements, CHANGE_COLUMNS, OUTPUT_DIR, "changements")
+        zip_file_path = get_today_archive()
+        return bool(zip_file_path) and send_email_with_attachment(zip_file_path, couverture, len(echecs_rows), resume)
+
+    if args.merge:
+        logging.info("Fusion des sorties partielles des shards...")
+        fusion = dag.add("fusion", lambda: merge_shards(OUTPUT_DIR, log=logging.info))
+        # fusion incomplète : ni post-traitement ni e-mail, on attend les shards manquants
+        dag.add("rapport", report_stage, after=[fusion], wait=[post_stages(fusion, "fusion", lambda: None)])
+    else:
+        fins, scrapers = [], []
+        for script in SCRIPTS_TO_RUN:
+            tag = Path(script).stem
+            scrapers.append(dag.add(f"scraper:{tag}", scraper_stage(script), resource="navigateur"))
+            if reporting:
+                page = scraper_page(script)
+                fins.append(post_stages(scrapers[-1], tag, lambda page=page: {page}))
+        reprise = dag.add("reprise", retry_stage, wait=scrapers, resource="navigateur")
+        if reporting:
+            # seulement les pages des scrapers relancés (leurs étapes d'origine ont été sautées)
+            fins.append(post_stages(reprise, "reprise", lambda: relances, strict=False))
+            dag.add("rapport", report_stage, wait=[reprise, *fins])
+
+    dag.run()
+    logging.info(dag.summary("navigateur"))
+    if args.inventory:
+        logging.info("Inventaire terminé (aucune archive ni e-mail en mode inventaire).")
+    elif args.shard:
+        logging.info(f"Shard {args.shard[0]}/{args.shard[1]} terminé. Lancer `python run.py --merge` une fois tous les shards terminés.")
+
+    end_time = time.time()
+    logging.info("=" * 50)
+    logging.info(f"Processus terminé. Durée totale : {end_time - start_time:.2f} secondes.")
+    logging.info("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,114 @@
+# src/common/adaptive_timeouts.py
+# ---------------------------------------------------------------------------
+# Délais d'attente appris à partir des latences observées, par page et par
+# opération (« chargement » de la page, « retour » après navigation,
+# « navigation » après un clic).
+#  – chaque attente mesurée est enregistrée ; une attente expirée compte pour
+#    le délai historique × TIMEOUT_MAX_FACTOR (au moins le délai appliqué), ce
+#    qui fait monter le délai appris les jours lents ; pour le reste du run,
+#    l'opération ne descend plus sous son délai historique
+#  – délai = percentile TIMEOUT_PERCENTILE (95) des TIMEOUT_WINDOW dernières
+#    mesures × TIMEOUT_MARGIN (1.5), borné entre TIMEOUT_MIN_S et le délai
+#    historique × TIMEOUT_MAX_FACTOR ; délai historique tant qu'il y a moins
+#    de TIMEOUT_MIN_SAMPLES mesures
+#  – mesures gardées entre les runs (output/state/timeouts.json, réécrit sous
+#    verrou : des scrapers parallèles ne s'écrasent pas)
+# ADAPTIVE_TIMEOUTS=0 revient aux délais fixes (les mesures continuent).
+# ---------------------------------------------------------------------------
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from selenium.common.exceptions import TimeoutException
+
+from src.common.change_detection import STATE_DIR
+from src.common.export_utils import file_lock
+
+TIMEOUTS_FILE = STATE_DIR / "timeouts.json"
+ENABLED = os.getenv("ADAPTIVE_TIMEOUTS", "1") == "1"
+PERCENTILE = float(os.getenv("TIMEOUT_PERCENTILE", "95"))
+MARGIN = float(os.getenv("TIMEOUT_MARGIN", "1.5"))
+MIN_S = float(os.getenv("TIMEOUT_MIN_S", "2"))
+MAX_FACTOR = float(os.getenv("TIMEOUT_MAX_FACTOR", "2"))
+MIN_SAMPLES = int(os.getenv("TIMEOUT_MIN_SAMPLES", "20"))
+WINDOW = int(os.getenv("TIMEOUT_WINDOW", "200"))
+
+T = TypeVar("T")
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentile « rang le plus proche » (valeurs non vides)."""
+    s = sorted(values)
+    return s[min(len(s), max(1, math.ceil(p / 100 * len(s)))) - 1]
+
+class AdaptiveTimeouts:
+    """Mesures par opération pour une page ; délais calculés à la demande."""
+
+    def __init__(self, page: str, path: Path = TIMEOUTS_FILE):
+        self.page = page
+        self.path = path
+        self.expired: dict[str, int] = {}
+        self.measured: dict[str, int] = {}
+        self.delays: dict[str, float] = {}   # dernier délai appliqué par opération
+        try:
+            self._samples: dict[str, list[float]] = json.loads(path.read_text(encoding="utf-8")).get(page, {})
+        except (OSError, ValueError):
+            self._samples = {}
+
+    def get(self, op: str, default: float) -> float:
+        """Délai pour `op` : appris si assez de mesures, sinon `default` ; jamais moins que `default` après une expiration."""
+        samples = self._samples.get(op, [])
+        if not ENABLED or len(samples) < MIN_SAMPLES:
+            return default
+        learned = round(min(max(percentile(samples, PERCENTILE) * MARGIN, MIN_S), default * MAX_FACTOR), 1)
+        return max(learned, default) if self.expired.get(op) else learned
+
+    def record(self, op: str, seconds: float, expired: bool = False):
+        samples = self._samples.setdefault(op, [])
+        samples.append(round(seconds, 2))
+        del samples[:-WINDOW]
+        self.measured[op] = self.measured.get(op, 0) + 1
+        if expired:
+            self.expired[op] = self.expired.get(op, 0) + 1
+
+    def wait(self, op: str, default: float, fn: Callable[[float], T], timeout: float | None = None) -> T:
+        """
+        Appelle fn(délai) avec le délai appris pour `op` (ou `timeout` s'il est imposé,
+        ex. second essai) et enregistre la durée observée.
+        """
+        t = timeout if timeout is not None else self.get(op, default)
+        self.delays[op] = t
+        t0 = time.monotonic()
+        try:
+            result = fn(t)
+        except TimeoutException:
+            # durée réelle inconnue : comptée comme le plafond, le délai appris remonte aussitôt
+            self.record(op, max(t, default * MAX_FACTOR), expired=True)
+            raise
+        self.record(op, time.monotonic() - t0)
+        return result
+
+    def summary(self) -> str:
+        parts = []
+        for op, samples in sorted(self._samples.items()):
+            if op in self.measured:
+                parts.append(f"{op} {self.delays.get(op, 0):g} s (p{PERCENTILE:g} {percentile(samples, PERCENTILE):.1f} s, "
+                             f"{self.measured[op]} mesure(s), {self.expired.get(op, 0)} expirée(s))")
+        return "Délais d'attente : " + (", ".join(parts) if parts else "aucune mesure")
+
+    def save(self):
+        """Réécrit les mesures de cette page sans toucher aux autres pages."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # lecture-modification-écriture sous verrou : des scrapers parallèles ne s'écrasent pas
+        with file_lock(self.path):
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            data[self.page] = self._samples
+            tmp = self.path.with_name(f"{self.path.stem}.{self.page}.tmp")   # un fichier temporaire par page
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
@@ -0,0 +1,142 @@
+# src/common/budget.py
+# ---------------------------------------------------------------------------
+# Budget de temps du run.
+#  – échéance absolue RUN_DEADLINE (epoch, fixée par run.py pour tous les
+#    scrapers) ou RUN_BUDGET_MINUTES depuis le lancement d'un scraper seul
+#  – les scrapers traitent d'abord les carrousels nouveaux / modifiés, puis
+#    les autres dans l'ordre de la page, et ne commencent plus de nouveau
+#    travail quand il reste moins de BUDGET_EXPORT_RESERVE_S secondes
+#  – ce qui a été collecté est exporté ; un résumé de couverture par page est
+#    écrit dans output/coverage/<date>/ et repris par run.py (log + e-mail),
+#    pour le seul run en cours (COLLECTOR_RUN_ID) ; les carrousels inachevés
+#    y sont nommés pour que week_diff ne les déclare pas retirés
+# ---------------------------------------------------------------------------
+
+import json
+import os
+import time
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+
+from src.common.change_detection import block_key
+from src.common.resolution_store import current_run_id
+
+EXPORT_RESERVE_S = float(os.getenv("BUDGET_EXPORT_RESERVE_S", "60"))   # marge pour exporter
+COVERAGE_DIR = Path("output") / "coverage"
+
+_START = time.time()
+
+def deadline() -> float | None:
+    """Échéance absolue (epoch) ; None si aucun budget n'est fixé."""
+    if os.getenv("RUN_DEADLINE"):
+        return float(os.environ["RUN_DEADLINE"])
+    minutes = float(os.getenv("RUN_BUDGET_MINUTES", "0") or 0)
+    return _START + minutes * 60 if minutes > 0 else None
+
+def remaining() -> float | None:
+    d = deadline()
+    return None if d is None else d - time.time()
+
+def nearly_spent(reserve: float = EXPORT_RESERVE_S) -> bool:
+    """True quand il ne faut plus commencer de nouveau travail."""
+    left = remaining()
+    return left is not None and left <= reserve
+
+def block_priority(block: dict | None, previous: dict) -> int:
+    """0 : carrousel nouveau ou modifié depuis le run précédent ; 1 : déjà connu."""
+    return 0 if block is None or block_key(block) not in previous else 1
+
+def priority_order(keys, inventory: list[dict], previous: dict) -> list[int]:
+    """Numéros de carrousel (1…) triés : nouveaux / modifiés d'abord, puis ordre de la page."""
+    inv = lambda k: inventory[k - 1] if k <= len(inventory) else None
+    return sorted(keys, key=lambda k: (block_priority(inv(k), previous), k))
+
+class Coverage:
+    """Statut de chaque carrousel d'une page : repris, complet, partiel, non visité, en échec."""
+
+    def __init__(self, page: str, total: int, titles: dict[int, str] | None = None):
+        self.page = page
+        self.total = total
+        self.titles = titles or {}   # n° → titre (inventaire), pour les carrousels inachevés
+        self.status: dict[int, str] = {}
+        self.cards_skipped = 0
+        self.stopped_at: str | None = None
+
+    def stop(self):
+        """Note l'heure à laquelle le budget a interrompu le travail (première fois seulement)."""
+        if self.stopped_at is None:
+            self.stopped_at = datetime.now().strftime("%H:%M:%S")
+
+    def mark(self, idx: int, status: str):
+        self.status[idx] = status
+        if status in ("partiel", "non visité"):
+            self.stop()
+
+    def finish(self, idx: int):
+        """Fin du crawl d'un carrousel : complet, sauf s'il a été interrompu."""
+        self.status.setdefault(idx, "complet")
+
+    @property
+    def incomplete(self) -> set[int]:
+        """Carrousels dont les lignes ne doivent pas être reprises au prochain run."""
+        return {i for i, s in self.status.items() if s not in ("complet", "repris")}
+
+    def summary(self) -> str:
+        counts = {s: sum(1 for v in self.status.values() if v == s)
+                  for s in ("complet", "repris", "partiel", "non visité", "en échec")}
+        line = (f"Couverture {self.page} : {counts['complet'] + counts['repris']}/{len(self.status) or self.total} "
+                f"carrousels complets ({counts['repris']} repris), {counts['partiel']} partiel(s), "
+                f"{counts['non visité']} non visité(s)")
+        if counts["en échec"]:
+            line += f", {counts['en échec']} en échec"
+        if self.cards_skipped:
+            line += f", {self.cards_skipped} carte(s) non visitée(s)"
+        if self.stopped_at:
+            line += f" – budget de temps épuisé à {self.stopped_at}"
+        return line
+
+    def write(self, suffix: str = "") -> Path:
+        folder = COVERAGE_DIR / datetime.now().strftime("%Y-%m-%d")
+        folder.mkdir(parents=True, exist_ok=True)
+        f = folder / f"{self.page}{suffix}.json"
+        f.write_text(json.dumps({"run_id": current_run_id(), "page": self.page, "total": self.total, "status": self.status,
+                                 "incomplete": [self.titles.get(i, "") for i in sorted(self.incomplete)],
+                                 "cards_skipped": self.cards_skipped, "stopped_at": self.stopped_at,
+                                 "summary": self.summary()}, ensure_ascii=False), encoding="utf-8")
+        return f
+
+def page_files(folder: Path, page: str) -> list[Path]:
+    """Fichiers JSON d'une page dans un dossier du jour (page entière ou parts de shards)."""
+    return sorted(f for f in folder.glob(f"{page}*.json") if f.stem == page or f.stem.startswith(f"{page}.part-"))
+
+def unfinished_titles(page: str, date: str | None = None, run_id: str | None = None) -> set[str]:
+    """
+    Titres des carrousels laissés inachevés (partiels, non visités, en échec) par le run
+    (par défaut le run en cours) ; les fichiers d'un run précédent du même jour sont ignorés.
+    """
+    run_id = run_id or current_run_id()
+    titles = set()
+    for f in page_files(COVERAGE_DIR / (date or datetime.now().strftime("%Y-%m-%d")), page):
+        with suppress(OSError, ValueError, TypeError, AttributeError):
+            data = json.loads(f.read_text(encoding="utf-8"))
+            if data.get("run_id") == run_id:
+                titles |= {t for t in data.get("incomplete", []) if t}
+    return titles
+
+def coverage_report(date: str | None = None, run_id: str | None = None) -> list[str]:
+    """
+    Résumés de couverture du run (par défaut le run en cours), une ligne par page
+    (ou par shard) ; les fichiers d'un run précédent du même jour sont ignorés.
+    """
+    folder = COVERAGE_DIR / (date or datetime.now().strftime("%Y-%m-%d"))
+    run_id = run_id or current_run_id()
+    lines = []
+    for f in sorted(folder.glob("*.json")):
+        try:
+            data = json.loads(f.read_text(encoding="utf-8"))
+            if data.get("run_id") == run_id:
+                lines.append(data["summary"])
+        except (OSError, ValueError, KeyError, AttributeError):
+            continue
+    return lines
@@ -0,0 +1,139 @@
+# src/common/change_detection.py
+# ---------------------------------------------------------------------------
+# Pré-passe de détection de changements : une seule requête JS relève, pour
+# chaque app-page-block, le titre, les libellés ordonnés des cartes et la cible
+# du bouton « Voir plus ». L'empreinte est comparée à celle du run précédent
+# (output/state/<page>.json) ; un carrousel inchangé reprend ses lignes
+# précédentes au lieu d'être recrawlé carte par carte. Deux carrousels
+# identiques (même empreinte) sont distingués par leur rang d'apparition.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from src.common.records import CardRow
+
+STATE_DIR = Path("output") / "state"
+
+INVENTORY_JS = r"""
+const norm = s => (s || '').replace(/\s+/g, ' ').trim();
+return Array.from(document.querySelectorAll('app-page-block')).map((b, i) => {
+  const titleEl = b.querySelector('.block-title');
+  const swiper = b.querySelectorAll('swiper-slide').length > 0;
+  const slick  = b.querySelectorAll('app-slide').length > 0;
+  const labels = [];
+  if (swiper) {
+    b.querySelectorAll('swiper-slide').forEach(sl => {
+      if ((sl.getAttribute('class') || '').includes('-duplicate')) return;
+      let lab = norm(sl.getAttribute('aria-label'));
+      if (!lab || /^[\d\s\/]+$/.test(lab)) {
+        const inner = sl.querySelector("div[role='link'][aria-label]");
+        lab = inner ? norm(inner.getAttribute('aria-label')) : '';
+      }
+      if (!lab) {
+        const t = sl.querySelector('span[aria-hidden], h2, h3');
+        lab = t ? norm(t.textContent) : '';
+      }
+      labels.push(lab);
+    });
+  } else if (slick) {
+    b.querySelectorAll('app-slide').forEach(s => {
+      if ((s.getAttribute('class') || '').includes('slick-cloned')) return;
+      const t = s.querySelector("h3 span[aria-hidden='true']");
+      if (t && norm(t.textContent)) labels.push(norm(t.textContent));
+    });
+  }
+  let voirPlus = '';
+  for (const el of b.querySelectorAll('a, [role=link][aria-label]')) {
+    const txt = norm(el.tagName === 'A' ? el.textContent : el.getAttribute('aria-label')).toLowerCase();
+    if (txt.includes('voir plus')) { voirPlus = el.href || el.getAttribute('aria-label') || 'voir plus'; break; }
+  }
+  return {
+    idx: i + 1,
+    titre: titleEl ? norm(titleEl.textContent) : '',
+    type: swiper ? 'Grande' : (slick ? 'Petite' : 'Inconnu'),
+    labels: labels,
+    voir_plus: voirPlus,
+  };
+});
+"""
+
+def fingerprint(block: dict) -> str:
+    """Empreinte stable d'un carrousel : titre + libellés ordonnés + cible « Voir plus »."""
+    payload = json.dumps([block["titre"], block["labels"], block["voir_plus"]], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def number_occurrences(blocks: list[dict]) -> list[dict]:
+    """Rang (0, 1, …) de chaque bloc parmi ceux de même empreinte, dans l'ordre de la page."""
+    seen = {}
+    for b in blocks:
+        b["occurrence"] = seen.get(b["fingerprint"], 0)
+        seen[b["fingerprint"]] = b["occurrence"] + 1
+    return blocks
+
+def block_key(block: dict) -> tuple[str, int]:
+    """Clé d'un bloc dans l'état : (empreinte, rang parmi les blocs identiques)."""
+    return block["fingerprint"], block.get("occurrence", 0)
+
+def inventory_blocks(dr) -> list[dict]:
+    """Relève tous les blocs de la page en un seul aller-retour WebDriver."""
+    blocks = dr.execute_script(INVENTORY_JS) or []
+    for b in blocks:
+        b["fingerprint"] = fingerprint(b)
+    return number_occurrences(blocks)
+
+def state_file(page: str) -> Path:
+    return STATE_DIR / f"{page}.json"
+
+def load_state(page: str) -> dict:
+    """Retourne {(empreinte, rang): bloc du run précédent (avec ses lignes)} ; vide si absent/illisible."""
+    f = state_file(page)
+    try:
+        data = json.loads(f.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    # rangs recalculés : les blocs sont enregistrés dans l'ordre de la page
+    return {block_key(b): b for b in number_occurrences(data.get("blocks", []))}
+
+def save_state(page: str, inventory: list[dict], rows: list[list]):
+    """Mémorise l'inventaire du run et les lignes exportées, regroupées par carrousel."""
+    by_idx = {}
+    for r in rows:
+        by_idx.setdefault(r[0], []).append(r)
+    blocks = [{**b, "rows": by_idx.get(b["idx"], [])} for b in inventory]
+    f = state_file(page)
+    f.parent.mkdir(parents=True, exist_ok=True)
+    tmp = f.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"date": datetime.now().isoformat(timespec="seconds"), "blocks": blocks},
+                              ensure_ascii=False), encoding="utf-8")
+    tmp.replace(f)
+
+def reusable_rows(previous: dict, block: dict) -> list[CardRow] | None:
+    """Lignes du run précédent pour un bloc inchangé (renumérotées à sa position actuelle)."""
+    old = previous.get(block_key(block))
+    if not old or not old.get("rows"):
+        return None
+    return [CardRow.from_row([block["idx"], *r[1:]]) for r in old["rows"]]
+
+def change_report(inventory: list[dict], previous: dict) -> list[str]:
+    """Lignes de rapport « inventaire seul » : nouveau / modifié / inchangé / retiré."""
+    prev_titles = {b["titre"]: b for b in previous.values()}
+    seen, lines = set(), []
+    for b in inventory:
+        if block_key(b) in previous:
+            status = "inchangé"
+        elif b["titre"] in prev_titles:
+            old = prev_titles[b["titre"]]
+            added = len(set(b["labels"]) - set(old["labels"]))
+            removed = len(set(old["labels"]) - set(b["labels"]))
+            status = f"modifié (+{added} / -{removed} cartes)"
+        else:
+            status = "nouveau"
+        seen.add(b["titre"])
+        lines.append(f"{b['idx']:>3}. [{status}] {b['titre'] or '(sans titre)'} – {b['type']}, {len(b['labels'])} cartes")
+    for titre in prev_titles:
+        if titre not in seen:
+            lines.append(f"  -. [retiré] {titre or '(sans titre)'}")
+    return lines
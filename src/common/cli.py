@@ -0,0 +1,29 @@
+# src/common/cli.py
+
+import argparse
+
+from src.common.dom_snapshots import ENABLED as SNAPSHOTS
+from src.common.log_setup import LEVELS, default_level
+from src.common.profiling import MODES as PROFILE_MODES
+from src.common.sharding import parse_shard
+
+def parse_scraper_args(argv=None) -> argparse.Namespace:
+    """Options communes à tous les scrapers (python -m src.scrapers.<script> [options])."""
+    p = argparse.ArgumentParser(description="Collecte des carrousels d'une page.")
+    p.add_argument("--inventory", action="store_true",
+                   help="Inventaire seul : rapporte les carrousels nouveaux/modifiés/inchangés sans crawler les cartes.")
+    p.add_argument("--force", action="store_true",
+                   help="Ignore l'état du run précédent et recrawle tous les carrousels.")
+    p.add_argument("--shard", type=parse_shard, metavar="i/N",
+                   help="Ne traite que la part i de N (carrousels ou tâches) ; sortie partielle à fusionner par run.py --merge.")
+    p.add_argument("--engine", choices=("selenium", "http"),
+                   help="Moteur d'extraction (défaut : EXTRACT_ENGINE_<PAGE>, EXTRACT_ENGINE ou selenium) ; "
+                        "en http, les blocs non résolus passent par Selenium.")
+    p.add_argument("--log-level", choices=LEVELS, default=default_level(),
+                   help="Niveau du journal (défaut : LOG_LEVEL ou INFO) ; DEBUG détaille chaque carte.")
+    p.add_argument("--profile", nargs="?", const="sampling", choices=PROFILE_MODES,
+                   help="Profile le run (défaut : sampling) ; fichiers dans output/profiles/.")
+    p.add_argument("--snapshot", action="store_true", default=SNAPSHOTS,
+                   help="Enregistre un instantané DOM de la page (défaut : DOM_SNAPSHOTS) pour une ré-extraction "
+                        "sans navigateur (python -m src.common.dom_snapshots).")
+    return p.parse_args(argv)
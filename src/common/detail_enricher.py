@@ -0,0 +1,243 @@
+# src/common/detail_enricher.py
+# ---------------------------------------------------------------------------
+# Enrichissement des exports à partir des pages de détail (colonne
+# « URL détail ») : type d'émission, nombre de saisons / d'épisodes, dates de
+# disponibilité. Pas de Selenium : les pages sont lues en HTTP, en parallèle
+#  – une seule ClientSession aiohttp (pool de connexions keep-alive), au plus
+#    DETAIL_CONCURRENCY requêtes à la fois, débit borné par hôte
+#  – champs lus dans les métadonnées de la page : JSON-LD / état JSON embarqué
+#    (numberOfSeasons, availabilityStarts…), puis balises <meta> (og:type)
+#  – cache SQLite par URL (output/state/details.sqlite) avec durée de vie
+#    DETAIL_TTL_H : une page déjà lue n'est pas redemandée d'un run à l'autre
+#  – une page illisible (erreur réseau, statut HTTP) laisse ses colonnes
+#    vides ; l'erreur est signalée à part (Detail.error, log de run.py)
+# Hors ligne : DETAIL_FIXTURES=<nom> (ou --fixtures) sert les pages d'une
+# archive de trafic enregistrée depuis un serveur local :
+#   python -m src.common.detail_enricher https://video.telequebec.tv/... --fixtures page_acceuil
+# ---------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from contextlib import AsyncExitStack, suppress
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.common.http_extract import fixture_server
+from src.common.link_checker import HostRateLimiter
+
+DB_PATH = Path("output") / "state" / "details.sqlite"
+CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "8"))
+RPS = float(os.getenv("DETAIL_RPS", "10"))                 # requêtes/s par hôte
+TTL_H = float(os.getenv("DETAIL_TTL_H", "72"))
+TIMEOUT_S = float(os.getenv("DETAIL_TIMEOUT_S", "20"))
+FIXTURES = os.getenv("DETAIL_FIXTURES", "")
+
+DETAIL_COLUMNS = ["Type d'émission", "Saisons", "Épisodes", "Disponible du", "Disponible jusqu'au"]
+
+# ---- lecture des métadonnées ------------------------------------------------
+TYPE_NAMES = {
+    "tvseries": "Série", "video.tv_show": "Série", "tvseason": "Saison",
+    "tvepisode": "Épisode", "episode": "Épisode", "video.episode": "Épisode",
+    "movie": "Film", "video.movie": "Film", "videoobject": "Vidéo", "video.other": "Vidéo",
+}
+START_KEYS = ("availabilityStarts", "availableFrom", "availabilityStartDate", "startDate", "datePublished", "uploadDate")
+END_KEYS = ("availabilityEnds", "availableUntil", "availabilityEndDate", "expires", "endDate")
+
+class _MetaParser(HTMLParser):
+    """Relève les <meta> (property / name / itemprop) et les blocs JSON des <script>."""
+
+    def __init__(self):
+        super().__init__()
+        self.meta: dict[str, str] = {}
+        self.data: list = []
+        self._buf: list[str] | None = None
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "meta":
+            k = a.get("property") or a.get("name") or a.get("itemprop")
+            if k and a.get("content"):
+                self.meta.setdefault(k, a["content"])
+        elif tag == "script" and (a.get("type") or "").lower() in ("application/ld+json", "application/json"):
+            self._buf = []
+
+    def handle_data(self, data):
+        if self._buf is not None:
+            self._buf.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._buf is not None:
+            with suppress(ValueError):
+                self.data.append(json.loads("".join(self._buf)))
+            self._buf = None
+
+def _values(data, keys):
+    """Valeurs non vides des clés, recherchées en largeur dans le JSON."""
+    queue = [data]
+    while queue:
+        node = queue.pop(0)
+        if isinstance(node, dict):
+            for k in keys:
+                if node.get(k) not in (None, "", []):
+                    yield node[k]
+            queue += [v for v in node.values() if isinstance(v, (dict, list))]
+        elif isinstance(node, list):
+            queue += [v for v in node if isinstance(v, (dict, list))]
+
+def _find(data, keys):
+    return next(_values(data, keys), None)
+
+def _int(v) -> int | None:
+    with suppress(TypeError, ValueError):
+        return int(v)
+    return None
+
+@dataclass
+class Detail:
+    url: str
+    type: str = ""
+    saisons: int | None = None
+    episodes: int | None = None
+    debut: str = ""
+    fin: str = ""
+    error: str = ""
+
+    def cells(self) -> list:
+        """Valeurs des colonnes DETAIL_COLUMNS (vides pour une page illisible : voir `error`)."""
+        return [self.type, self.saisons, self.episodes, self.debut, self.fin]
+
+def parse_detail(url: str, html: str) -> Detail:
+    p = _MetaParser()
+    p.feed(html)
+    data = p.data
+    # le premier type connu l'emporte (une WebPage enveloppe souvent la TVSeries)
+    types = [t for v in _values(data, ("@type",)) for t in (v if isinstance(v, list) else [v]) if isinstance(t, str)]
+    types += [p.meta["og:type"]] if p.meta.get("og:type") else []
+    typ = next((t for t in types if t.casefold() in TYPE_NAMES), types[0] if types else "")
+    saisons = _int(_find(data, ("numberOfSeasons",)))
+    if saisons is None and isinstance(_find(data, ("containsSeason",)), list):
+        saisons = len(_find(data, ("containsSeason",)))
+    episodes = _int(_find(data, ("numberOfEpisodes",)))
+    if episodes is None and isinstance(_find(data, ("episode", "episodes")), list):
+        episodes = len(_find(data, ("episode", "episodes")))
+    debut = str(_find(data, START_KEYS) or p.meta.get("video:release_date") or "")[:10]
+    fin = str(_find(data, END_KEYS) or p.meta.get("video:expiration_time") or "")[:10]
+    return Detail(url, TYPE_NAMES.get(typ.casefold(), typ), saisons, episodes, debut, fin)
+
+# ---- cache ------------------------------------------------------------------
+class DetailCache:
+    """Détails par URL, valables TTL_H heures ; partagé entre les runs (SQLite, WAL)."""
+
+    def __init__(self, path: str | Path = DB_PATH, ttl_h: float = TTL_H):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_h * 3600
+        self.hits = self.misses = 0
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS details (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, detail TEXT NOT NULL)")
+
+    def get(self, url: str) -> Detail | None:
+        row = self.db.execute("SELECT detail FROM details WHERE url = ? AND fetched_at >= ?",
+                              (url, time.time() - self.ttl_s)).fetchone()
+        if row:
+            self.hits += 1
+            return Detail(**json.loads(row[0]))
+        self.misses += 1
+        return None
+
+    def put(self, detail: Detail):
+        """Seules les pages lues sans erreur sont mémorisées."""
+        if detail.error:
+            return
+        self.db.execute("INSERT OR REPLACE INTO details (url, fetched_at, detail) VALUES (?, ?, ?)",
+                        (detail.url, time.time(), json.dumps(asdict(detail), ensure_ascii=False)))
+
+    def purge_expired(self):
+        self.db.execute("DELETE FROM details WHERE fetched_at < ?", (time.time() - self.ttl_s,))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---- client HTTP ------------------------------------------------------------
+async def _fetch_one(session, sem, limiter, url: str, fixture: str | None) -> Detail:
+    async with sem:
+        try:
+            await limiter.wait(urlsplit(url).netloc)
+            if fixture:
+                resp = await session.get(fixture, params={"u": url})
+            else:
+                resp = await session.get(url, headers={"Accept": "text/html"}, allow_redirects=True)
+            async with resp:
+                resp.raise_for_status()
+                html = await resp.text(errors="replace")
+        except aiohttp.ClientResponseError as e:
+            return Detail(url, error=f"HTTP {e.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return Detail(url, error=type(e).__name__)
+    return parse_detail(url, html)
+
+async def fetch_details(urls, concurrency: int = CONCURRENCY, per_host_rps: float = RPS,
+                        timeout: float = TIMEOUT_S, fixtures: str = FIXTURES) -> dict[str, Detail]:
+    """Lit chaque page de détail unique ; retourne {url: Detail}."""
+    uniques = list(dict.fromkeys(u for u in urls if u and u.startswith(("http://", "https://"))))
+    sem = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(per_host_rps)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    async with AsyncExitStack() as stack:
+        fixture = await stack.enter_async_context(fixture_server(fixtures)) if fixtures else None
+        session = await stack.enter_async_context(
+            aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)))
+        results = await asyncio.gather(*(_fetch_one(session, sem, limiter, u, fixture) for u in uniques))
+    return {d.url: d for d in results}
+
+def enrich_urls(urls, cache: DetailCache | None = None, **kwargs) -> dict[str, Detail]:
+    """Point d'entrée synchrone (run.py) : cache d'abord, puis lecture concurrente des pages manquantes."""
+    details, manquantes = {}, []
+    for u in dict.fromkeys(urls):
+        d = cache.get(u) if cache else None
+        if d:
+            details[u] = d
+        else:
+            manquantes.append(u)
+    if manquantes:
+        lues = asyncio.run(fetch_details(manquantes, **kwargs))
+        for d in lues.values():
+            if cache:
+                cache.put(d)
+        details.update(lues)
+    return details
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Métadonnées des pages de détail (sans navigateur).")
+    p.add_argument("urls", nargs="+", help="URL(s) de pages de détail")
+    p.add_argument("--fixtures", default=FIXTURES, help="archive de trafic à servir localement (output/traffic/<nom>)")
+    p.add_argument("--no-cache", action="store_true", help="ignore le cache des détails")
+    args = p.parse_args(argv)
+    t0 = time.perf_counter()
+    if args.no_cache:
+        details = enrich_urls(args.urls, fixtures=args.fixtures)
+    else:
+        with DetailCache() as cache:
+            details = enrich_urls(args.urls, cache, fixtures=args.fixtures)
+    for d in details.values():
+        print(f"{d.url}\n   " + " | ".join(f"{c} : {'' if v is None else v}" for c, v in zip(DETAIL_COLUMNS, d.cells())))
+    print(f"{len(details)} page(s) en {time.perf_counter() - t0:.2f} s")
+
+if __name__ == "__main__":
+    main()
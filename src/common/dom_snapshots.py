@@ -0,0 +1,172 @@
+# src/common/dom_snapshots.py
+# ---------------------------------------------------------------------------
+# Instantanés DOM et ré-extraction sans navigateur.
+#  – avec --snapshot (ou DOM_SNAPSHOTS=1), chaque scraper enregistre, une fois
+#    la page chargée, le HTML de tous ses app-page-block, et en fin de run les
+#    lignes exportées (carte → URL résolue). Le fichier est
+#    output/snapshots/<date>/<page>.json.gz.
+#  – ré-extraction : les URL résolues sont réinjectées (href) sur les cartes et
+#    les boutons « Voir plus » de l'instantané. Le code actuel du scraper
+#    tourne ensuite sur le faux WebDriver (src/common/fake_driver.py) : un
+#    correctif de libellés ou d'ordre s'applique en quelques secondes, sans
+#    Chrome ni réseau.
+#   python -m src.common.dom_snapshots page_acceuil [--date AAAA-MM-JJ] [--dry-run]
+#   python -m src.common.dom_snapshots --all --date AAAA-MM-JJ
+# Les exports CSV / XLSX de la page sont remplacés dans l'archive de la date
+# de l'instantané, et l'historique Parquet de cette date est réécrit. L'état
+# de détection de changements n'est pas modifié. La ré-extraction demande les
+# dépendances de requirements-dev.txt (lxml, cssselect) ; la capture, non.
+# ---------------------------------------------------------------------------
+
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.common.export_utils import export_rows
+from src.common.history import write_history
+from src.common.records import CARD_COLUMNS, CardRow
+from src.common.resolution_store import normalize_label
+
+SNAPSHOT_DIR = Path("output") / "snapshots"
+ENABLED = os.getenv("DOM_SNAPSHOTS", "0") == "1"
+
+# Bannière OneTrust rejouée : les scrapers l'attendent à chaque chargement (accept_cookies)
+CONSENT_BANNER = '<div id="onetrust-banner-sdk"><button id="onetrust-accept-btn-handler">Accepter</button></div>'
+# Grandes cartes de page_en_sur_demande, nommées par leur index Swiper (task_label)
+SID_LABEL = re.compile(r"Carte SID (\d+)$")
+BLOCKS_HTML_JS = "return Array.from(document.querySelectorAll('app-page-block')).map(b => b.outerHTML);"
+
+# ---- capture ----------------------------------------------------------------
+def capture_blocks(dr) -> list[str]:
+    """HTML de tous les blocs de la page courante, en un seul aller-retour WebDriver."""
+    return dr.execute_script(BLOCKS_HTML_JS) or []
+
+def snapshot_file(page: str, date: str | None = None) -> Path:
+    return SNAPSHOT_DIR / (date or datetime.now().strftime("%Y-%m-%d")) / f"{page}.json.gz"
+
+def write_snapshot(page: str, url: str, blocks: list[str], rows, date: str | None = None) -> Path:
+    """Enregistre les blocs et les lignes du run (écriture atomique, gzip)."""
+    f = snapshot_file(page, date)
+    f.parent.mkdir(parents=True, exist_ok=True)
+    data = {"page": page, "url": url, "captured": datetime.now().isoformat(timespec="seconds"),
+            "blocks": blocks, "rows": [list(r) for r in rows]}
+    tmp = f.with_name(f.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as out:
+        json.dump(data, out, ensure_ascii=False)
+    tmp.replace(f)
+    return f
+
+def load_snapshot(page: str, date: str | None = None) -> dict:
+    """Instantané d'une page à une date (par défaut : le plus récent)."""
+    if date is None:
+        dates = snapshot_dates(page)
+        if not dates:
+            raise FileNotFoundError(f"aucun instantané pour {page} dans {SNAPSHOT_DIR}")
+        date = dates[-1]
+    with gzip.open(snapshot_file(page, date), "rt", encoding="utf-8") as f:
+        snap = json.load(f)
+    snap["date"] = date
+    return snap
+
+def snapshot_dates(page: str) -> list[str]:
+    return sorted(d.name for d in SNAPSHOT_DIR.glob("*") if (d / f"{page}.json.gz").exists())
+
+def snapshot_pages(date: str) -> list[str]:
+    return sorted(f.name.removesuffix(".json.gz") for f in (SNAPSHOT_DIR / date).glob("*.json.gz"))
+
+# ---- reconstruction ---------------------------------------------------------
+def _candidates(node) -> set[str]:
+    """Libellés normalisés sous lesquels une carte a pu être exportée (cf. LABEL_STRATEGIES)."""
+    vals = [node.get("aria-label")]
+    vals += [e.get("aria-label") for e in node.cssselect("[role='link'][aria-label]")]
+    vals += [e.text_content() for e in node.cssselect("span[aria-hidden], h2, h3")]
+    return {k for k in (normalize_label(v or "") for v in vals) if k}
+
+def _matches(cands: set[str], key: str) -> bool:
+    # « Titre du carrousel - Libellé » : le libellé exporté peut être un suffixe nettoyé
+    return any(c == key or c.endswith(" " + key) for c in cands)
+
+def _point_to(node, url: str):
+    """La carte (et ses liens internes) mènent désormais à l'URL résolue."""
+    for el in [node, *node.cssselect("a, [role='link']")]:
+        el.set("href", url)
+
+def rebuild_page(snap: dict) -> tuple[str, int, int]:
+    """HTML de la page avec les URL résolues réinjectées ; retourne (html, lignes placées, lignes orphelines)."""
+    from lxml import html as lxml_html   # requirements-dev.txt, comme le faux WebDriver
+
+    par_bloc: dict[int, list[CardRow]] = {}
+    for r in map(CardRow.from_row, snap["rows"]):
+        par_bloc.setdefault(r.carrousel, []).append(r)
+    blocs, placees, orphelines = [], 0, 0
+    for idx, fragment in enumerate(snap["blocks"], 1):
+        bloc = lxml_html.fragment_fromstring(fragment)
+        slides = bloc.cssselect("swiper-slide, app-slide")
+        cands = [(s, _candidates(s)) for s in slides]
+        for r in par_bloc.get(idx, []):
+            if r.carte == "Voir plus":
+                cibles = [e for e in bloc.cssselect("a, [role='link'][aria-label]")
+                          if "voir plus" in (e.text_content() if e.tag == "a" else e.get("aria-label") or "").lower()]
+                cibles = cibles[:1]
+            elif sid := SID_LABEL.match(str(r.carte)):
+                cibles = [s for s in slides if s.get("data-swiper-slide-index") == sid[1]]
+            else:
+                key = normalize_label(str(r.carte))
+                cibles = [s for s, c in cands if key and _matches(c, key)]   # copies (clones) comprises
+            for el in cibles:
+                _point_to(el, r.url)
+            placees += bool(cibles)
+            orphelines += not cibles
+        blocs.append(lxml_html.tostring(bloc, encoding="unicode"))
+    return '<html><head></head><body>' + CONSENT_BANNER + "".join(blocs) + '</body></html>', placees, orphelines
+
+# ---- ré-extraction ----------------------------------------------------------
+def reextract(page: str, date: str | None = None, write: bool = True) -> tuple[list[CardRow], dict]:
+    """Rejoue le scraper de `page` sur son instantané ; retourne (lignes, bilan)."""
+    from src.common.fake_driver import run_scraper_on_fake
+    from src.common.service import find_scraper, load_scrapers
+
+    t0 = time.perf_counter()
+    mod = find_scraper(load_scrapers(), page)
+    snap = load_snapshot(mod.PAGE, date)
+    html, placees, orphelines = rebuild_page(snap)
+    res = run_scraper_on_fake(mod.__name__, {mod.URL: html})
+    rows = [CardRow.from_row(r) for _, lignes in res.exports.values() for r in lignes]
+    anciennes = [CardRow.from_row(r) for r in snap["rows"]]
+    bilan = {"date": snap["date"], "lignes": len(rows), "avant": len(anciennes),
+             "modifiees": len(set(rows) ^ set(anciennes)) // 2 if len(rows) == len(anciennes) else None,
+             "orphelines": orphelines, "placees": placees, "secondes": time.perf_counter() - t0}
+    if write:
+        export_rows(rows, CARD_COLUMNS, "output", f"carrousels_cards_url_{mod.PAGE}", date=snap["date"])
+        write_history(mod.PAGE, rows, snap["date"])
+    return rows, bilan
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Ré-extraction des exports depuis les instantanés DOM (sans navigateur).")
+    p.add_argument("pages", nargs="*", help="page(s) à ré-extraire (nom de page, de module ou numéro)")
+    p.add_argument("--date", help="date de l'instantané (défaut : le plus récent de chaque page)")
+    p.add_argument("--all", action="store_true", help="toutes les pages ayant un instantané à --date")
+    p.add_argument("--dry-run", action="store_true", help="compare sans réécrire l'archive ni l'historique")
+    args = p.parse_args(argv)
+    if args.all:
+        if not args.date:
+            p.error("--all exige --date")
+        pages = snapshot_pages(args.date)
+    else:
+        pages = args.pages
+    if not pages:
+        p.error("aucune page à ré-extraire")
+    for page in pages:
+        rows, b = reextract(page, args.date, write=not args.dry_run)
+        diff = f"{b['modifiees']} ligne(s) modifiée(s)" if b["modifiees"] is not None else f"{b['avant']} ligne(s) avant"
+        print(f"{page} ({b['date']}) : {b['lignes']} ligne(s) en {b['secondes']:.1f} s, {diff}"
+              + (f", {b['orphelines']} URL non replacée(s)" if b["orphelines"] else "")
+              + (" [simulation]" if args.dry_run else ""))
+
+if __name__ == "__main__":
+    main()
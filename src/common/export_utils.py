@@ -1,22 +1,165 @@
-import csv
-from pathlib import Path
-from datetime import datetime
-import pandas as pd
-
-def ensure_output_dir(path: str | Path) -> Path:
-    p = Path(path)
-    p.mkdir(parents=True, exist_ok=True)
-    return p
-
-def export_rows(rows, columns, out_dir: str | Path, base_name: str):
-    out = ensure_output_dir(out_dir)
-    date = datetime.now().strftime("%Y-%m-%d")
-    base = f"{base_name}_{date}"
-    csv_f = out / f"{base}.csv"
-    xlsx_f = out / f"{base}.xlsx"
-
-    with csv_f.open('w', newline='', encoding='utf-8') as f:
-        csv.writer(f, delimiter=';').writerows([columns, *rows])
-
-    pd.DataFrame(rows, columns=columns).to_excel(xlsx_f, index=False)
-    return csv_f, xlsx_f
+import csv
+import io
+import os
+import time
+import zipfile
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from datetime import datetime
+import pandas as pd
+
+ARCHIVE_PREFIX = "rapport_hebdomadaire"
+LOCK_TIMEOUT_S = 300   # au-delà, un verrou est considéré comme orphelin (processus tué)
+
+# Politique de compression par membre : un .xlsx est déjà un ZIP, le recompresser
+# ne fait que coûter du CPU ; le CSV (texte) se compresse très bien.
+COMPRESSION_BY_SUFFIX = {
+    ".xlsx": zipfile.ZIP_STORED,
+    ".csv": zipfile.ZIP_DEFLATED,
+}
+
+def ensure_output_dir(path: str | Path) -> Path:
+    p = Path(path)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+def archive_path(out_dir: str | Path, date: str | None = None) -> Path:
+    """Chemin de l'archive datée (rapport_hebdomadaire_AAAA-MM-JJ.zip)."""
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    return Path(out_dir) / f"{ARCHIVE_PREFIX}_{date}.zip"
+
+@contextmanager
+def file_lock(path: str | Path, timeout: float = LOCK_TIMEOUT_S):
+    """
+    Verrou inter-processus sur un fichier partagé (fichier .lock voisin créé en exclusif) :
+    archive datée, registre de sélecteurs, délais appris… deux processus ne le lisent /
+    réécrivent jamais en même temps.
+    """
+    lock = Path(f"{path}.lock")
+    ensure_output_dir(lock.parent)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            with suppress(OSError):
+                if time.time() - lock.stat().st_mtime > timeout:
+                    lock.unlink()
+                    continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"fichier verrouillé depuis plus de {timeout:g} s : {lock}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        with suppress(OSError):
+            lock.unlink()
+
+def _compression_for(name: str) -> int:
+    return COMPRESSION_BY_SUFFIX.get(Path(name).suffix.lower(), zipfile.ZIP_DEFLATED)
+
+def _rewrite_with(zip_f: Path, members: dict[str, bytes]):
+    """
+    Réécrit l'archive en une passe : membres conservés puis nouveaux membres (cas d'un
+    scraper relancé le même jour). Tout passe par un .zip.tmp remplacé atomiquement :
+    un échec en cours d'écriture laisse l'archive d'origine intacte.
+    """
+    tmp = zip_f.with_suffix(".zip.tmp")
+    try:
+        with zipfile.ZipFile(zip_f) as src, zipfile.ZipFile(tmp, "w") as dst:
+            for info in src.infolist():
+                if info.filename not in members:
+                    dst.writestr(info, src.read(info.filename), compress_type=info.compress_type)
+            for name, data in members.items():
+                dst.writestr(name, data, compress_type=_compression_for(name))
+        os.replace(tmp, zip_f)
+    finally:
+        with suppress(OSError):
+            tmp.unlink()
+
+def _append(zip_f: Path, members: dict[str, bytes]):
+    ensure_output_dir(zip_f.parent)
+    if zip_f.exists():
+        with zipfile.ZipFile(zip_f) as zf:
+            dup = set(members) & set(zf.namelist())
+        if dup:
+            _rewrite_with(zip_f, members)
+            return
+
+    start_dir, tail = None, b""
+    if zip_f.exists():
+        with zipfile.ZipFile(zip_f) as zf:
+            start_dir = zf.start_dir
+        with zip_f.open("rb") as f:
+            f.seek(start_dir)
+            tail = f.read()
+
+    try:
+        with zipfile.ZipFile(zip_f, "a" if start_dir is not None else "w") as zf:
+            for name, data in members.items():
+                zf.writestr(name, data, compress_type=_compression_for(name))
+    except BaseException:
+        if start_dir is None:
+            with suppress(OSError):
+                zip_f.unlink()
+        else:
+            with zip_f.open("r+b") as f:
+                f.seek(start_dir)
+                f.write(tail)
+                f.truncate()
+        raise
+
+def append_to_archive(zip_f: str | Path, members: dict[str, bytes]) -> Path:
+    """
+    Ajoute les membres {nom: contenu} à l'archive datée.
+    L'archive reste valide si l'ajout échoue : le répertoire central d'origine
+    est restauré (ou, en cas de remplacement, la copie temporaire est abandonnée),
+    les membres déjà présents ne sont donc jamais perdus.
+    """
+    zip_f = Path(zip_f)
+    with file_lock(zip_f):
+        _append(zip_f, members)
+    return zip_f
+
+def render_members(rows, columns, base: str) -> dict[str, bytes]:
+    """Produit en mémoire le CSV (;) et le XLSX d'un jeu de lignes."""
+    buf = io.StringIO(newline="")
+    csv.writer(buf, delimiter=';').writerows([columns, *rows])
+    xlsx = io.BytesIO()
+    # dtype=object : la colonne « # » (entiers + cases vides) ne doit pas devenir float
+    pd.DataFrame(rows, columns=columns, dtype=object).to_excel(xlsx, index=False)
+    return {f"{base}.csv": buf.getvalue().encode("utf-8"), f"{base}.xlsx": xlsx.getvalue()}
+
+def export_rows(rows, columns, out_dir: str | Path, base_name: str, date: str | None = None):
+    """Écrit CSV + XLSX directement dans l'archive datée (du jour par défaut) ; retourne (zip, [membres])."""
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    members = render_members(rows, columns, f"{base_name}_{date}")
+    zip_f = append_to_archive(archive_path(out_dir, date), members)
+    return zip_f, list(members)
+
+EXPORT_PREFIX = "carrousels_cards_url_"
+
+INT_COLUMNS = {"# Carrousel", "#"}
+
+def parse_row(columns, row) -> list:
+    """Ligne relue d'un CSV : seules les colonnes entières (# Carrousel, #) redeviennent des int."""
+    return [int(v) if c in INT_COLUMNS and v.isdigit() else v for c, v in zip(columns, row)]
+
+def read_exports(zip_f: str | Path) -> dict[str, tuple[list, list]]:
+    """{base: (colonnes, lignes)} pour chaque CSV d'export présent dans l'archive."""
+    exports = {}
+    with file_lock(zip_f), zipfile.ZipFile(zip_f) as zf:
+        for name in zf.namelist():
+            if name.startswith(EXPORT_PREFIX) and name.endswith(".csv"):
+                text = zf.read(name).decode("utf-8")
+                header, *rows = list(csv.reader(io.StringIO(text, newline=""), delimiter=';'))
+                exports[Path(name).stem] = (header, [parse_row(header, r) for r in rows])
+    return exports
+
+def replace_exports(zip_f: str | Path, exports: dict[str, tuple[list, list]]) -> Path:
+    """Réécrit les CSV + XLSX des exports donnés (ex. après ajout de colonnes)."""
+    members = {}
+    for base, (columns, rows) in exports.items():
+        members.update(render_members(rows, columns, base))
+    return append_to_archive(zip_f, members)
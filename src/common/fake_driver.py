@@ -0,0 +1,460 @@
+# src/common/fake_driver.py
+# ---------------------------------------------------------------------------
+# Faux WebDriver en mémoire pour profiler / benchmarker les boucles des
+# scrapers sans Chrome ni site réel.
+#  – DOM construit à partir de fixtures HTML (lxml) ; XPath et sélecteurs CSS
+#    évalués comme dans le navigateur
+#  – simule ce que les scrapers utilisent : find_element(s), get_attribute,
+#    text, click, execute_script (scroll, click, removeAttribute, inventaire),
+#    execute_async_script (chargement des blocs), current_url, get, back,
+#    instantané des blocs (src/common/dom_snapshots.py),
+#    onglets (liens target=_blank, window_handles, switch_to.window, close)
+#  – flèches Swiper / Slick simulées (diapo active, fenêtre visible)
+#  – latence configurable par commande, compteur de commandes par type
+#
+# Utilisation :
+#   python -m src.common.fake_driver src.scrapers.1_page_acceuil_carrousels_card_voir_plus
+#   python -m src.common.fake_driver <module> --latency-ms 3 --carousels 8 --cards 15
+#   python -m src.common.fake_driver <module> --html page.html   (fixture enregistrée)
+# ou depuis pytest : run_scraper_on_fake("src.scrapers.<module>", ...)
+# ---------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.timeouts import Timeouts
+
+from src.common.change_detection import INVENTORY_JS
+from src.common.dom_snapshots import BLOCKS_HTML_JS
+from src.common.export_utils import archive_path, read_exports
+from src.common.page_loader import LOAD_BLOCKS_JS
+
+BLANK = "<html><head></head><body></body></html>"
+SLICK_WINDOW = 5
+
+def _norm(s: str | None) -> str:
+    return " ".join((s or "").split())
+
+class FakeElement:
+    def __init__(self, driver: "FakeDriver", node):
+        self._dr = driver
+        self._node = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other._node is self._node
+
+    def __hash__(self):
+        return id(self._node)
+
+    @property
+    def tag_name(self) -> str:
+        return self._node.tag
+
+    @property
+    def text(self) -> str:
+        self._dr._cmd("getElementText")
+        return _norm(self._node.text_content())
+
+    def get_attribute(self, name: str):
+        self._dr._cmd("getElementAttribute")
+        return self._node.get(name)
+
+    def is_displayed(self) -> bool:
+        self._dr._cmd("isElementDisplayed")
+        return "display:none" not in (self._node.get("style") or "").replace(" ", "")
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def click(self):
+        self._dr._cmd("clickElement")
+        self._dr._click(self._node)
+
+    def find_element(self, by=By.ID, value=None):
+        return self._dr._find(self._node, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._dr._find(self._node, by, value, single=False)
+
+class FakeDriver:
+    """WebDriver simulé ; `pages` associe une URL à son HTML (page vide sinon)."""
+
+    def __init__(self, pages: dict[str, str], latency: float = 0.0):
+        self.pages = pages
+        self.latency = latency
+        self.commands = Counter()
+        self.current_url = "about:blank"
+        self._history: list[str] = []
+        self._doc = lxml_html.document_fromstring(BLANK)
+        self.current_window_handle = "W0"
+        self._windows: dict[str, tuple] = {}   # onglets en arrière-plan : (url, doc, historique)
+        self._next_window = 1
+        self.script_timeout = 30.0   # délai par défaut de Selenium
+
+    # ---- infrastructure ----------------------------------------------------
+    def execute(self, command: str, params=None) -> dict:
+        """Passage obligé de chaque commande, comme WebDriver.execute (que ManagedDriver enveloppe)."""
+        self.commands[command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"value": None}
+
+    def _cmd(self, name: str):
+        self.execute(name)
+
+    def _load(self, url: str):
+        self.current_url = url
+        self._doc = lxml_html.document_fromstring(self.pages.get(url, BLANK))
+        for block in self._doc.iter("app-page-block"):
+            self._init_swiper(block)
+            self._init_slick(block)
+
+    def _find(self, root, by, value, single: bool):
+        self._cmd("findElement" if single else "findElements")
+        if by == By.XPATH:
+            nodes = root.xpath(value)
+        elif by == By.CSS_SELECTOR:
+            nodes = root.cssselect(value)
+        elif by == By.TAG_NAME:
+            nodes = root.xpath(f".//{value}")
+        elif by == By.ID:
+            nodes = root.xpath(".//*[@id=$v]", v=value)
+        elif by == By.CLASS_NAME:
+            nodes = root.cssselect(f".{value}")
+        else:
+            raise NotImplementedError(f"Stratégie non simulée : {by}")
+        nodes = [n for n in nodes if isinstance(n, lxml_html.HtmlElement) and n is not root]
+        if single:
+            if not nodes:
+                raise NoSuchElementException(f"{by}={value}")
+            return FakeElement(self, nodes[0])
+        return [FakeElement(self, n) for n in nodes]
+
+    # ---- API WebDriver utilisée par les scrapers ----------------------------
+    def get(self, url: str):
+        self._cmd("get")
+        if self.current_url != "about:blank":
+            self._history.append(self.current_url)
+        self._load(url)
+
+    def back(self):
+        self._cmd("goBack")
+        if self._history:
+            self._load(self._history.pop())
+
+    # ---- onglets -----------------------------------------------------------
+    @property
+    def window_handles(self) -> list[str]:
+        self._cmd("getWindowHandles")
+        return [self.current_window_handle, *self._windows]
+
+    @property
+    def switch_to(self):
+        return SimpleNamespace(window=self._switch_window)
+
+    def _switch_window(self, handle: str):
+        self._cmd("switchToWindow")
+        if handle == self.current_window_handle:
+            return
+        state = self._windows.pop(handle)
+        if self.current_window_handle is not None:   # onglet courant fermé : rien à garder
+            self._windows[self.current_window_handle] = (self.current_url, self._doc, self._history)
+        self.current_window_handle = handle
+        url, doc, self._history = state
+        if doc is None:
+            self._load(url)
+        else:
+            self.current_url, self._doc = url, doc
+
+    def close(self):
+        self._cmd("closeWindow")
+        self.current_url, self._doc, self._history = "about:blank", lxml_html.document_fromstring(BLANK), []
+        self.current_window_handle = None   # comme Chrome : il faut changer d'onglet
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(self._doc, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(self._doc, by, value, single=False)
+
+    def execute_script(self, js: str, *args):
+        self._cmd("executeScript")
+        if js == INVENTORY_JS:
+            return self._inventory()
+        if js == BLOCKS_HTML_JS:
+            return [lxml_html.tostring(b, encoding="unicode") for b in self._doc.xpath("//app-page-block")]
+        if "document.readyState" in js:
+            return "complete"
+        if "removeAttribute('target')" in js:
+            args[0]._node.attrib.pop("target", None)
+        elif ".target = " in js:
+            args[0]._node.set("target", args[0]._node.get("target") or "_blank")
+        elif "arguments[0].click()" in js:
+            self._click(args[0]._node)
+        elif "scrollY" in js:
+            return 0
+        return None   # scrollIntoView, scrollTo, performance.memory…
+
+    def execute_async_script(self, js: str, *args):
+        self._cmd("executeAsyncScript")
+        if js == LOAD_BLOCKS_JS:
+            return len(self._doc.xpath("//app-page-block"))
+        return None
+
+    def execute_cdp_cmd(self, cmd: str, params: dict):
+        self._cmd("executeCdpCommand")
+        return {}
+
+    @property
+    def timeouts(self) -> Timeouts:
+        self._cmd("getTimeouts")
+        return Timeouts(script=self.script_timeout)
+
+    def set_script_timeout(self, seconds: float):
+        self._cmd("setTimeouts")
+        self.script_timeout = seconds
+
+    def get_cookies(self):
+        return []
+
+    def save_screenshot(self, path) -> bool:
+        return True
+
+    def quit(self):
+        self._cmd("quit")
+
+    # ---- simulation des carrousels ------------------------------------------
+    @staticmethod
+    def _swiper_slides(block):
+        return [s for s in block.iter("swiper-slide") if "-duplicate" not in (s.get("class") or "")]
+
+    def _init_swiper(self, block):
+        slides = self._swiper_slides(block)
+        if slides and not any("swiper-slide-active" in (s.get("class") or "") for s in slides):
+            slides[0].set("class", _norm(f"{slides[0].get('class') or ''} swiper-slide-active"))
+
+    def _swiper_next(self, block):
+        slides = self._swiper_slides(block)
+        if not slides:
+            return
+        i = next((k for k, s in enumerate(slides) if "swiper-slide-active" in (s.get("class") or "")), -1)
+        if i >= 0:
+            slides[i].set("class", _norm((slides[i].get("class") or "").replace("swiper-slide-active", "")))
+        nxt = slides[(i + 1) % len(slides)]
+        nxt.set("class", _norm(f"{nxt.get('class') or ''} swiper-slide-active"))
+
+    def _init_slick(self, block, start: int = 0):
+        slides = [s for s in block.iter("app-slide") if "slick-cloned" not in (s.get("class") or "")]
+        if not slides:
+            return
+        block.set("data-fake-start", str(start))
+        for k, s in enumerate(slides):
+            s.set("aria-hidden", "false" if start <= k < start + SLICK_WINDOW else "true")
+        for s in block.iter("app-slide"):
+            if "slick-cloned" in (s.get("class") or ""):
+                s.set("aria-hidden", "true")
+        for nxt in block.cssselect(".slick-next"):
+            cls = (nxt.get("class") or "").replace("slick-disabled", "")
+            if start + SLICK_WINDOW >= len(slides):
+                cls += " slick-disabled"
+            nxt.set("class", _norm(cls))
+
+    def _slick_next(self, block):
+        start = int(block.get("data-fake-start") or 0)
+        total = sum(1 for s in block.iter("app-slide") if "slick-cloned" not in (s.get("class") or ""))
+        if start + SLICK_WINDOW < total:
+            self._init_slick(block, start + SLICK_WINDOW)
+
+    def _click(self, node):
+        if node.get("id") == "onetrust-accept-btn-handler":
+            node.getparent().remove(node)
+            return
+        cls = node.get("class") or ""
+        block = next(node.iterancestors("app-page-block"), None)
+        if block is not None and "ic-arrow-right-bg" in cls:
+            return self._swiper_next(block)
+        if block is not None and "slick-next" in cls:
+            return self._slick_next(block)
+        link = node if node.get("href") else next((a for a in node.iterancestors() if a.get("href")), None)
+        if link is None:
+            inner = node.xpath(".//a[@href]")
+            link = inner[0] if inner else None
+        if link is not None and link.get("target") not in (None, "", "_self"):
+            # Nouvel onglet, chargé quand on y bascule ; la page courante ne bouge pas
+            self._windows[f"W{self._next_window}"] = (urljoin(self.current_url, link.get("href")), None, [])
+            self._next_window += 1
+        elif link is not None:
+            self._history.append(self.current_url)
+            self._load(urljoin(self.current_url, link.get("href")))
+
+    def _inventory(self) -> list[dict]:
+        """Équivalent Python de change_detection.INVENTORY_JS."""
+        out = []
+        for i, b in enumerate(self._doc.xpath("//app-page-block"), 1):
+            title = b.cssselect(".block-title")
+            swiper, slick = b.cssselect("swiper-slide"), b.cssselect("app-slide")
+            labels = []
+            if swiper:
+                for sl in self._swiper_slides(b):
+                    lab = _norm(sl.get("aria-label"))
+                    if not lab or lab.replace(" ", "").replace("/", "").isdigit():
+                        inner = sl.cssselect("div[role='link'][aria-label]")
+                        lab = _norm(inner[0].get("aria-label")) if inner else ""
+                    if not lab:
+                        t = sl.cssselect("span[aria-hidden], h2, h3")
+                        lab = _norm(t[0].text_content()) if t else ""
+                    labels.append(lab)
+            elif slick:
+                for s in slick:
+                    if "slick-cloned" in (s.get("class") or ""):
+                        continue
+                    t = s.cssselect("h3 span[aria-hidden='true']")
+                    if t and _norm(t[0].text_content()):
+                        labels.append(_norm(t[0].text_content()))
+            voir_plus = ""
+            for el in b.cssselect("a, [role=link][aria-label]"):
+                txt = _norm(el.text_content() if el.tag == "a" else el.get("aria-label")).lower()
+                if "voir plus" in txt:
+                    voir_plus = urljoin(self.current_url, el.get("href")) if el.get("href") else (el.get("aria-label") or "voir plus")
+                    break
+            out.append({"idx": i, "titre": _norm(title[0].text_content()) if title else "",
+                        "type": "Grande" if swiper else ("Petite" if slick else "Inconnu"),
+                        "labels": labels, "voir_plus": voir_plus})
+        return out
+
+# -------------------- FIXTURES SYNTHÉTIQUES --------------------------------
+def synthetic_page(n_swiper: int = 2, n_slick: int = 4, cards: int = 12) -> str:
+    """Page déterministe : n_swiper grandes + n_slick petites carrousels, libellés partagés entre blocs."""
+    blocks = []
+    for k in range(n_swiper + n_slick):
+        titre = f"Carrousel {k + 1}"
+        labels = [f"Émission {(k * 7 + i) % 40}" for i in range(cards)]
+        href = lambda lab: "/emission/" + lab.split()[-1]
+        voir = f'<a href="/categorie/{k + 1}">Voir plus</a>'
+        if k < n_swiper:
+            slides = "".join(
+                f'<swiper-slide class="{cls}" data-swiper-slide-index="{i}" aria-label="{i + 1} / {cards}">'
+                f'<div role="link" aria-label="{titre} - {lab}"><a href="{href(lab)}"><h3>{lab}</h3></a></div>'
+                f'</swiper-slide>'
+                for cls in ("swiper-slide", "swiper-slide swiper-slide-duplicate") for i, lab in enumerate(labels)
+            )
+            body = f'<swiper-container>{slides}</swiper-container><button class="ic-arrow-right-bg"></button>'
+        else:
+            slides = "".join(
+                f'<app-slide class="{cls}"><a href="{href(lab)}"><h3><span aria-hidden="true">{lab}</span></h3></a></app-slide>'
+                for cls in ("slick-slide", "slick-slide slick-cloned") for lab in labels
+            )
+            body = f'<div class="slick-track">{slides}</div><button class="slick-next slick-arrow"></button>'
+        blocks.append(f'<app-page-block><h2 class="block-title">{titre}</h2>{voir}{body}</app-page-block>')
+    return (
+        '<html><head></head><body>'
+        '<div id="onetrust-banner-sdk"><button id="onetrust-accept-btn-handler">Accepter</button></div>'
+        + "".join(blocks) + '</body></html>'
+    )
+
+# -------------------- HARNAIS ----------------------------------------------
+@dataclass
+class BenchResult:
+    scraper: str
+    seconds: float
+    rows: int
+    drivers: int
+    sleep_requested: float
+    commands: Counter = field(default_factory=Counter)
+    stdout: str = ""
+    exports: dict = field(default_factory=dict)   # {base: (en-tête, lignes)} relus de l'archive
+
+def run_scraper_on_fake(module_name: str, pages: dict[str, str] | None = None, latency: float = 0.0,
+                        skip_sleeps: bool = True, tabs: int | None = None, shard: tuple[int, int] | None = None,
+                        workdir: str | Path | None = None, run_id: str | None = None, **page_kwargs) -> BenchResult:
+    """
+    Exécute `run()` d'un scraper contre le faux driver, dans un dossier temporaire
+    (ou `workdir`, conservé : ex. shards à fusionner ensuite).
+    Les time.sleep / settle() du scraper sont comptabilisés sans attendre si skip_sleeps.
+    `tabs` remplace CARD_TABS du scraper (mode onglets) ; `shard` (i, N) ne traite que
+    cette part, sans archive ; `run_id` fixe COLLECTOR_RUN_ID (partagé par des shards).
+    """
+    from src.common import tab_resolver
+    cwd = os.getcwd()
+    with (contextlib.nullcontext(workdir) if workdir else tempfile.TemporaryDirectory()) as tmp:
+        os.chdir(tmp)
+        mod = importlib.import_module(module_name)
+        pages = pages or {mod.URL: synthetic_page(**page_kwargs)}
+        drivers: list[FakeDriver] = []
+        slept = [0.0]
+
+        def factory(*a, **k):
+            drivers.append(FakeDriver(pages, latency))
+            return drivers[-1]
+
+        def fake_sleep(s, dr=None):   # time.sleep(s) et settle(s, dr)
+            slept[0] += s
+
+        saved = {name: getattr(mod, name) for name in ("new_driver", "settle", "time", "CARD_TABS") if hasattr(mod, name)}
+        saved_tab_settle = tab_resolver.settle
+        old_run_id = os.environ.get("COLLECTOR_RUN_ID")
+        os.environ["COLLECTOR_RUN_ID"] = run_id or f"bench-{time.time_ns()}"
+        mod.new_driver = factory
+        if tabs is not None:
+            mod.CARD_TABS = tabs
+        if skip_sleeps:
+            mod.settle = tab_resolver.settle = fake_sleep
+            mod.time = SimpleNamespace(sleep=fake_sleep, time=time.time, perf_counter=time.perf_counter,
+                                       monotonic=time.monotonic)
+        out = io.StringIO()
+        try:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(out):
+                mod.run(force=True, engine="selenium", shard=shard)   # jamais de requête HTTP réelle
+            seconds = time.perf_counter() - t0
+            exports = read_exports(archive_path("output")) if archive_path("output").exists() else {}
+            rows = sum(len(r) for _, r in exports.values())
+        finally:
+            for name, value in saved.items():
+                setattr(mod, name, value)
+            tab_resolver.settle = saved_tab_settle
+            if old_run_id is None:
+                os.environ.pop("COLLECTOR_RUN_ID", None)
+            else:
+                os.environ["COLLECTOR_RUN_ID"] = old_run_id
+            os.chdir(cwd)
+    commands = sum((d.commands for d in drivers), Counter())
+    return BenchResult(module_name, seconds, rows, len(drivers), slept[0], commands, out.getvalue(), exports)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark d'un scraper contre le faux WebDriver.")
+    p.add_argument("module", help="ex. src.scrapers.1_page_acceuil_carrousels_card_voir_plus")
+    p.add_argument("--latency-ms", type=float, default=0.0, help="latence simulée par commande WebDriver")
+    p.add_argument("--html", type=Path, help="fixture HTML à servir à l'URL du scraper (sinon page synthétique)")
+    p.add_argument("--carousels", type=int, default=6, help="page synthétique : nombre de carrousels")
+    p.add_argument("--cards", type=int, default=12, help="page synthétique : cartes par carrousel")
+    p.add_argument("--keep-sleeps", action="store_true", help="conserve les time.sleep réels du scraper")
+    p.add_argument("--tabs", type=int, help="mode onglets : nombre d'onglets par lot (CARD_TABS)")
+    args = p.parse_args(argv)
+
+    pages = None
+    if args.html:
+        pages = {importlib.import_module(args.module).URL: args.html.read_text(encoding="utf-8")}
+    n_swiper = args.carousels // 3
+    res = run_scraper_on_fake(args.module, pages, args.latency_ms / 1000, not args.keep_sleeps, args.tabs,
+                              n_swiper=n_swiper, n_slick=args.carousels - n_swiper, cards=args.cards)
+    print(f"{res.scraper} : {res.seconds * 1000:.1f} ms, {res.rows} lignes, {res.drivers} driver(s), "
+          f"{sum(res.commands.values())} commandes, {res.sleep_requested:.2f} s de pauses demandées")
+    for name, n in res.commands.most_common():
+        print(f"  {name:<22} {n}")
+
+if __name__ == "__main__":
+    main()
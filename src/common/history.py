@@ -0,0 +1,101 @@
+# src/common/history.py
+# ---------------------------------------------------------------------------
+# Historique hebdomadaire en colonnes (Parquet, partitionné à la Hive) :
+#   output/history/date=AAAA-MM-JJ/page=<page>/lignes.parquet
+# Chaque export (scraper ou fusion de shards) y écrit ses CardRow à côté du
+# CSV / XLSX de l'archive ; les semaines précédentes ne sont jamais réécrites
+# (un run relancé le même jour remplace seulement sa propre partition).
+# Relire un an d'historique ne demande qu'un scan Parquet, filtré par date et
+# par page, au lieu de décompresser 52 archives et de relire leurs XLSX :
+#   python -m src.common.history [--page page_acceuil] [--since 2025-01-01]
+# ---------------------------------------------------------------------------
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.common.records import CardRow
+
+HISTORY_DIR = Path("output") / "history"
+
+SCHEMA = pa.schema([
+    ("carrousel", pa.int16()),
+    ("type", pa.dictionary(pa.int8(), pa.string())),
+    ("titre", pa.string()),
+    ("ordre", pa.int16()),
+    ("carte", pa.string()),
+    ("url", pa.string()),
+    ("chemin", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("page", pa.string())]), flavor="hive")
+
+def to_table(rows) -> pa.Table:
+    """CardRow (ou lignes relues) → table typée ; les colonnes en trop (statut HTTP…) sont ignorées."""
+    recs = [r if isinstance(r, CardRow) else CardRow.from_row(r) for r in rows]
+    cols = list(zip(*recs)) if recs else [[] for _ in CardRow._fields]
+    arrays = [pa.array(c, type=f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+              for c, f in zip(cols, SCHEMA)]
+    arrays[1] = arrays[1].dictionary_encode()
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+def write_history(page: str, rows, date: str | None = None) -> Path:
+    """Écrit (ou remplace) la partition date/page de l'historique."""
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    folder = HISTORY_DIR / f"date={date}" / f"page={page}"
+    folder.mkdir(parents=True, exist_ok=True)
+    f = folder / "lignes.parquet"
+    tmp = f.with_suffix(".parquet.tmp")
+    pq.write_table(to_table(rows), tmp, compression="zstd")
+    tmp.replace(f)
+    return f
+
+def load_history(pages=None, since: str | None = None, until: str | None = None) -> pa.Table:
+    """Tout l'historique (colonnes date et page incluses), filtré sur les partitions."""
+    if not HISTORY_DIR.exists():
+        return pa.Table.from_batches([], schema=SCHEMA.append(pa.field("date", pa.string()))
+                                     .append(pa.field("page", pa.string())))
+    dataset = ds.dataset(HISTORY_DIR, format="parquet", partitioning=PARTITIONING,
+                         exclude_invalid_files=True)
+    flt = None
+    for cond in ((ds.field("page").isin(list(pages)) if pages else None),
+                 (ds.field("date") >= since if since else None),
+                 (ds.field("date") <= until if until else None)):
+        if cond is not None:
+            flt = cond if flt is None else flt & cond
+    return dataset.to_table(filter=flt)
+
+def history_dates(page: str | None = None) -> list[str]:
+    """Dates présentes dans l'historique (d'une page donnée), sans lire les fichiers."""
+    pattern = f"date=*/page={page}/lignes.parquet" if page else "date=*/page=*/lignes.parquet"
+    return sorted({f.parent.parent.name.split("=", 1)[1] for f in HISTORY_DIR.glob(pattern)})
+
+def history_pages(date: str) -> list[str]:
+    """Pages ayant une partition à cette date."""
+    return sorted(f.parent.name.split("=", 1)[1] for f in (HISTORY_DIR / f"date={date}").glob("page=*/lignes.parquet"))
+
+def read_rows(page: str, date: str) -> list[CardRow]:
+    """Lignes d'une partition, redevenues des CardRow."""
+    t = load_history([page], date, date)
+    return [CardRow(*v) for v in zip(*(t.column(c).to_pylist() for c in CardRow._fields))]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Lecture de l'historique hebdomadaire (Parquet).")
+    p.add_argument("--page", action="append", help="page(s) à lire (défaut : toutes)")
+    p.add_argument("--since", help="date minimale AAAA-MM-JJ")
+    p.add_argument("--until", help="date maximale AAAA-MM-JJ")
+    args = p.parse_args(argv)
+    t0 = time.perf_counter()
+    table = load_history(args.page, args.since, args.until)
+    ms = (time.perf_counter() - t0) * 1000
+    counts = table.group_by(["date", "page"]).aggregate([("carte", "count")]).sort_by([("date", "ascending"), ("page", "ascending")])
+    for row in counts.to_pylist():
+        print(f"{row['date']}  {row['page']:<24} {row['carte_count']:>6} lignes")
+    print(f"{table.num_rows} lignes, {len(counts)} partition(s) lues en {ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# src/common/http_extract.py
+# ---------------------------------------------------------------------------
+# Extraction sans navigateur (moteur « http », choisi par page).
+# Le front Angular construit ses blocs et ses cartes à partir de réponses JSON
+# du backend : les lire directement évite le rendu Chrome et un clic par
+# carte. Le moteur :
+#  – lit le JSON de la page (HTTP_PAGE_API, gabarit d'URL) puis, en parallèle,
+#    celui des blocs chargés à part (HTTP_BLOCK_API) avec une seule
+#    ClientSession aiohttp (connexions keep-alive, concurrence bornée)
+#  – reconnaît blocs et cartes par des clés usuelles (title/name, url/path…)
+#    et les projette sur les colonnes des exports ; seuls les liens du site
+#    (URL http(s) du même hôte ou chemin absolu) sont retenus
+#  – marque « non résolu » tout bloc sans cartes exploitables (lien absent ou
+#    douteux, JSON de bloc illisible ou d'une autre forme) : le scraper le
+#    traite alors avec Selenium (repli bloc par bloc)
+# Fixtures : HTTP_FIXTURES=<nom> sert les réponses d'une archive de trafic
+# enregistrée (DRIVER_TRAFFIC=record, output/traffic/<nom>/) depuis un
+# serveur local, sans réseau :
+#   python -m src.common.http_extract https://video.telequebec.tv/ --fixtures page_acceuil
+# ---------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import quote, urljoin, urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from src.common.change_detection import fingerprint
+from src.common.records import CardRow
+from src.common.traffic_archive import TrafficArchive, request_key
+
+PAGE_API = os.getenv("HTTP_PAGE_API", "")      # ex. "https://<api>/pages?path={path}" ({url}, {path}, {origin})
+BLOCK_API = os.getenv("HTTP_BLOCK_API", "")    # ex. "https://<api>/blocks/{id}" (blocs paresseux)
+FIXTURES = os.getenv("HTTP_FIXTURES", "")
+CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "16"))
+TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "20"))
+
+TYPES = {"Grande": "Grande carrousel (swiper)", "Petite": "Petite carrousel (slick)", "Inconnu": "Carrousel inconnu"}
+
+# ---- reconnaissance du JSON -------------------------------------------------
+BLOCK_KEYS = ("blocks", "pageBlocks", "sections", "components", "rows")
+ITEM_KEYS = ("items", "cards", "slides", "contents", "content", "children", "elements")
+TITLE_KEYS = ("title", "titre", "name", "label")
+URL_KEYS = ("url", "path", "href", "link", "slug", "permalink")
+MORE_KEYS = ("seeMore", "voirPlus", "viewMore", "moreLink", "more", "seeAll")
+ID_KEYS = ("id", "blockId", "uuid")
+TYPE_KEYS = ("type", "layout", "template", "style", "variant", "display")
+GRANDE_HINTS = ("hero", "large", "big", "grand", "swiper", "featured", "vedette")
+
+class HttpExtractUnavailable(RuntimeError):
+    """Moteur HTTP non configuré ou JSON de page illisible : tout passe par Selenium."""
+
+def engine_for(page: str) -> str:
+    """Moteur d'une page : EXTRACT_ENGINE_<PAGE>, sinon EXTRACT_ENGINE, sinon « selenium »."""
+    return (os.getenv(f"EXTRACT_ENGINE_{page.upper()}") or os.getenv("EXTRACT_ENGINE") or "selenium").lower()
+
+def _first(d: dict, keys, kind=str):
+    for k in keys:
+        v = d.get(k)
+        if isinstance(v, kind) and v:
+            return v
+    return None
+
+def _site_url(v: str, origin: str) -> str:
+    """URL absolue si `v` est un lien du site (URL http(s) du même hôte ou chemin absolu), sinon ""."""
+    v = v.strip()
+    if not v.startswith(("/", "http://", "https://")) or v.startswith("//"):
+        return ""   # slug nu, identifiant, « # », javascript:, mailto:…
+    url = urljoin(origin + "/", v)
+    parts = urlsplit(url)
+    if parts.netloc != urlsplit(origin).netloc or parts.path in ("", "/"):
+        return ""
+    return url
+
+def _url_of(d: dict, origin: str) -> str:
+    for k in URL_KEYS:
+        v = d.get(k)
+        if isinstance(v, dict):   # ex. "link": {"url": "..."}
+            v = _first(v, URL_KEYS)
+        if isinstance(v, str) and (url := _site_url(v, origin)):
+            return url
+    return ""
+
+def find_blocks(data) -> list[dict]:
+    """Première liste de blocs trouvée en largeur dans le JSON de la page."""
+    queue = [data]
+    while queue:
+        node = queue.pop(0)
+        if isinstance(node, dict):
+            for k in BLOCK_KEYS:
+                if isinstance(node.get(k), list) and any(isinstance(b, dict) for b in node[k]):
+                    return [b for b in node[k] if isinstance(b, dict)]
+            queue += [v for v in node.values() if isinstance(v, (dict, list))]
+        elif isinstance(node, list):
+            queue += [v for v in node if isinstance(v, (dict, list))]
+    return []
+
+@dataclass
+class HttpBlock:
+    idx: int
+    titre: str
+    type: str                                   # "Grande", "Petite" ou "Inconnu"
+    voir_plus: str = ""
+    cards: list[tuple[str, str]] = field(default_factory=list)   # (libellé, URL détail)
+    block_id: str = ""
+
+    @property
+    def resolved(self) -> bool:
+        return bool(self.cards) and all(lab and url for lab, url in self.cards)
+
+    def inventory(self) -> dict:
+        """Même forme qu'une entrée de INVENTORY_JS (détection de changements)."""
+        inv = {"idx": self.idx, "titre": self.titre, "type": self.type,
+               "labels": [lab for lab, _ in self.cards], "voir_plus": self.voir_plus}
+        return {**inv, "fingerprint": fingerprint(inv)}
+
+    def rows(self) -> list[CardRow]:
+        """Lignes au format des exports (CARD_COLUMNS)."""
+        typ = TYPES[self.type]
+        out = [CardRow.make(self.idx, typ, self.titre, None, 'Voir plus', self.voir_plus)] if self.voir_plus else []
+        return out + [CardRow.make(self.idx, typ, self.titre, n, lab, url) for n, (lab, url) in enumerate(self.cards, 1)]
+
+def parse_block(idx: int, raw: dict, origin: str) -> HttpBlock:
+    titre = " ".join((_first(raw, TITLE_KEYS) or f"Carrousel_{idx}").split())
+    items = _first(raw, ITEM_KEYS, list) or []
+    cards = []
+    for it in items:
+        if isinstance(it, dict):
+            lab = " ".join((_first(it, TITLE_KEYS) or "").split())
+            cards.append((lab, _url_of(it, origin)))
+    more = _first(raw, MORE_KEYS, (str, dict))
+    voir_plus = (_url_of(more, origin) if isinstance(more, dict) else _site_url(more, origin)) if more else ""
+    hint = " ".join(str(raw.get(k, "")) for k in TYPE_KEYS).lower()
+    typ = "Grande" if any(h in hint for h in GRANDE_HINTS) else ("Petite" if cards else "Inconnu")
+    return HttpBlock(idx, titre, typ, voir_plus, cards, str(_first(raw, ID_KEYS, (str, int)) or ""))
+
+# ---- client HTTP ------------------------------------------------------------
+@asynccontextmanager
+async def fixture_server(name: str):
+    """Serveur local qui rejoue les réponses GET d'une archive de trafic ; fournit son URL."""
+    archive = TrafficArchive(name)
+
+    async def handler(request):
+        hit = archive.lookup(request_key("GET", request.query["u"]))
+        if hit is None:
+            return web.Response(status=404, text="absent de l'archive")
+        status, headers, body = hit
+        ctype = next((v for n, v in headers if n.lower() == "content-type"), "application/json")
+        return web.Response(status=status, body=body, content_type=ctype.split(";")[0].strip())
+
+    app = web.Application()
+    app.router.add_get("/fixture", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    try:
+        port = runner.addresses[0][1]   # port libre choisi par le système
+        yield f"http://127.0.0.1:{port}/fixture"
+    finally:
+        await runner.cleanup()
+
+async def _get_json(session, sem, url: str, fixture: str | None):
+    async with sem:
+        if fixture:
+            resp = await session.get(fixture, params={"u": url})
+        else:
+            resp = await session.get(url, headers={"Accept": "application/json"})
+        async with resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+def _api_url(template: str, page_url: str, **extra) -> str:
+    parts = urlsplit(page_url)
+    return template.format(url=quote(page_url, safe=""), path=quote(parts.path or "/", safe=""),
+                           origin=f"{parts.scheme}://{parts.netloc}", **extra)
+
+async def extract_blocks(page_url: str, fixtures: str = FIXTURES) -> list[HttpBlock]:
+    """Blocs de la page (dans l'ordre d'affichage), blocs paresseux complétés via BLOCK_API."""
+    if not PAGE_API:
+        raise HttpExtractUnavailable("HTTP_PAGE_API non configurée")
+    parts = urlsplit(page_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    sem = asyncio.Semaphore(CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY, ttl_dns_cache=300)
+    async with AsyncExitStack() as stack:
+        fixture = await stack.enter_async_context(fixture_server(fixtures)) if fixtures else None
+        session = await stack.enter_async_context(
+            aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT_S)))
+        try:
+            page = await _get_json(session, sem, _api_url(PAGE_API, page_url), fixture)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise HttpExtractUnavailable(f"JSON de page illisible : {type(e).__name__}: {e}") from e
+        raws = find_blocks(page)
+        if not raws:
+            raise HttpExtractUnavailable("aucun bloc reconnu dans le JSON de page")
+        blocks = [parse_block(i, raw, origin) for i, raw in enumerate(raws, 1)]
+
+        async def complete(b: HttpBlock):
+            # Bloc chargé à part (cartes absentes du JSON de page) : une requête par bloc, en parallèle
+            try:
+                data = await _get_json(session, sem, _api_url(BLOCK_API, page_url, id=quote(b.block_id, safe="")), fixture)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return
+            # JSON d'une autre forme (tableau, scalaire, bloc introuvable) : le bloc reste non résolu
+            if isinstance(data, dict) and _first(data, ITEM_KEYS, list):
+                raw = data
+            else:
+                raw = (find_blocks(data) or [data])[0]
+            if not isinstance(raw, dict):
+                return
+            try:
+                full = parse_block(b.idx, raw, origin)
+            except (AttributeError, TypeError, ValueError):
+                return
+            b.cards, b.voir_plus = full.cards, b.voir_plus or full.voir_plus
+            if b.type == "Inconnu":
+                b.type = full.type
+
+        if BLOCK_API:
+            await asyncio.gather(*(complete(b) for b in blocks if not b.resolved and b.block_id))
+    return blocks
+
+def extract_page(page_url: str, fixtures: str = FIXTURES) -> list[HttpBlock]:
+    """Point d'entrée synchrone des scrapers ; lève HttpExtractUnavailable si le moteur ne peut rien lire."""
+    return asyncio.run(extract_blocks(page_url, fixtures))
+
+def matching_blocks(blocks: list[HttpBlock], inventory: list[dict]) -> dict[int, HttpBlock]:
+    """Blocs HTTP résolus dont le titre correspond au bloc DOM de même position."""
+    norm = lambda s: " ".join((s or "").split()).casefold()
+    dom = {b["idx"]: norm(b["titre"]) for b in inventory}
+    return {b.idx: b for b in blocks if b.resolved and dom.get(b.idx) == norm(b.titre)}
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Extraction HTTP des blocs d'une page (sans navigateur).")
+    p.add_argument("url", help="URL de la page (ex. https://video.telequebec.tv/)")
+    p.add_argument("--fixtures", default=FIXTURES, help="archive de trafic à servir localement (output/traffic/<nom>)")
+    args = p.parse_args(argv)
+    blocks = extract_page(args.url, args.fixtures)
+    for b in blocks:
+        print(f"{b.idx:>3}. [{'résolu' if b.resolved else 'repli Selenium'}] {b.titre} – {b.type}, {len(b.cards)} cartes")
+    print(json.dumps([r for b in blocks if b.resolved for r in b.rows()], ensure_ascii=False, indent=1))
+
+if __name__ == "__main__":
+    main()
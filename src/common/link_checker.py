@@ -0,0 +1,77 @@
+# src/common/link_checker.py
+# ---------------------------------------------------------------------------
+# Validation concurrente des URLs collectées (colonne « URL détail »).
+#  – une seule ClientSession aiohttp : connexions keep-alive réutilisées
+#  – concurrence bornée (sémaphore + limite du connecteur)
+#  – HEAD d'abord, GET en repli si le serveur refuse HEAD
+#  – limitation de débit par hôte (requêtes/seconde)
+# ---------------------------------------------------------------------------
+
+import asyncio
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import aiohttp
+
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+@dataclass
+class LinkStatus:
+    url: str
+    status: int | None
+    latency_ms: int | None
+    error: str = ""
+
+class HostRateLimiter:
+    """Espace les requêtes vers un même hôte d'au moins 1/rate secondes."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+async def _check_one(session, sem, limiter, url) -> LinkStatus:
+    async with sem:
+        host = urlsplit(url).netloc
+        t0 = time.perf_counter()
+        try:
+            await limiter.wait(host)
+            t0 = time.perf_counter()
+            async with session.head(url, allow_redirects=True) as resp:
+                status = resp.status
+            if status in HEAD_FALLBACK_STATUSES:
+                await limiter.wait(host)
+                t0 = time.perf_counter()
+                async with session.get(url, allow_redirects=True) as resp:
+                    status = resp.status   # en-têtes reçus : le corps n'est pas lu
+            return LinkStatus(url, status, int((time.perf_counter() - t0) * 1000))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return LinkStatus(url, None, int((time.perf_counter() - t0) * 1000), type(e).__name__)
+
+async def check_urls(urls, concurrency: int = 50, per_host_rps: float = 20,
+                     timeout: float = 15) -> dict[str, LinkStatus]:
+    """Valide chaque URL unique ; retourne {url: LinkStatus}."""
+    uniques = list(dict.fromkeys(u for u in urls if u and u.startswith(("http://", "https://"))))
+    sem = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(per_host_rps)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        results = await asyncio.gather(*(_check_one(session, sem, limiter, u) for u in uniques))
+    return {r.url: r for r in results}
+
+def validate_urls(urls, **kwargs) -> dict[str, LinkStatus]:
+    """Point d'entrée synchrone (run.py)."""
+    return asyncio.run(check_urls(urls, **kwargs))
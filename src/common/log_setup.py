@@ -0,0 +1,151 @@
+# src/common/log_setup.py
+# ---------------------------------------------------------------------------
+# Journalisation commune (run.py et scrapers), sans E/S bloquantes :
+#  – le thread qui scrape ne fait que déposer l'événement dans une file
+#    (QueueHandler) ; un QueueListener écrit console et fichier dans son thread
+#  – fichier logs/<nom>_<horodatage>.jsonl : un événement JSON par ligne, avec
+#    les champs scraper, carrousel et carte quand ils sont connus
+#  – niveau réel (LOG_LEVEL / --log-level) : DEBUG = détail carte par carte
+# Scraper lancé par run.py (LOG_FORMAT=json) : les événements sortent en JSON
+# sur stdout ; run.py les relaie ligne à ligne dans son propre journal (relay)
+# au lieu de recopier toute la sortie du processus à la fin.
+# ---------------------------------------------------------------------------
+
+import json
+import logging
+import os
+import queue
+import sys
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+
+LOG_DIR = Path("logs")
+JSON_CONSOLE = os.getenv("LOG_FORMAT", "") == "json"
+FIELDS = ("scraper", "carrousel", "carte")
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+def default_level() -> str:
+    """LOG_LEVEL lu à l'appel (run.py charge le .env après les imports)."""
+    return os.getenv("LOG_LEVEL", "INFO").upper()
+
+_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+@contextmanager
+def log_context(**fields):
+    """Ajoute des champs (carrousel=…, carte=…) à tous les événements émis dans le bloc."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+def current_context() -> dict:
+    """Champs de log_context() actifs dans le thread courant."""
+    return _context.get()
+
+class ContextFilter(logging.Filter):
+    """Recopie les champs fixes (scraper) et ceux du contexte courant sur l'événement."""
+
+    def __init__(self, **static):
+        super().__init__()
+        self.static = static
+
+    def filter(self, record):
+        for k, v in {**self.static, **_context.get()}.items():
+            if getattr(record, k, None) is None:
+                setattr(record, k, v)
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        d = {"ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+             "level": record.levelname, "logger": record.name, "msg": record.getMessage()}
+        d.update({k: getattr(record, k) for k in FIELDS if getattr(record, k, None) is not None})
+        return json.dumps(d, ensure_ascii=False, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """Texte lisible : « heure [NIVEAU] scraper #carrousel - message »."""
+
+    def format(self, record):
+        where = " ".join(str(v) for v in (getattr(record, "scraper", None),
+                                          f"#{record.carrousel}" if getattr(record, "carrousel", None) is not None else None) if v)
+        head = f"{datetime.fromtimestamp(record.created):%Y-%m-%d %H:%M:%S} [{record.levelname}]"
+        return f"{head} {where} - {record.getMessage()}" if where else f"{head} - {record.getMessage()}"
+
+class _ListenerQueueHandler(QueueHandler):
+    """
+    QueueHandler qui démarre son listener, puis le vide et l'arrête à sa fermeture
+    (logging.shutdown, en tout dernier à la sortie) ; une seconde fermeture ne fait rien.
+    """
+
+    def __init__(self, q, listener: QueueListener):
+        super().__init__(q)
+        self.listener = listener
+        listener.start()
+        self.running = True
+
+    def close(self):
+        if self.running:
+            self.running = False
+            self.listener.stop()
+        super().close()
+
+def setup_logging(name: str, level: str | None = None, scraper: str | None = None,
+                  json_console: bool = JSON_CONSOLE, log_dir: Path = LOG_DIR) -> Path | None:
+    """
+    Installe la file de journalisation sur le logger racine ; retourne le fichier .jsonl
+    (aucun fichier en mode JSON sur la console : c'est run.py qui écrit le journal).
+    """
+    handlers, path = [], None
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter() if json_console else ConsoleFormatter())
+    handlers.append(console)
+    if not json_console:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        path = log_dir / f"{name}_{datetime.now():%Y-%m-%d_%H-%M-%S}.jsonl"
+        fichier = logging.FileHandler(path, encoding="utf-8")
+        fichier.setFormatter(JsonFormatter())
+        handlers.append(fichier)
+    q = queue.SimpleQueue()
+    qh = _ListenerQueueHandler(q, QueueListener(q, *handlers, respect_handler_level=True))
+    qh.addFilter(ContextFilter(**({"scraper": scraper} if scraper else {})))
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+    root.addHandler(qh)
+    root.setLevel((level or default_level()).upper())
+    # bibliothèques bavardes en DEBUG (requêtes WebDriver, connexions HTTP)
+    for lib in ("selenium", "urllib3", "asyncio"):
+        logging.getLogger(lib).setLevel(max(root.level, logging.INFO))
+    return path
+
+def relay(stream, scraper: str, level: int = logging.INFO):
+    """
+    Relaie la sortie d'un scraper (une ligne JSON par événement) dans le journal
+    courant, au fil de l'eau ; les lignes non JSON (traces, avertissements) gardent
+    le niveau `level`.
+    """
+    for line in stream:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        try:
+            d = json.loads(line)
+            if not isinstance(d, dict) or "msg" not in d:
+                raise ValueError
+        except ValueError:
+            d = {"level": logging.getLevelName(level), "msg": line}
+        lvl = logging.getLevelName(d.get("level", "INFO"))
+        record = logging.makeLogRecord({
+            "name": d.get("logger") or scraper, "levelno": lvl if isinstance(lvl, int) else level,
+            "levelname": d.get("level", "INFO"), "msg": d["msg"],
+            **{k: d[k] for k in FIELDS if k in d}})
+        with suppress(TypeError, ValueError):
+            record.created = datetime.fromisoformat(d["ts"]).timestamp() if "ts" in d else record.created
+        if getattr(record, "scraper", None) is None:
+            record.scraper = scraper
+        logging.getLogger(record.name).handle(record)
@@ -0,0 +1,189 @@
+# src/common/mail_utils.py
+# ---------------------------------------------------------------------------
+# Envoi d'e-mails à mémoire bornée : le MIME est généré au fil de l'eau et
+# écrit directement sur la socket SMTP (pas de msg.as_string()).
+# Une archive plus grosse que la limite du fournisseur est découpée en volumes
+# (.zip.001, .zip.002, …) envoyés dans plusieurs e-mails sur la même connexion.
+# ---------------------------------------------------------------------------
+
+import base64
+import io
+import math
+import re
+import smtplib
+import uuid
+from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+RAW_CHUNK = 57 * 1024          # multiple de 57 → lignes base64 complètes de 76 caractères
+MIME_SLACK = 512               # Date / Message-ID / délimiteur : longueur variable d'un e-mail à l'autre
+
+def _dot_stuff(data: bytes) -> bytes:
+    """Double les points en début de ligne (RFC 5321 §4.5.2)."""
+    return re.sub(rb"(?m)^\.", b"..", data)
+
+def part_size_for(max_message_bytes: int, overhead: int) -> int:
+    """
+    Taille brute maximale d'un volume pour que l'e-mail encodé reste sous la limite,
+    `overhead` étant la taille du message hors pièce jointe (cf. message_overhead).
+    """
+    usable = max(max_message_bytes - overhead, 78)
+    return (usable // 78) * 57   # 57 octets bruts → 76 caractères + CRLF
+
+def plan_parts(size: int, max_message_bytes: int | None, overhead: int) -> list[tuple[int, int]]:
+    """Découpe [0, size) en plages (début, longueur) ; une seule plage si pas de limite."""
+    if not max_message_bytes or size <= part_size_for(max_message_bytes, overhead):
+        return [(0, size)]
+    step = part_size_for(max_message_bytes, overhead)
+    return [(start, min(step, size - start)) for start in range(0, size, step)]
+
+def _iter_base64(fp, start: int, length: int):
+    fp.seek(start)
+    remaining = length
+    while remaining > 0:
+        raw = fp.read(min(RAW_CHUNK, remaining))
+        if not raw:
+            break
+        remaining -= len(raw)
+        yield base64.encodebytes(raw).replace(b"\n", b"\r\n")
+
+def iter_message(headers: dict, body: str, fp, start: int, length: int,
+                 filename: str, content_type: str = "application/zip"):
+    """Génère le message MIME (multipart/mixed) par morceaux de bytes terminés par CRLF."""
+    boundary = f"=={uuid.uuid4().hex}=="
+    hdr = EmailMessage(policy=SMTP)
+    for k, v in headers.items():
+        if v:
+            hdr[k] = v
+    hdr["Date"] = formatdate(localtime=True)
+    hdr["Message-ID"] = make_msgid()
+    hdr["MIME-Version"] = "1.0"
+    hdr["Content-Type"] = f'multipart/mixed; boundary="{boundary}"'
+    yield _dot_stuff(b"".join(SMTP.fold_binary(k, v) for k, v in hdr.items()) + b"\r\n")
+
+    text = base64.encodebytes(body.encode("utf-8")).replace(b"\n", b"\r\n")
+    yield (
+        f"--{boundary}\r\n"
+        "Content-Type: text/plain; charset=\"utf-8\"\r\n"
+        "Content-Transfer-Encoding: base64\r\n\r\n"
+    ).encode("ascii") + text
+
+    yield (
+        f"--{boundary}\r\n"
+        f"Content-Type: {content_type}; name=\"{filename}\"\r\n"
+        "Content-Transfer-Encoding: base64\r\n"
+        f"Content-Disposition: attachment; filename=\"{filename}\"\r\n\r\n"
+    ).encode("ascii")
+    yield from _iter_base64(fp, start, length)
+    yield f"--{boundary}--\r\n".encode("ascii")
+
+def message_overhead(headers: dict, body: str, filename: str, content_type: str = "application/zip") -> int:
+    """
+    Taille du message hors pièce jointe encodée : en-têtes, corps texte en base64 (×4/3),
+    délimiteurs MIME. Mesurée en générant le message avec une pièce jointe vide.
+    """
+    chunks = iter_message(headers, body, io.BytesIO(), 0, 0, filename, content_type)
+    return sum(len(c) for c in chunks) + MIME_SLACK
+
+def send_streamed(server: smtplib.SMTP, sender: str, recipients: list[str], chunks) -> dict:
+    """
+    Transaction SMTP complète (MAIL/RCPT/DATA) en écrivant `chunks` directement sur la socket.
+    Retourne les destinataires refusés, comme smtplib.SMTP.sendmail.
+    """
+    code, resp = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, resp, sender)
+    refused = {}
+    for rcpt in recipients:
+        code, resp = server.rcpt(rcpt)
+        if code not in (250, 251):
+            refused[rcpt] = (code, resp)
+    if len(refused) == len(recipients):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+    code, resp = server.docmd("DATA")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, resp)
+    for chunk in chunks:
+        server.send(chunk)
+    server.send(b".\r\n")
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+    return refused
+
+def open_smtp(host: str, port: int, user: str | None = None, password: str | None = None,
+              timeout: float = 60, allow_plaintext: bool = False) -> smtplib.SMTP:
+    """
+    Ouvre la connexion en STARTTLS, puis login si `user` est défini.
+    Un serveur sans STARTTLS (ou dont l'offre a été retirée en route) est refusé :
+    les identifiants ne partent jamais en clair. `allow_plaintext` (SMTP_ALLOW_PLAINTEXT=1)
+    n'est prévu que pour un serveur de test local.
+    """
+    server = smtplib.SMTP(host, port, timeout=timeout)
+    server.ehlo()
+    if server.has_extn("starttls"):
+        server.starttls()
+        server.ehlo()
+    elif not allow_plaintext:
+        server.close()
+        raise smtplib.SMTPNotSupportedError(f"{host}:{port} ne propose pas STARTTLS : connexion refusée "
+                                            "(SMTP_ALLOW_PLAINTEXT=1 pour un serveur de test local)")
+    if user:
+        server.login(user, password or "")
+    return server
+
+def send_archive(server: smtplib.SMTP, sender: str, to: list[str], cc: list[str],
+                 subject: str, body: str, attachment: Path,
+                 max_message_bytes: int | None = None, log=print) -> int:
+    """
+    Envoie `attachment` en un ou plusieurs e-mails sur la connexion `server`.
+    Retourne le nombre d'e-mails envoyés.
+    """
+    attachment = Path(attachment)
+    headers = {"From": sender, "To": ", ".join(to), "Cc": ", ".join(cc)}
+
+    def volume(i: int, total: int) -> tuple[str, str, str, str]:
+        """(nom, type, sujet, corps) du volume i/total."""
+        if total == 1:
+            return attachment.name, "application/zip", subject, body
+        return (
+            f"{attachment.name}.{i:03d}",
+            "application/octet-stream",
+            f"{subject} (partie {i}/{total})",
+            body + (
+                f"\n\n-- Partie {i}/{total} de {attachment.name}. "
+                "Rassembler les volumes .001, .002, … (7-Zip, ou `copy /b` sous Windows) "
+                "pour reconstituer l'archive."
+            ),
+        )
+
+    def overhead(total: int) -> int:
+        # le volume n°total a le sujet, le nom et la note les plus longs
+        name, ctype, subj, text = volume(total, total)
+        return message_overhead({**headers, "Subject": subj}, text, name, ctype)
+
+    size = attachment.stat().st_size
+    parts = plan_parts(size, max_message_bytes, overhead(1))
+    total = len(parts)
+    # en volumes, la note « Partie i/n » allonge chaque e-mail : recalcul jusqu'à stabilité
+    while total > 1:
+        parts = plan_parts(size, max_message_bytes, overhead(total))
+        if len(parts) == total:
+            break
+        total = len(parts)
+    with attachment.open("rb") as fp:
+        for i, (start, length) in enumerate(parts, 1):
+            name, ctype, subj, text = volume(i, total)
+            refused = send_streamed(
+                server, sender, to + cc,
+                iter_message({**headers, "Subject": subj}, text, fp, start, length, name, ctype),
+            )
+            for rcpt, (code, resp) in refused.items():
+                log(f"Destinataire refusé {rcpt} : {code} {resp!r}")
+            log(f"E-mail {i}/{total} envoyé ({name}, {length} octets, ~{math.ceil(length / 57) * 78} octets encodés).")
+    return total
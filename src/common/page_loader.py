@@ -0,0 +1,104 @@
+# src/common/page_loader.py
+# ---------------------------------------------------------------------------
+# Chargement des blocs paresseux (défilement infini) en un seul script async :
+# un MutationObserver compte les nouveaux app-page-block, chaque nouveau lot
+# relance un défilement en bas de page, et le chargement est terminé quand
+# aucun bloc n'apparaît pendant une fenêtre de calme. Une requête XHR/fetch de
+# l'API en cours (même origine que la page, ou LAZY_API_PATTERN) prolonge
+# l'attente, au plus LAZY_GRACE_MS après le dernier bloc apparu : une réponse
+# lente ne coupe pas le scroll, mais un long-poll ou une requête bloquée ne le
+# retient pas jusqu'au plafond. Les requêtes tierces (mesure d'audience…) sont
+# ignorées.
+# ---------------------------------------------------------------------------
+
+import os
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+QUIET_MS = int(os.getenv("LAZY_QUIET_MS", "1500"))     # fenêtre de calme
+GRACE_MS = int(os.getenv("LAZY_GRACE_MS", "5000"))     # prolongation maximale par les requêtes en cours
+MAX_MS   = int(os.getenv("LAZY_MAX_MS", "90000"))      # plafond absolu
+API_PATTERN = os.getenv("LAZY_API_PATTERN", "")        # regex d'URL des requêtes suivies (défaut : même origine)
+
+LOAD_BLOCKS_JS = r"""
+const [quietMs, maxMs, until, graceMs, apiPattern, done] = arguments;
+const count = () => document.querySelectorAll('app-page-block').length;
+let last = count(), lastChange = Date.now(), lastDone = 0, finished = false, timer = null, seq = 0;
+const tracked = new Set();
+const apiRe = apiPattern ? new RegExp(apiPattern) : null;
+const watched = url => {
+  try {
+    const u = new URL(url, location.href);
+    return apiRe ? apiRe.test(u.href) : u.origin === location.origin;
+  } catch (e) { return false; }
+};
+const origFetch = window.fetch, origOpen = XMLHttpRequest.prototype.open, origSend = XMLHttpRequest.prototype.send;
+const nudge = () => window.scrollTo(0, document.documentElement.scrollHeight);
+const finish = () => {
+  if (finished) return;
+  finished = true;
+  obs.disconnect(); clearTimeout(timer); clearTimeout(hard); clearInterval(pulse);
+  window.fetch = origFetch;
+  XMLHttpRequest.prototype.open = origOpen; XMLHttpRequest.prototype.send = origSend;
+  done(count());
+};
+// calme atteint : fin, sauf requête de l'API en cours (ou tout juste finie, le temps du rendu),
+// et jamais plus de graceMs après le dernier bloc apparu
+const check = () => {
+  const now = Date.now();
+  const busy = tracked.size > 0 || now - lastDone < 300;
+  if (!busy || now - lastChange >= quietMs + graceMs) finish();
+  else timer = setTimeout(check, 200);
+};
+const arm = () => { clearTimeout(timer); lastChange = Date.now(); timer = setTimeout(check, quietMs); };
+const track = () => { const id = ++seq; tracked.add(id); return () => { tracked.delete(id); lastDone = Date.now(); }; };
+window.fetch = function (...a) {
+  const url = a[0] instanceof Request ? a[0].url : String(a[0]);
+  if (!watched(url)) return origFetch.apply(this, a);
+  const end = track();
+  return origFetch.apply(this, a).finally(end);
+};
+XMLHttpRequest.prototype.open = function (...a) {
+  this.__lazyUrl = String(a[1]);
+  return origOpen.apply(this, a);
+};
+XMLHttpRequest.prototype.send = function (...a) {
+  if (watched(this.__lazyUrl)) this.addEventListener('loadend', track(), {once: true});
+  return origSend.apply(this, a);
+};
+const obs = new MutationObserver(() => {
+  const n = count();
+  if (n === last) return;
+  last = n;
+  if (until && n >= until) return finish();
+  nudge(); arm();
+});
+obs.observe(document.body, {childList: true, subtree: true});
+const hard = setTimeout(finish, maxMs);
+const pulse = setInterval(nudge, 400);   // au cas où un scroll serait ignoré pendant un rendu
+if (until && last >= until) finish(); else { nudge(); arm(); }
+"""
+
+def load_all_blocks(dr, quiet_ms: int = QUIET_MS, max_ms: int = MAX_MS, until: int = 0,
+                    grace_ms: int = GRACE_MS) -> int:
+    """
+    Fait défiler jusqu'à ce que plus aucun app-page-block n'apparaisse (ou jusqu'à `until` blocs).
+    Retourne le nombre de blocs chargés : c'est ce nombre que les scrapers utilisent.
+    """
+    previous = dr.timeouts.script   # rétabli ensuite : les autres execute_async_script gardent leur délai
+    dr.set_script_timeout(max_ms / 1000 + 10)
+    try:
+        total = dr.execute_async_script(LOAD_BLOCKS_JS, quiet_ms, max_ms, until, grace_ms, API_PATTERN)
+    finally:
+        dr.set_script_timeout(previous)
+    dr.execute_script("window.scrollTo(0, 0);")
+    return int(total or 0)
+
+def find_block(dr, idx: int):
+    """app-page-block n° idx ; charge les blocs paresseux manquants si besoin."""
+    try:
+        return dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
+    except NoSuchElementException:
+        load_all_blocks(dr, until=idx)
+        return dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
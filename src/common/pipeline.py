@@ -0,0 +1,112 @@
+# src/common/pipeline.py
+# ---------------------------------------------------------------------------
+# Petit exécuteur de DAG pour run.py : chaque étape démarre dès que ses
+# dépendances sont terminées, dans un pool de threads, au lieu d'attendre la
+# fin de tous les scrapers.
+#  – after : dépendances qui doivent avoir réussi (sinon l'étape est sautée)
+#  – wait  : dépendances qui doivent seulement être terminées (ex. l'e-mail
+#    part même si une validation de liens a échoué)
+#  – resource : deux étapes de même ressource ne tournent jamais en même
+#    temps et démarrent dans l'ordre d'ajout (ex. « navigateur » : un seul
+#    scraper à la fois, pendant que les post-traitements avancent à côté)
+# Une étape retourne True / False (ou None = réussite) ; une exception compte
+# comme un échec et est journalisée.
+# ---------------------------------------------------------------------------
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from dataclasses import dataclass, field
+from typing import Callable
+
+OK, ECHEC, SAUTEE = "ok", "échec", "sautée"
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[], bool | None]
+    after: tuple[str, ...] = ()
+    wait: tuple[str, ...] = ()
+    resource: str | None = None
+    status: str | None = None
+    started: float | None = None
+    ended: float | None = None
+
+@dataclass
+class Dag:
+    workers: int = 4
+    log: Callable = logging.info
+    stages: dict[str, Stage] = field(default_factory=dict)
+
+    def add(self, name: str, fn: Callable, after=(), wait=(), resource: str | None = None) -> str:
+        """Ajoute une étape (les dépendances doivent déjà exister) ; retourne son nom."""
+        missing = [d for d in (*after, *wait) if d not in self.stages]
+        if missing:
+            raise ValueError(f"étape {name} : dépendance(s) inconnue(s) {missing}")
+        self.stages[name] = Stage(name, fn, tuple(after), tuple(wait), resource)
+        return name
+
+    def _run_stage(self, st: Stage) -> bool:
+        st.started = time.time()
+        try:
+            res = st.fn()
+            return res is None or bool(res)
+        except Exception:
+            logging.exception(f"Étape {st.name} : erreur inattendue")
+            return False
+        finally:
+            st.ended = time.time()
+
+    def _ready(self, st: Stage, busy: set) -> bool | None:
+        """True : lançable ; False : pas encore ; None : à sauter (dépendance en échec)."""
+        if any(self.stages[d].status in (ECHEC, SAUTEE) for d in st.after):
+            return None
+        done = all(self.stages[d].status == OK for d in st.after) and \
+            all(self.stages[d].status is not None for d in st.wait)
+        return done and st.resource not in busy
+
+    def run(self) -> dict[str, str]:
+        """Exécute toutes les étapes ; retourne {nom: statut}."""
+        pending = list(self.stages.values())
+        running, busy = {}, set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="etape") as ex:
+            while pending or running:
+                progress = True
+                while progress:   # une étape sautée peut en débloquer (ou en sauter) d'autres
+                    progress = False
+                    for st in list(pending):
+                        ready = self._ready(st, busy)
+                        if ready is None:
+                            st.status = SAUTEE
+                            pending.remove(st)
+                            self.log(f"Étape {st.name} sautée (dépendance en échec).")
+                            progress = True
+                        elif ready:
+                            pending.remove(st)
+                            if st.resource:
+                                busy.add(st.resource)
+                            self.log(f"Étape {st.name} : début.")
+                            running[ex.submit(self._run_stage, st)] = st
+                if not running:
+                    break
+                done, _ = wait_futures(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    st = running.pop(fut)
+                    busy.discard(st.resource)
+                    st.status = OK if fut.result() else ECHEC
+                    self.log(f"Étape {st.name} : {st.status} en {st.ended - st.started:.1f} s.")
+        for st in pending:   # dépendances jamais satisfaites (ne devrait pas arriver)
+            st.status = SAUTEE
+        return {n: st.status for n, st in self.stages.items()}
+
+    def summary(self, resource: str | None = None) -> str:
+        """Bilan des statuts ; avec `resource`, durée écoulée après la dernière étape de cette ressource."""
+        counts = {}
+        for st in self.stages.values():
+            counts[st.status] = counts.get(st.status, 0) + 1
+        text = "Étapes : " + ", ".join(f"{n} {s}" for s, n in counts.items())
+        fins = [st.ended for st in self.stages.values() if st.ended]
+        last = [st.ended for st in self.stages.values() if st.ended and st.resource == resource]
+        if resource and last and fins:
+            text += f" ; {max(fins) - max(last):.1f} s de traitement après la dernière étape « {resource} »"
+        return text
@@ -0,0 +1,146 @@
+# src/common/profiling.py
+# ---------------------------------------------------------------------------
+# Profil d'un scraper (--profile sur un scraper ou sur run.py) :
+#  – sampling (défaut) : un thread relève la pile du thread du scraper toutes
+#    les PROFILE_SAMPLE_MS ms, sans ralentir le scraper
+#  – deterministic : cProfile en plus (fichier .prof pour pstats / snakeviz),
+#    temps exacts par fonction mais Python ralenti
+# Dans les deux modes, le temps mesuré est réparti entre :
+#  – WebDriver HTTP : allers-retours avec chromedriver (RemoteConnection._request)
+#  – pauses : time.sleep (clics, settle), instrumenté pendant le profil
+#  – Python : tout le reste (parcours du DOM, exports, nos boucles)
+# Fichiers dans output/profiles/ : <page>_<horodatage>.collapsed (piles
+# repliées, une par ligne avec son nombre d'échantillons : flamegraph.pl,
+# speedscope), .txt (bilan + fonctions les plus coûteuses), .prof (deterministic).
+# ---------------------------------------------------------------------------
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path("output") / "profiles"
+SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+MODES = ("sampling", "deterministic")
+
+# (fichier, fonction) d'un aller-retour WebDriver ; execute = latence simulée du faux driver
+WEBDRIVER_CALLS = {("remote_connection.py", "_request"), ("fake_driver.py", "execute")}
+CATEGORIES = ("WebDriver HTTP", "pauses", "Python")
+
+logger = logging.getLogger(__name__)
+
+_real_sleep = time.sleep
+
+def _pause(seconds):
+    """Remplace time.sleep pendant le profil : les pauses sont reconnaissables dans les piles."""
+    _real_sleep(seconds)
+
+def _is_webdriver(code) -> bool:
+    return (Path(code.co_filename).name, code.co_name) in WEBDRIVER_CALLS
+
+class _Sampler(threading.Thread):
+    """Relève périodiquement la pile d'un thread ; compte les piles repliées et les catégories."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profil", daemon=True)
+        self.thread_id, self.interval = thread_id, interval
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            if any(_is_webdriver(c) for c in codes):
+                cat = "WebDriver HTTP"
+            elif codes[-1] is _pause.__code__:
+                cat = "pauses"
+            else:
+                cat = "Python"
+            self.categories[cat] += 1
+            self.stacks[";".join(f"{c.co_name} ({Path(c.co_filename).name}:{c.co_firstlineno})" for c in codes)] += 1
+
+    def stop(self):
+        self._stop_evt.set()
+        self.join()
+
+def _deterministic_split(stats: pstats.Stats) -> dict[str, float]:
+    """Temps WebDriver / pauses d'après cProfile (pauses faites dans un aller-retour exclues)."""
+    webdriver = pauses = 0.0
+    for (fichier, _, func), (_, _, _, ct, callers) in stats.stats.items():
+        if (Path(fichier).name, func) in WEBDRIVER_CALLS:
+            webdriver += ct
+        elif fichier == _pause.__code__.co_filename and func == "_pause":
+            pauses += ct - sum(c[3] for (f, _, fn), c in callers.items() if (Path(f).name, fn) in WEBDRIVER_CALLS)
+    return {"WebDriver HTTP": webdriver, "pauses": pauses}
+
+def _report(name: str, wall: float, split: dict[str, float], samples: int, files: list[Path]) -> str:
+    split = {**split, "Python": max(wall - sum(split.values()), 0.0)}
+    parts = ", ".join(f"{cat} {split[cat]:.1f} s ({split[cat] / wall:.0%})" for cat in CATEGORIES) if wall else ""
+    return (f"Profil {name} : {wall:.1f} s mesurées, {samples} échantillon(s) — {parts} ; "
+            f"fichiers : {', '.join(str(f) for f in files)}")
+
+@contextmanager
+def profiled(name: str, mode: str | None = "sampling", out_dir: Path = PROFILE_DIR):
+    """Profile le bloc (mode None : aucun effet) et écrit ses fichiers dans out_dir."""
+    if not mode:
+        yield
+        return
+    if mode not in MODES:
+        raise ValueError(f"mode de profil inconnu : {mode}")
+    prof = cProfile.Profile() if mode == "deterministic" else None
+    sampler = _Sampler(threading.get_ident(), SAMPLE_MS / 1000)
+    time.sleep = _pause
+    t0 = time.perf_counter()
+    sampler.start()
+    if prof:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof:
+            prof.disable()
+        wall = time.perf_counter() - t0
+        sampler.stop()
+        time.sleep = _real_sleep
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = out_dir / f"{name}_{datetime.now():%Y-%m-%d_%H-%M-%S}"
+        files = [base.with_suffix(".collapsed"), base.with_suffix(".txt")]
+        files[0].write_text("".join(f"{s} {n}\n" for s, n in sampler.stacks.most_common()), encoding="utf-8")
+        n = sum(sampler.categories.values())
+        if prof:
+            files.append(base.with_suffix(".prof"))
+            prof.dump_stats(files[-1])
+            stats = pstats.Stats(prof)
+            split = _deterministic_split(stats)
+        else:
+            # chaque échantillon vaut wall / n : les dérives du minuteur s'annulent
+            split = {cat: wall * sampler.categories[cat] / n if n else 0.0 for cat in CATEGORIES[:2]}
+        report = _report(name, wall, split, n, files)
+        with files[1].open("w", encoding="utf-8") as f:
+            f.write(report + "\n\n")
+            if prof:
+                buf = io.StringIO()
+                pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+                f.write(buf.getvalue())
+            else:
+                f.write("Piles les plus fréquentes (échantillons) :\n")
+                for s, k in sampler.stacks.most_common(20):
+                    f.write(f"{k:>7}  {' ← '.join(reversed(s.split(';')[-4:]))}\n")
+        logger.info(report)
@@ -0,0 +1,39 @@
+# src/common/records.py
+# ---------------------------------------------------------------------------
+# Ligne d'export typée. Une carte ou un bouton « Voir plus » est un CardRow :
+# un NamedTuple (pas de __dict__ par ligne, indexable comme l'ancienne liste,
+# r[0] = n° de carrousel) dont l'ordre des champs est celui des colonnes des
+# exports CSV / XLSX et de l'historique (src/common/history.py).
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+CARD_COLUMNS = ["# Carrousel", "Type", "Titre du carrousel", "#", "titre (card)", "URL détail", "Chemin"]
+
+def path_of(url: str) -> str:
+    """Chemin après le domaine (https://video.telequebec.tv/<chemin>)."""
+    return url.split('.tv/', 1)[1] if '.tv/' in url else ''
+
+class CardRow(NamedTuple):
+    carrousel: int
+    type: str
+    titre: str
+    ordre: int | None      # position de la carte ; None pour « Voir plus » (cellule vide)
+    carte: str
+    url: str
+    chemin: str
+
+    @classmethod
+    def make(cls, carrousel: int, type: str, titre: str, ordre, carte: str, url: str) -> "CardRow":
+        return cls(carrousel, type, titre, ordre if isinstance(ordre, int) else None, carte, url, path_of(url))
+
+    @classmethod
+    def from_row(cls, row) -> "CardRow":
+        """
+        Ligne relue (état JSON, CSV de shard, export) : « # » vide ou textuel → None ;
+        les champs texte restent du texte (titre « 1917 » relu comme entier).
+        """
+        c, typ, titre, ordre, carte, url, chemin = row[:7]
+        ordre = int(ordre) if isinstance(ordre, int) or str(ordre).isdigit() else None
+        typ, titre, carte, url, chemin = ("" if v is None else str(v) for v in (typ, titre, carte, url, chemin))
+        return cls(int(c), typ, titre, ordre, carte, url, chemin)
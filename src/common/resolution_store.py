@@ -0,0 +1,84 @@
+# src/common/resolution_store.py
+# ---------------------------------------------------------------------------
+# Magasin de résolutions partagé pour un run : une carte déjà cliquée par un
+# scraper (ex. Accueil) n'est pas recliquée par les suivants (En vedette,
+# Jeunesse, Sur demande). SQLite en mode WAL → utilisable depuis plusieurs
+# processus scrapers, lectures concurrentes sans blocage.
+# Chaque page garde sa propre ligne (position dans son carrousel) ; seule
+# l'URL de destination est partagée.
+# ---------------------------------------------------------------------------
+
+import os
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+DB_PATH = Path("output") / "state" / "resolutions.sqlite"
+# Libellés de repli générés par les scrapers (« carte_3 », « Carte SID 3 ») : propres
+# à un carrousel, ils ne doivent jamais être partagés.
+_PLACEHOLDER = re.compile(r"^carte(?: sid)?[ _]\d+$")
+
+def normalize_label(label: str) -> str:
+    """Clé de carte : sans accents, casse ni ponctuation, espaces compactés."""
+    s = unicodedata.normalize("NFKD", label or "")
+    s = "".join(c for c in s if not unicodedata.combining(c)).casefold()
+    s = " ".join(re.sub(r"[^\w]+", " ", s).split())
+    return "" if _PLACEHOLDER.match(s) else s
+
+def current_run_id() -> str:
+    """Identifiant du run : fixé par run.py (COLLECTOR_RUN_ID), sinon la date du jour."""
+    return os.getenv("COLLECTOR_RUN_ID") or datetime.now().strftime("%Y-%m-%d")
+
+class ResolutionStore:
+    def __init__(self, path: str | Path = DB_PATH, run_id: str | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id or current_run_id()
+        self.hits = self.misses = 0
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            " run_id TEXT NOT NULL, label_key TEXT NOT NULL, label TEXT, url TEXT NOT NULL,"
+            " page TEXT, resolved_at TEXT, PRIMARY KEY (run_id, label_key))"
+        )
+
+    def get(self, label: str) -> str | None:
+        key = normalize_label(label)
+        if not key:
+            return None
+        row = self.db.execute(
+            "SELECT url FROM resolutions WHERE run_id = ? AND label_key = ?", (self.run_id, key)
+        ).fetchone()
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, label: str, url: str, page: str = ""):
+        """Mémorise la première résolution d'une carte pour ce run (les suivantes sont ignorées)."""
+        key = normalize_label(label)
+        if not key or not url:
+            return
+        self.db.execute(
+            "INSERT OR IGNORE INTO resolutions (run_id, label_key, label, url, page, resolved_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self.run_id, key, label, url, page, datetime.now().isoformat(timespec="seconds")),
+        )
+
+    def purge_other_runs(self):
+        """Supprime les résolutions des runs précédents (appelé par run.py au démarrage)."""
+        self.db.execute("DELETE FROM resolutions WHERE run_id != ?", (self.run_id,))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,153 @@
+# src/common/retry_queue.py
+# ---------------------------------------------------------------------------
+# File de reprise des échecs.
+#  – les scrapers y déposent les unités en échec (carte, carrousel) avec leur
+#    erreur au lieu de les ignorer ; run.py y ajoute les scrapers en échec
+#  – en fin de run, chaque tour de reprise attend (backoff exponentiel :
+#    RETRY_BASE_S, ×2 à chaque tour), ouvre un navigateur neuf et rejoue les
+#    unités encore en échec ; au plus RETRY_ROUNDS tours
+#  – les échecs définitifs sont écrits dans output/failures/<date>/ puis
+#    regroupés par run.py dans une feuille « echecs » de l'archive (seuls
+#    ceux du run en cours, COLLECTOR_RUN_ID)
+# ---------------------------------------------------------------------------
+
+import json
+import os
+import time
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from src.common.budget import nearly_spent, page_files
+from src.common.resolution_store import current_run_id
+
+RETRY_ROUNDS = int(os.getenv("RETRY_ROUNDS", "2"))
+RETRY_BASE_S = float(os.getenv("RETRY_BASE_S", "5"))
+FAILURES_DIR = Path("output") / "failures"
+FAILURE_COLUMNS = ["Page", "Unité", "# Carrousel", "Titre du carrousel", "Carte", "Erreur", "Tentatives"]
+
+@dataclass
+class Failure:
+    unit: str                  # "carte", "carrousel" ou "scraper"
+    page: str
+    idx: int | None = None
+    titre: str = ""
+    typ: str = ""
+    label: str = ""            # libellé de la carte (ou script pour un scraper)
+    ordre: int | str = ""      # position de la carte dans le carrousel
+    sid: int | None = None     # index Swiper (grande carte)
+    error: str = ""
+    attempts: int = 1
+
+    def row(self) -> list:
+        return [self.page, self.unit, self.idx if self.idx is not None else "", self.titre,
+                self.label, self.error, self.attempts]
+
+def describe(err) -> str:
+    """Message court d'une exception (première ligne, sans la pile Selenium)."""
+    if isinstance(err, BaseException):
+        msg = (getattr(err, "msg", None) or str(err) or "").strip().splitlines()
+        return f"{type(err).__name__}: {msg[0]}" if msg else type(err).__name__
+    return str(err)
+
+def backoff_delays(rounds: int = RETRY_ROUNDS, base: float = RETRY_BASE_S):
+    """Attente avant chaque tour de reprise : base, 2×base, 4×base…"""
+    return [base * 2 ** k for k in range(rounds)]
+
+class RetryQueue:
+    """Unités en échec d'une page, rejouées en fin de run."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.pending: list[Failure] = []
+        self.recovered = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, unit: str, error, **info) -> Failure:
+        f = Failure(unit, self.page, error=describe(error), **info)
+        self.pending.append(f)
+        return f
+
+    def discard(self, idx: int):
+        """Oublie les échecs d'un carrousel (il sera rejoué en entier)."""
+        self.pending = [f for f in self.pending if f.idx != idx]
+
+    def idxs(self) -> set[int]:
+        return {f.idx for f in self.pending if f.idx is not None}
+
+    def retry(self, handler: Callable, new_driver: Callable | None = None, log=print):
+        """
+        Rejoue les échecs : handler(dr, failure) retourne True si l'unité est récupérée
+        (une exception ou False la garde en échec). Les unités ajoutées pendant un tour
+        (ex. cartes d'un carrousel rejoué) sont traitées au tour suivant.
+        """
+        for n, delay in enumerate(backoff_delays(), 1):
+            if not self.pending or nearly_spent():
+                break
+            log(f"Reprise des échecs {self.page} : tour {n}, {len(self.pending)} unité(s) après {delay:g} s")
+            time.sleep(delay)
+            batch, self.pending = self.pending, []
+            dr = new_driver() if new_driver else None
+            try:
+                for i, f in enumerate(batch):
+                    if nearly_spent():
+                        self.pending += batch[i:]
+                        break
+                    f.attempts += 1
+                    try:
+                        ok = handler(dr, f)
+                    except Exception as e:
+                        ok, f.error = False, describe(e)
+                    if ok:
+                        self.recovered += 1
+                    else:
+                        self.pending.append(f)
+            finally:
+                if dr is not None:
+                    with suppress(Exception):
+                        dr.quit()
+
+    def summary(self) -> str:
+        return f"Échecs {self.page} : {self.recovered} récupéré(s) en reprise, {len(self.pending)} définitif(s)"
+
+    def write(self, suffix: str = "") -> Path:
+        """Échecs définitifs de la page (fichier réécrit à chaque run, vide si aucun)."""
+        folder = FAILURES_DIR / datetime.now().strftime("%Y-%m-%d")
+        folder.mkdir(parents=True, exist_ok=True)
+        f = folder / f"{self.page}{suffix}.json"
+        f.write_text(json.dumps({"run_id": current_run_id(), "failures": [asdict(x) for x in self.pending]},
+                                ensure_ascii=False), encoding="utf-8")
+        return f
+
+def failure_rows(date: str | None = None, run_id: str | None = None) -> list[list]:
+    """
+    Lignes de la feuille des échecs : échecs définitifs du run (par défaut le run
+    en cours) ; les fichiers d'un run précédent du même jour sont ignorés.
+    """
+    folder = FAILURES_DIR / (date or datetime.now().strftime("%Y-%m-%d"))
+    run_id = run_id or current_run_id()
+    rows = []
+    for f in sorted(folder.glob("*.json")):
+        with suppress(OSError, ValueError, TypeError, AttributeError, KeyError):
+            data = json.loads(f.read_text(encoding="utf-8"))
+            if data.get("run_id") == run_id:
+                rows += [Failure(**d).row() for d in data["failures"]]
+    return rows
+
+def failed_titles(page: str, date: str | None = None, run_id: str | None = None) -> set[str]:
+    """
+    Titres des carrousels ayant gardé un échec définitif (carte ou carrousel) au run
+    (par défaut le run en cours) ; les fichiers d'un run précédent du même jour sont ignorés.
+    """
+    run_id = run_id or current_run_id()
+    titles = set()
+    for f in page_files(FAILURES_DIR / (date or datetime.now().strftime("%Y-%m-%d")), page):
+        with suppress(OSError, ValueError, TypeError, AttributeError, KeyError):
+            data = json.loads(f.read_text(encoding="utf-8"))
+            if data.get("run_id") == run_id:
+                titles |= {d.get("titre") for d in data["failures"] if d.get("titre")}
+    return titles
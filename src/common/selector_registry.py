@@ -0,0 +1,125 @@
+# src/common/selector_registry.py
+# ---------------------------------------------------------------------------
+# Registre de stratégies de localisation auto-apprenant.
+# Pour une cible donnée (bouton « Voir plus »…), plusieurs stratégies
+# équivalentes existent ; chaque échec coûte un aller-retour WebDriver. Le
+# registre essaie d'abord la dernière stratégie gagnante pour la même page et
+# le même type de bloc (move-to-front), garde cet ordre entre les runs
+# (output/state/selectors.json) et compte réussites / replis / échecs.
+# Les libellés de cartes (aria-label, lien interne, texte visible) ne sont pas
+# équivalents : ils gardent une priorité fixe (first), sinon le libellé
+# exporté, les clés de résolution et les empreintes changeraient d'un run à
+# l'autre selon la stratégie gagnante.
+# ---------------------------------------------------------------------------
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+from selenium.webdriver.common.by import By
+
+from src.common.change_detection import STATE_DIR
+from src.common.export_utils import file_lock
+
+REGISTRY_FILE = STATE_DIR / "selectors.json"
+
+# ---- stratégies partagées par les scrapers ---------------------------------
+def _slide_aria_label(sl) -> str:
+    lab = (sl.get_attribute('aria-label') or '').strip()
+    # « 3 / 12 » : position dans le carrousel, pas un nom de carte
+    return '' if lab.replace(' ', '').replace('/', '').isdigit() else lab
+
+def _inner_link_label(sl) -> str:
+    inner = sl.find_elements(By.CSS_SELECTOR, "div[role='link'][aria-label]")
+    return (inner[0].get_attribute('aria-label') or '').strip() if inner else ''
+
+def _visible_text(sl) -> str:
+    txt = sl.find_elements(By.CSS_SELECTOR, 'span[aria-hidden], h2, h3')
+    return txt[0].text.strip() if txt else ''
+
+# Chaîne de priorité fixe (SelectorRegistry.first) : les valeurs diffèrent selon la source
+LABEL_STRATEGIES = {
+    "aria-label": _slide_aria_label,
+    "role-link":  _inner_link_label,
+    "texte":      _visible_text,
+}
+
+def _voir_plus_anchor(bloc):
+    found = bloc.find_elements(By.XPATH, ".//a[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]")
+    return found[0] if found else None
+
+def _voir_plus_role_link(bloc):
+    found = bloc.find_elements(By.XPATH, ".//*[@role='link' and contains(translate(@aria-label,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]")
+    return found[0] if found else None
+
+# Localisateurs équivalents (même élément) : ordre appris (SelectorRegistry.find)
+VOIR_PLUS_STRATEGIES = {
+    "lien-texte": _voir_plus_anchor,
+    "role-link":  _voir_plus_role_link,
+}
+
+class SelectorRegistry:
+    """Ordre appris des stratégies, par page puis par portée (« <type de bloc>:<cible> »)."""
+
+    def __init__(self, page: str, path: Path = REGISTRY_FILE):
+        self.page = page
+        self.path = path
+        self.stats = Counter()
+        try:
+            self._orders: dict[str, list[str]] = json.loads(path.read_text(encoding="utf-8")).get(page, {})
+        except (OSError, ValueError):
+            self._orders = {}
+
+    def order(self, scope: str, names) -> list[str]:
+        """Stratégies connues dans l'ordre appris, puis les nouvelles dans l'ordre déclaré."""
+        learned = [n for n in self._orders.get(scope, []) if n in names]
+        return learned + [n for n in names if n not in learned]
+
+    def _try(self, root, strategies: dict[str, Callable], names: list[str]):
+        """(nom, valeur) de la première stratégie au résultat non vide, dans l'ordre `names`."""
+        self.stats["recherches"] += 1
+        for rank, name in enumerate(names):
+            self.stats["essais"] += 1
+            try:
+                value = strategies[name](root)
+            except Exception:
+                value = None
+            if value:
+                self.stats["premier essai" if rank == 0 else "repli"] += 1
+                return name, value
+        self.stats["introuvable"] += 1
+        return None, None
+
+    def find(self, scope: str, root, strategies: dict[str, Callable]):
+        """
+        Premier résultat non vide de stratégies équivalentes ; la gagnante passe en tête pour `scope`.
+        """
+        names = self.order(scope, list(strategies))
+        name, value = self._try(root, strategies, names)
+        if name:
+            self._orders[scope] = [name] + [n for n in names if n != name]
+        return value
+
+    def first(self, root, strategies: dict[str, Callable]):
+        """Premier résultat non vide dans l'ordre déclaré (stratégies non équivalentes : rien n'est appris)."""
+        return self._try(root, strategies, list(strategies))[1]
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"Sélecteurs : {s['recherches']} recherches, {s['premier essai']} au premier essai, "
+                f"{s['repli']} après repli, {s['introuvable']} introuvables ({s['essais']} essais)")
+
+    def save(self):
+        """Réécrit l'ordre appris de cette page sans toucher aux autres pages."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # lecture-modification-écriture sous verrou : des scrapers parallèles ne s'écrasent pas
+        with file_lock(self.path):
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            data[self.page] = self._orders
+            tmp = self.path.with_name(f"{self.path.stem}.{self.page}.tmp")   # un fichier temporaire par page
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp.replace(self.path)
@@ -1,15 +1,395 @@
-# src/common/selenium_setup.py
-
-from selenium import webdriver
-
-def new_driver():
-    opts = webdriver.ChromeOptions()
-    opts.add_argument("--window-size=1280,1024")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_argument("--headless=new")
-    opts.add_argument("--disable-dev-shm-usage")
-    # -----------------
-    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-    opts.add_experimental_option("useAutomationExtension", False)
-    return webdriver.Chrome(options=opts)
-
+# src/common/selenium_setup.py
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.common.log_setup import current_context
+from src.common.traffic_archive import TRAFFIC_MODE, TRAFFIC_ROOT, TrafficArchive, TrafficInterceptor
+
+logger = logging.getLogger(__name__)
+
+# -------------------- TÉLÉMÉTRIE / RECYCLAGE -------------------------------
+# Chrome garde des centaines de rechargements d'une page Angular lourde : la
+# mémoire grimpe jusqu'aux timeouts de fin de run. Le driver est donc mesuré
+# (RSS de l'arbre de processus + tas JS) et recyclé au prochain get() quand un
+# seuil est dépassé. Seuils à 0 = désactivés.
+MAX_COMMANDS   = int(os.getenv("DRIVER_MAX_COMMANDS", "4000"))
+MAX_RSS_MB     = float(os.getenv("DRIVER_MAX_RSS_MB", "1500"))
+MAX_HEAP_MB    = float(os.getenv("DRIVER_MAX_HEAP_MB", "600"))
+SAMPLE_SECONDS = float(os.getenv("DRIVER_SAMPLE_SECONDS", "30"))
+TELEMETRY_DIR  = Path("output") / "telemetry"
+
+# -------------------- MODE SANS ANIMATION -----------------------------------
+# Injecté via CDP sur chaque document : transitions/animations CSS coupées,
+# vitesse des carrousels Swiper/Slick à 0, défilement jamais « smooth ».
+# Les changements de diapo deviennent synchrones → settle() quasi nul, mais
+# seulement pour un navigateur où l'injection a réussi (animations_off).
+NO_ANIMATIONS = os.getenv("DRIVER_NO_ANIMATIONS", "1") == "1"
+SETTLE_NO_ANIM = 0.02   # pause résiduelle après une flèche en mode sans animation
+
+NO_ANIMATION_JS = r"""
+(() => {
+  const css = `*, *::before, *::after {
+      transition: none !important; transition-duration: 0s !important;
+      animation: none !important; animation-duration: 0s !important;
+      scroll-behavior: auto !important; }`;
+  const inject = () => {
+    if (document.getElementById('__no_anim')) return;
+    const st = document.createElement('style');
+    st.id = '__no_anim'; st.textContent = css;
+    (document.head || document.documentElement).appendChild(st);
+  };
+  if (document.documentElement) inject();
+  document.addEventListener('DOMContentLoaded', inject);
+
+  const instant = a => (a && typeof a === 'object') ? Object.assign({}, a, {behavior: 'instant'}) : a;
+  const siv = Element.prototype.scrollIntoView;
+  Element.prototype.scrollIntoView = function (a) { return siv.call(this, instant(a)); };
+  for (const name of ['scrollTo', 'scrollBy']) {
+    const orig = window[name];
+    window[name] = function (a, b) { return b === undefined ? orig.call(this, instant(a)) : orig.call(this, a, b); };
+  }
+
+  let queued = false;
+  const patchCarousels = () => {
+    queued = false;
+    document.querySelectorAll('swiper-container, .swiper, .swiper-container').forEach(el => {
+      if (el.tagName === 'SWIPER-CONTAINER' && el.getAttribute('speed') !== '0') el.setAttribute('speed', '0');
+      if (el.swiper && el.swiper.params && el.swiper.params.speed !== 0) el.swiper.params.speed = 0;
+    });
+    const $ = window.jQuery;
+    if ($ && $.fn && $.fn.slick) {
+      $('.slick-initialized').each(function () {
+        try { if (this.slick && this.slick.options.speed !== 0) $(this).slick('slickSetOption', 'speed', 0, false); } catch (e) {}
+      });
+    }
+  };
+  new MutationObserver(() => {
+    if (!queued) { queued = true; requestAnimationFrame(patchCarousels); }
+  }).observe(document, {childList: true, subtree: true});
+})();
+"""
+
+# -------------------- ENREGISTREMENT / REJEU DU TRAFIC ---------------------
+# DRIVER_TRAFFIC=record : les réponses du site sont archivées dans
+# output/traffic/<DRIVER_TRAFFIC_NAME ou nom du scraper>/ ; DRIVER_TRAFFIC=replay :
+# elles sont resservies hors ligne (voir traffic_archive.py).
+TRAFFIC_NAME = os.getenv("DRIVER_TRAFFIC_NAME", "")
+
+def settle(seconds: float, dr=None):
+    """Pause après une flèche de carrousel / un scroll ; quasi nulle si les animations de `dr` sont coupées."""
+    time.sleep(min(seconds, SETTLE_NO_ANIM) if getattr(dr, "animations_off", False) else seconds)
+
+_STATS = {"drivers": 0, "recycles": 0, "commands": 0, "samples": 0, "peak_rss_mb": 0.0, "peak_heap_mb": 0.0,
+          "recorded": 0, "served": 0, "missed": 0, "unreadable": 0}
+
+def _chrome_options():
+    opts = webdriver.ChromeOptions()
+    opts.add_argument("--window-size=1280,1024")
+    opts.add_argument("--disable-blink-features=AutomationControlled")
+    opts.add_argument("--headless=new")
+    opts.add_argument("--disable-dev-shm-usage")
+    # -----------------
+    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+    opts.add_experimental_option("useAutomationExtension", False)
+    return opts
+
+def _cdp_cookie(c: dict) -> dict:
+    """Cookie Selenium → paramètre CDP Network.setCookies."""
+    out = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if k in c}
+    if "expiry" in c:
+        out["expires"] = c["expiry"]
+    return out
+
+class ManagedDriver:
+    """
+    Proxy d'un webdriver.Chrome : mêmes méthodes, plus la mesure mémoire et le
+    recyclage transparent (quit, relance, restauration des cookies – dont le
+    consentement OneTrust – puis de l'URL et du défilement).
+    """
+
+    def __init__(self, label: str | None = None):
+        self.label = label or Path(sys.argv[0]).stem or "driver"
+        self.recycles = 0
+        self.pool = None   # DriverPool d'origine : quit() y rend le navigateur
+        self._sampling = False
+        self._traffic = None
+        self._archive = (TrafficArchive(TRAFFIC_NAME or self.label, fresh=TRAFFIC_MODE == "record")
+                         if TRAFFIC_MODE in ("record", "replay") else None)
+        self._start()
+
+    def _start(self):
+        self._dr = webdriver.Chrome(options=_chrome_options())
+        self.animations_off = False   # pauses raccourcies par settle() seulement si l'injection a réussi
+        if NO_ANIMATIONS:
+            try:
+                self._dr.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NO_ANIMATION_JS})
+                self.animations_off = True
+            except Exception as e:
+                logger.warning(f"{self.label} : mode sans animation indisponible ({type(e).__name__}), pauses normales")
+        if self._archive:
+            self._traffic = TrafficInterceptor(self._dr, self._archive, TRAFFIC_MODE)
+            self._traffic.start()
+        self._commands = 0
+        self._last_sample = time.monotonic()
+        self.last_rss_mb = self.last_heap_mb = 0.0
+        _STATS["drivers"] += 1
+        raw_execute = self._dr.execute
+
+        def execute(command, params=None):
+            # Compte aussi les commandes des WebElement (el.click, el.get_attribute…)
+            self._commands += 1
+            _STATS["commands"] += 1
+            resp = raw_execute(command, params)
+            if SAMPLE_SECONDS and not self._sampling and time.monotonic() - self._last_sample >= SAMPLE_SECONDS:
+                self.sample()
+            return resp
+
+        self._dr.execute = execute
+
+    def __getattr__(self, name):
+        return getattr(self._dr, name)
+
+    def _stop_traffic(self):
+        if self._traffic:
+            self._traffic.stop()
+            for k in ("recorded", "served", "missed", "unreadable"):
+                _STATS[k] += getattr(self._traffic, k)
+            self._traffic = None
+
+    # ---- mesure ------------------------------------------------------------
+    def _tree_rss_mb(self) -> float:
+        with suppress(Exception):
+            root = psutil.Process(self._dr.service.process.pid)
+            procs = [root, *root.children(recursive=True)]
+            total = 0
+            for p in procs:
+                with suppress(psutil.Error):
+                    total += p.memory_info().rss
+            return total / 2**20
+        return 0.0
+
+    def sample(self) -> dict:
+        """Relève RSS (chromedriver + Chrome + renderers) et tas JS de la page courante."""
+        self._sampling = True
+        try:
+            heap = None
+            with suppress(Exception):
+                heap = self._dr.execute_script(
+                    "return performance.memory ? performance.memory.usedJSHeapSize : null")
+            self.last_rss_mb = round(self._tree_rss_mb(), 1)
+            self.last_heap_mb = round((heap or 0) / 2**20, 1)
+            self._last_sample = time.monotonic()
+            _STATS["samples"] += 1
+            _STATS["peak_rss_mb"] = max(_STATS["peak_rss_mb"], self.last_rss_mb)
+            _STATS["peak_heap_mb"] = max(_STATS["peak_heap_mb"], self.last_heap_mb)
+            rec = {"ts": datetime.now().isoformat(timespec="seconds"), "label": self.label,
+                   "rss_mb": self.last_rss_mb, "heap_mb": self.last_heap_mb,
+                   "commands": self._commands, "recycles": self.recycles}
+            with suppress(OSError):
+                TELEMETRY_DIR.mkdir(parents=True, exist_ok=True)
+                with (TELEMETRY_DIR / f"memory_{self.label}_{datetime.now():%Y-%m-%d}.jsonl").open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec) + "\n")
+            return rec
+        finally:
+            self._sampling = False
+
+    def recycle_reason(self) -> str | None:
+        if MAX_COMMANDS and self._commands >= MAX_COMMANDS:
+            return f"{self._commands} commandes"
+        if MAX_RSS_MB and self.last_rss_mb >= MAX_RSS_MB:
+            return f"RSS {self.last_rss_mb} Mo"
+        if MAX_HEAP_MB and self.last_heap_mb >= MAX_HEAP_MB:
+            return f"tas JS {self.last_heap_mb} Mo"
+        return None
+
+    # ---- recyclage ---------------------------------------------------------
+    def recycle(self, restore_url: bool = True, reason: str = "manuel"):
+        """Redémarre Chrome en conservant cookies (consentement), URL et défilement."""
+        cookies, url, y = [], None, 0
+        with suppress(Exception):
+            cookies = self._dr.get_cookies()
+            url = self._dr.current_url
+            y = self._dr.execute_script("return window.scrollY") or 0
+        logger.info(f"Recyclage de Chrome ({reason}, RSS {self.last_rss_mb} Mo, tas JS {self.last_heap_mb} Mo)")
+        self._stop_traffic()
+        with suppress(Exception):
+            self._dr.quit()
+        self._start()
+        self.recycles += 1
+        _STATS["recycles"] += 1
+        if cookies:
+            with suppress(Exception):
+                self._dr.execute_cdp_cmd("Network.setCookies", {"cookies": [_cdp_cookie(c) for c in cookies]})
+        if restore_url and url and url.startswith("http"):
+            self._dr.get(url)
+            with suppress(Exception):
+                self._dr.execute_script("window.scrollTo(0, arguments[0]);", y)
+
+    def get(self, url: str):
+        # Point sûr : tous les WebElement précédents sont de toute façon perdus au chargement.
+        reason = self.recycle_reason()
+        if reason:
+            self.recycle(restore_url=False, reason=reason)
+        self._dr.get(url)
+
+    def quit(self):
+        if self.pool is not None:
+            self.pool.release(self)
+            return
+        if SAMPLE_SECONDS:
+            with suppress(Exception):
+                self.sample()
+        self._stop_traffic()
+        self._dr.quit()
+
+def _print_stats():
+    if _STATS["drivers"]:
+        logger.info(f"Mémoire Chrome : pic RSS {_STATS['peak_rss_mb']} Mo, pic tas JS {_STATS['peak_heap_mb']} Mo, "
+              f"{_STATS['commands']} commandes, {_STATS['drivers']} navigateur(s), {_STATS['recycles']} recyclage(s)")
+    if TRAFFIC_MODE == "record":
+        logger.info(f"Trafic enregistré : {_STATS['recorded']} réponse(s) dans {TRAFFIC_ROOT}"
+                    + (f", {_STATS['unreadable']} réponse(s) au corps illisible non archivée(s)" if _STATS['unreadable'] else ""))
+    elif TRAFFIC_MODE == "replay":
+        logger.info(f"Trafic rejoué : {_STATS['served']} réponse(s) servie(s), {_STATS['missed']} requête(s) absente(s) de l'archive")
+
+atexit.register(_print_stats)
+
+# -------------------- POOL DE NAVIGATEURS CHAUDS ----------------------------
+# Mode service (src/common/service.py) : les navigateurs sont lancés une fois,
+# consentement cookies accepté et bundle Angular en cache. new_driver() en
+# emprunte un, quit() le rend (onglets fermés, page vide) au lieu de fermer
+# Chrome ; un navigateur mort est remplacé à l'emprunt. Un lancement raté ne
+# fait pas perdre la place : elle reste vide (None) et le prochain emprunt
+# retente le lancement. L'attente d'un navigateur libre est bornée
+# (POOL_ACQUIRE_TIMEOUT_S).
+CONSENT_BUTTON = (By.ID, "onetrust-accept-btn-handler")
+ACQUIRE_TIMEOUT_S = float(os.getenv("POOL_ACQUIRE_TIMEOUT_S", "3600"))
+
+def warm_up(dr: ManagedDriver, url: str):
+    """Charge `url` et accepte la bannière OneTrust : cookies et cache HTTP prêts."""
+    dr.get(url)
+    with suppress(Exception):
+        WebDriverWait(dr, 10).until(EC.element_to_be_clickable(CONSENT_BUTTON)).click()
+
+class DriverPool:
+    def __init__(self, size: int, warm_url: str | None = None, label: str = "service"):
+        self.size, self.warm_url, self.label = size, warm_url, label
+        self._free: queue.SimpleQueue[ManagedDriver | None] = queue.SimpleQueue()   # None : place à relancer
+        self._lock = threading.Lock()
+        self._all: list[ManagedDriver] = []
+        self.borrowed = 0
+
+    def _launch(self) -> ManagedDriver:
+        dr = ManagedDriver(self.label)
+        if self.warm_url:
+            with suppress(Exception):
+                warm_up(dr, self.warm_url)
+        dr.pool = self
+        with self._lock:
+            self._all.append(dr)
+        return dr
+
+    def _refill(self, dr: ManagedDriver | None = None):
+        """Rend une place au pool : un navigateur neuf, ou une place vide si le lancement échoue."""
+        if dr is not None:
+            self._discard(dr)
+        try:
+            self._free.put(self._launch())
+        except Exception as e:
+            logger.warning(f"Lancement d'un navigateur du pool en échec ({e}) : nouvel essai au prochain emprunt")
+            self._free.put(None)
+
+    def start(self):
+        """Lance et chauffe les navigateurs en parallèle."""
+        threads = [threading.Thread(target=self._refill) for _ in range(self.size)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _alive(self, dr: ManagedDriver) -> bool:
+        with suppress(Exception):
+            dr.current_url
+            return True
+        return False
+
+    def acquire(self, label: str | None = None, timeout: float | None = ACQUIRE_TIMEOUT_S) -> ManagedDriver:
+        """Emprunte un navigateur (attend au plus `timeout` s qu'un autre soit rendu si tous sont pris)."""
+        try:
+            dr = self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"aucun navigateur du pool libéré en {timeout:.0f} s") from None
+        if dr is None or not self._alive(dr):
+            if dr is not None:
+                logger.warning(f"Navigateur du pool hors service ({dr.label}) : remplacement")
+                self._discard(dr)
+            try:
+                dr = self._launch()
+            except Exception:
+                self._free.put(None)   # la place reste au pool : nouvel essai au prochain emprunt
+                raise
+        dr.label = label or current_context().get("scraper") or self.label   # fichier de télémétrie
+        with self._lock:
+            self.borrowed += 1
+        return dr
+
+    def release(self, dr: ManagedDriver):
+        """Remet le navigateur à zéro (un seul onglet, page vide) et le rend au pool."""
+        try:
+            handles = dr.window_handles
+            for h in handles[1:]:
+                dr.switch_to.window(h)
+                dr.close()
+            dr.switch_to.window(handles[0])
+            dr._dr.get("about:blank")
+            reason = dr.recycle_reason()
+            if reason:
+                dr.recycle(restore_url=False, reason=reason)
+        except Exception:
+            self._refill(dr)
+            return
+        self._free.put(dr)
+
+    def _discard(self, dr: ManagedDriver):
+        with self._lock:
+            if dr in self._all:
+                self._all.remove(dr)
+        dr.pool = None
+        with suppress(Exception):
+            dr.quit()
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+        for dr in drivers:
+            dr.pool = None
+            with suppress(Exception):
+                dr.quit()
+
+_POOL: DriverPool | None = None
+
+def use_pool(pool: DriverPool | None):
+    """Installe (ou retire, avec None) le pool servi par new_driver()."""
+    global _POOL
+    _POOL = pool
+
+def new_driver(label: str | None = None) -> ManagedDriver:
+    if _POOL is not None:
+        return _POOL.acquire(label)
+    return ManagedDriver(label)
@@ -0,0 +1,332 @@
+# src/common/service.py
+# ---------------------------------------------------------------------------
+# Mode service : un processus qui reste chaud entre deux collectes.
+#  – modules scrapers importés une seule fois (selenium, pandas, pyarrow…)
+#  – SERVICE_BROWSERS navigateurs lancés au démarrage, avec le consentement
+#    cookies accepté et le bundle Angular en cache (DriverPool de
+#    selenium_setup). Les scrapers les empruntent via new_driver() au lieu
+#    de lancer Chrome.
+#  – demandes reçues sur un socket Unix local (SERVICE_SOCKET, par défaut
+#    output/state/collector.sock), ou en TCP sur 127.0.0.1:SERVICE_PORT sans
+#    AF_UNIX. Une demande est un objet JSON par ligne ; les événements du
+#    scraper sont renvoyés au client au fil de l'eau, par un thread d'écriture
+#    (file bornée) : un client lent ou bloqué ne ralentit pas la collecte.
+# Une même page ne tourne qu'une fois à la fois. Deux pages différentes peuvent
+# tourner en parallèle, dans la limite du nombre de navigateurs.
+#   python -m src.common.service serve [--browsers 2]
+#   python -m src.common.service run page_jeunesse [--force] [--engine http] [--snapshot]
+#   python -m src.common.service status | stop
+# Une collecte du service exporte comme un scraper lancé seul (archive du jour,
+# historique, état). Enrichissement, liens et e-mail restent faits par run.py.
+# ---------------------------------------------------------------------------
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import pkgutil
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()   # avant les imports qui lisent leur configuration (selenium_setup, scrapers)
+
+from src.common.dom_snapshots import ENABLED as SNAPSHOTS
+from src.common.log_setup import LEVELS, ContextFilter, JsonFormatter, default_level, log_context, setup_logging
+from src.common.retry_queue import describe
+from src.common.selenium_setup import DriverPool, use_pool
+
+SOCKET_PATH = Path(os.getenv("SERVICE_SOCKET", str(Path("output") / "state" / "collector.sock")))
+PORT = int(os.getenv("SERVICE_PORT", "8765"))
+BROWSERS = int(os.getenv("SERVICE_BROWSERS", "2"))
+WARM_URL = os.getenv("SERVICE_WARM_URL", "https://video.telequebec.tv/")
+CLIENT_QUEUE = int(os.getenv("SERVICE_CLIENT_QUEUE", "10000"))   # événements en attente d'envoi au client
+UNIX = hasattr(socket, "AF_UNIX")
+ADDRESS = str(SOCKET_PATH) if UNIX else f"127.0.0.1:{PORT}"
+
+logger = logging.getLogger("service")
+
+# ---- scrapers ---------------------------------------------------------------
+def load_scrapers() -> dict:
+    """Importe une fois les modules de src/scrapers ; retourne {PAGE: module}."""
+    import src.scrapers
+    mods = {}
+    for info in sorted(pkgutil.iter_modules(src.scrapers.__path__), key=lambda i: i.name):
+        mod = importlib.import_module(f"src.scrapers.{info.name}")
+        if hasattr(mod, "PAGE") and hasattr(mod, "run"):
+            mods[mod.PAGE] = mod
+    return mods
+
+def find_scraper(mods: dict, name: str):
+    """Module désigné par sa page (page_jeunesse), son nom de module, son numéro (3) ou un extrait unique."""
+    for page, mod in mods.items():
+        stem = mod.__name__.rsplit(".", 1)[-1]
+        if name in (page, stem, stem.split("_", 1)[0]):
+            return mod
+    candidats = [m for p, m in mods.items() if name.casefold() in p.casefold()]
+    if len(candidats) == 1:
+        return candidats[0]
+    raise KeyError(name)
+
+# ---- service ----------------------------------------------------------------
+class CollectorService:
+    def __init__(self, browsers: int = BROWSERS, warm_url: str | None = WARM_URL):
+        self.started = datetime.now()
+        self.scrapers = load_scrapers()
+        self.pool = DriverPool(browsers, warm_url) if browsers > 0 else None
+        self.locks = {page: threading.Lock() for page in self.scrapers}
+        self.running: dict[str, str] = {}
+        self.runs = 0
+
+    def start(self):
+        if self.pool:
+            t0 = time.perf_counter()
+            self.pool.start()
+            use_pool(self.pool)
+            logger.info(f"{self.pool.size} navigateur(s) chaud(s) en {time.perf_counter() - t0:.1f} s")
+
+    def run_page(self, mod, options: dict) -> dict:
+        """Collecte une page dans le thread courant ; retourne son bilan."""
+        page = mod.PAGE
+        lock = self.locks[page]
+        with log_context(scraper=page):
+            if not lock.acquire(blocking=False):
+                logger.info(f"{page} déjà en cours : attente de la fin de la collecte précédente")
+                lock.acquire()
+            t0 = time.perf_counter()
+            self.running[page] = datetime.now().isoformat(timespec="seconds")
+            try:
+                mod.run(inventory_only=bool(options.get("inventory")), force=bool(options.get("force")),
+                        engine=options.get("engine"), snapshot=bool(options.get("snapshot")) or SNAPSHOTS)
+                ok, erreur = True, ""
+            except Exception as e:
+                logger.exception(f"{page} : erreur pendant la collecte")
+                ok, erreur = False, describe(e)
+            finally:
+                self.running.pop(page, None)
+                self.runs += 1
+                lock.release()
+        return {"page": page, "ok": ok, "duree_s": round(time.perf_counter() - t0, 1), "erreur": erreur}
+
+    def status(self) -> dict:
+        return {"depuis": self.started.isoformat(timespec="seconds"), "pages": list(self.scrapers),
+                "navigateurs": self.pool.size if self.pool else 0,
+                "emprunts": self.pool.borrowed if self.pool else 0,
+                "collectes": self.runs, "en_cours": dict(self.running)}
+
+    def close(self):
+        use_pool(None)
+        if self.pool:
+            self.pool.close()
+
+# ---- protocole ---------------------------------------------------------------
+class _ClientHandler(logging.Handler):
+    """
+    Renvoie au client, en JSON, les événements émis par le thread qui traite sa demande.
+    emit() ne fait que déposer la ligne dans une file ; un thread dédié l'écrit sur le socket.
+    """
+
+    def __init__(self, wfile, maxsize: int = CLIENT_QUEUE):
+        super().__init__()
+        self.wfile = wfile
+        self.thread = threading.get_ident()
+        self.setFormatter(JsonFormatter())
+        self.addFilter(lambda r: r.thread == self.thread)
+        self.addFilter(ContextFilter())
+        self.lines: queue.Queue[str | None] = queue.Queue(maxsize)
+        self.dropped = 0
+        self.writer = threading.Thread(target=self._write, name="service-client", daemon=True)
+        self.writer.start()
+
+    def emit(self, record):
+        try:
+            self.lines.put_nowait(self.format(record) + "\n")
+        except queue.Full:
+            self.dropped += 1   # client trop lent : événement perdu, la collecte continue
+
+    def _write(self):
+        connected = True
+        while (line := self.lines.get()) is not None:
+            if not connected:
+                continue
+            try:
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                connected = False   # client parti : la file est vidée sans écrire
+
+    def close(self):
+        """Envoie les événements encore en file (avant la réponse finale) et arrête le thread d'écriture."""
+        self.lines.put(None)
+        self.writer.join()
+        super().close()
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def _send(self, d: dict):
+        self.wfile.write((json.dumps(d, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def handle(self):
+        svc: CollectorService = self.server.service
+        try:
+            req = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return self._send({"fin": True, "ok": False, "erreur": "demande JSON illisible"})
+        cmd = req.get("cmd")
+        if cmd == "status":
+            self._send({"fin": True, "ok": True, **svc.status()})
+        elif cmd == "stop":
+            logger.info("Arrêt du service demandé.")
+            self._send({"fin": True, "ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif cmd == "run":
+            try:
+                mods = [find_scraper(svc.scrapers, p) for p in req.get("pages") or []]
+            except KeyError as e:
+                return self._send({"fin": True, "ok": False, "erreur": f"page inconnue : {e.args[0]}"})
+            client = _ClientHandler(self.wfile)
+            root = logging.getLogger()
+            root.addHandler(client)
+            try:
+                resultats = [svc.run_page(m, req) for m in mods]
+            finally:
+                root.removeHandler(client)
+                client.close()
+            if client.dropped:
+                logger.warning(f"{client.dropped} événement(s) non transmis au client (file pleine)")
+            self._send({"fin": True, "ok": all(r["ok"] for r in resultats), "resultats": resultats})
+        else:
+            self._send({"fin": True, "ok": False, "erreur": f"commande inconnue : {cmd}"})
+
+if UNIX:
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    class _Server(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+def make_server(service: CollectorService) -> socketserver.BaseServer:
+    if UNIX:
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        if SOCKET_PATH.exists():
+            if ping():
+                raise RuntimeError(f"un service écoute déjà sur {SOCKET_PATH}")
+            SOCKET_PATH.unlink()   # socket orphelin (service tué)
+        srv = _Server(str(SOCKET_PATH), _RequestHandler)
+        os.chmod(SOCKET_PATH, 0o600)
+    else:
+        srv = _Server(("127.0.0.1", PORT), _RequestHandler)
+    srv.service = service
+    return srv
+
+# ---- client -----------------------------------------------------------------
+def connect() -> socket.socket:
+    if UNIX:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            s.connect(str(SOCKET_PATH))
+        except OSError:
+            s.close()
+            raise
+        return s
+    return socket.create_connection(("127.0.0.1", PORT))
+
+def request(payload: dict, on_event=None) -> dict:
+    """Envoie une demande ; chaque événement intermédiaire passe à on_event ; retourne la réponse finale."""
+    with connect() as s, s.makefile("rwb") as f:
+        f.write(json.dumps(payload).encode("utf-8") + b"\n")
+        f.flush()
+        for line in f:
+            d = json.loads(line)
+            if d.get("fin"):
+                return d
+            if on_event:
+                on_event(d)
+    raise ConnectionError("service interrompu avant la fin de la demande")
+
+def ping() -> bool:
+    try:
+        return request({"cmd": "status"}).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+def _print_event(d: dict):
+    where = " ".join(str(v) for v in (d.get("scraper"), f"#{d['carrousel']}" if "carrousel" in d else None) if v)
+    print(f"{d.get('ts', '')[11:19]} [{d.get('level', 'INFO')}] {where} - {d.get('msg', '')}", flush=True)
+
+# ---- CLI --------------------------------------------------------------------
+def serve(browsers: int = BROWSERS, warm_url: str | None = WARM_URL, level: str | None = None):
+    setup_logging("service", level, scraper="service")
+    # chaque demande est une collecte ponctuelle : pas d'échéance héritée d'un run planifié
+    for k in ("RUN_DEADLINE", "RUN_BUDGET_MINUTES"):
+        os.environ.pop(k, None)
+    t0 = time.perf_counter()
+    svc = CollectorService(browsers, warm_url)
+    srv = None
+    try:
+        svc.start()
+        srv = make_server(svc)
+        logger.info(f"Service prêt en {time.perf_counter() - t0:.1f} s : {len(svc.scrapers)} page(s) "
+                    f"({', '.join(svc.scrapers)}), écoute sur {ADDRESS}")
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if srv is not None:
+            srv.server_close()
+            if UNIX:
+                SOCKET_PATH.unlink(missing_ok=True)
+        svc.close()
+        logger.info(f"Service arrêté après {svc.runs} collecte(s).")
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Service de collecte chaud (navigateurs et scrapers gardés en mémoire).")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="démarre le service (premier plan)")
+    s.add_argument("--browsers", type=int, default=BROWSERS, help="navigateurs chauds (défaut : SERVICE_BROWSERS ou 2)")
+    s.add_argument("--warm-url", default=WARM_URL, help="page chargée au démarrage de chaque navigateur")
+    s.add_argument("--log-level", choices=LEVELS, default=default_level())
+    r = sub.add_parser("run", help="collecte une ou plusieurs pages via le service")
+    r.add_argument("pages", nargs="+", help="page (page_jeunesse), module ou numéro de scraper (3)")
+    r.add_argument("--force", action="store_true", help="ignore l'état du run précédent")
+    r.add_argument("--inventory", action="store_true", help="inventaire seul, sans crawl")
+    r.add_argument("--engine", choices=("selenium", "http"), help="moteur d'extraction")
+    r.add_argument("--snapshot", action="store_true", help="enregistre un instantané DOM de chaque page")
+    sub.add_parser("status", help="état du service")
+    sub.add_parser("stop", help="arrête le service")
+    args = p.parse_args(argv)
+
+    if args.cmd == "serve":
+        return serve(args.browsers, args.warm_url, args.log_level)
+    payload = {"cmd": args.cmd}
+    if args.cmd == "run":
+        payload.update(pages=args.pages, force=args.force, inventory=args.inventory, engine=args.engine,
+                       snapshot=args.snapshot)
+    try:
+        rep = request(payload, on_event=_print_event)
+    except OSError as e:
+        print(f"Service injoignable sur {ADDRESS} ({e}) : lancer « python -m src.common.service serve ».")
+        sys.exit(2)
+    if args.cmd == "run":
+        for res in rep.get("resultats", []):
+            print(f"{res['page']} : {'ok' if res['ok'] else 'échec'} en {res['duree_s']} s"
+                  + (f" ({res['erreur']})" if res["erreur"] else ""))
+    elif args.cmd == "status":
+        for k, v in rep.items():
+            if k not in ("fin", "ok"):
+                print(f"{k} : {v}")
+    if not rep.get("ok"):
+        if rep.get("erreur"):
+            print(f"Erreur : {rep['erreur']}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# src/common/sharding.py
+# ---------------------------------------------------------------------------
+# Répartition d'un run sur plusieurs processus / machines (--shard i/N).
+#  – partition déterministe : le carrousel n° k (tous les scrapers, y compris
+#    les tâches du scraper 4) appartient au shard ((k - 1) % N) + 1
+#  – chaque shard écrit une sortie partielle (CSV) + un manifeste JSON dans
+#    output/shards/<date>/ ; le manifeste est écrit en dernier → sa présence
+#    garantit que la sortie partielle est complète
+#  – merge_shards() (run.py --merge) reconstitue l'export habituel, dans
+#    l'ordre d'origine, dans l'archive datée et l'historique Parquet ; un seul
+#    jeu complet par page (même N, même run), jamais de mélange de tentatives
+# ---------------------------------------------------------------------------
+
+import argparse
+import csv
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from src.common.export_utils import export_rows, parse_row
+from src.common.change_detection import save_state
+from src.common.history import write_history
+from src.common.records import CardRow
+from src.common.resolution_store import current_run_id
+
+SHARD_ROOT = Path("output") / "shards"
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Type argparse pour « i/N » (1 ≤ i ≤ N)."""
+    try:
+        i, n = (int(x) for x in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"format attendu i/N, reçu {text!r}")
+    if not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"shard invalide {text!r} : 1 ≤ i ≤ N")
+    return i, n
+
+def in_shard(key: int, shard: tuple[int, int] | None) -> bool:
+    """True si l'unité n° `key` (1, 2, …) revient à ce shard ; toujours True hors sharding."""
+    return shard is None or (key - 1) % shard[1] == shard[0] - 1
+
+def _inventory_digest(inventory: list[dict]) -> str:
+    return hashlib.sha1("".join(b["fingerprint"] for b in inventory).encode()).hexdigest()
+
+def write_shard(page: str, base_name: str, columns, rows, keys, shard: tuple[int, int],
+                inventory: list[dict], date: str | None = None, incomplete=()) -> Path:
+    """
+    Écrit la sortie partielle d'un shard et son manifeste.
+    `keys[j]` est la clé d'ordre d'origine de `rows[j]` (liste d'entiers comparables) ;
+    `incomplete` : carrousels interrompus par le budget de temps (exclus de l'état au merge).
+    """
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    i, n = shard
+    out = SHARD_ROOT / date
+    out.mkdir(parents=True, exist_ok=True)
+    stem = f"{base_name}_{date}.part-{i}-of-{n}"
+    part = out / f"{stem}.csv"
+    with part.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows([columns, *rows])
+    manifest = {
+        "page": page, "base": base_name, "date": date, "shard": i, "total": n, "run_id": current_run_id(),
+        "columns": list(columns), "partial": part.name, "rows": len(rows),
+        "keys": [list(k) for k in keys], "inventory": inventory, "incomplete": sorted(incomplete),
+        "inventory_digest": _inventory_digest(inventory),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp = out / f"{stem}.json.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(out / f"{stem}.json")
+    return part
+
+def merge_shards(out_dir: str | Path, date: str | None = None, log=print) -> bool:
+    """Fusionne les shards complets du jour dans l'archive ; False si un jeu est incomplet."""
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    folder = SHARD_ROOT / date
+    groups: dict[str, list[dict]] = {}
+    for f in sorted(folder.glob("*.json")):
+        m = json.loads(f.read_text(encoding="utf-8"))
+        groups.setdefault(m["base"], []).append(m)
+    if not groups:
+        log(f"Aucun manifeste de shard dans {folder}.")
+        return False
+
+    all_ok = True
+    for base, found in groups.items():
+        # un jeu par N : une tentative précédente du jour avec un autre N ne doit pas s'y mêler
+        by_total: dict[int, list[dict]] = {}
+        for m in found:
+            by_total.setdefault(m["total"], []).append(m)
+        complete = [n for n, ms in by_total.items() if {m["shard"] for m in ms} == set(range(1, n + 1))]
+        if len(complete) != 1:
+            if complete:
+                log(f"ERREUR : {base} – plusieurs jeux de shards complets ({', '.join(f'N={n}' for n in sorted(complete))}) : "
+                    f"supprimer ceux de la tentative abandonnée dans {folder}.")
+            for n, ms in sorted(by_total.items()):
+                missing = sorted(set(range(1, n + 1)) - {m["shard"] for m in ms})
+                if missing:
+                    log(f"ERREUR : {base} incomplet, shard(s) manquant(s) : {missing} sur {n}.")
+            all_ok = False
+            continue
+        total = complete[0]
+        manifests = sorted(by_total.pop(total), key=lambda m: m["shard"])
+        if len({m.get("run_id") for m in manifests}) > 1:
+            log(f"ERREUR : {base} – shards issus de runs différents "
+                f"({', '.join(sorted(str(m.get('run_id')) for m in manifests))}) : fusion refusée.")
+            all_ok = False
+            continue
+        if len({m["inventory_digest"] for m in manifests}) > 1:
+            log(f"ATTENTION : {base} – la page a changé entre les shards (inventaires différents).")
+
+        keyed = []
+        for m in manifests:
+            with (folder / m["partial"]).open(newline="", encoding="utf-8") as f:
+                header, *rows = list(csv.reader(f, delimiter=";"))
+            keyed += zip(m["keys"], (parse_row(header, r) for r in rows))
+        keyed.sort(key=lambda kr: kr[0])
+        rows = [CardRow.from_row(r) for _, r in keyed]
+
+        zip_f, membres = export_rows(rows, manifests[0]["columns"], out_dir, base, date=date)
+        write_history(manifests[0]["page"], rows, date)
+        incomplete = {i for m in manifests for i in m.get("incomplete", [])}
+        save_state(manifests[0]["page"], manifests[0]["inventory"], [r for r in rows if r[0] not in incomplete])
+        log(f"{base} : {total} shard(s) fusionné(s), {len(rows)} lignes → {zip_f}")
+        obsoletes = [m for ms in by_total.values() for m in ms]   # jeux incomplets d'autres N
+        if obsoletes:
+            log(f"{base} : {len(obsoletes)} shard(s) d'une tentative précédente (N ≠ {total}) supprimé(s).")
+        for m in manifests + obsoletes:
+            (folder / m["partial"]).unlink(missing_ok=True)
+            (folder / m["partial"]).with_suffix(".json").unlink(missing_ok=True)
+    return all_ok
@@ -0,0 +1,144 @@
+# src/common/tab_resolver.py
+# ---------------------------------------------------------------------------
+# Résolution des cartes en onglets (CARD_TABS=M, M > 1).
+# Au lieu de « clic, attente de l'URL, retour, rechargement » carte par carte,
+# les liens des cartes sont cliqués avec leur `target` d'origine (_blank si le
+# lien n'en a pas) : chaque carte s'ouvre dans un onglet du même Chrome et la
+# page de liste ne bouge pas. Par lots de M onglets, l'URL finale de chaque
+# onglet est lue une fois sa navigation terminée, puis l'onglet est fermé.
+# Les cartes sans lien <a> (routeur Angular) ou en erreur sont laissées au
+# mode séquentiel du scraper. Un clic qui navigue dans l'onglet courant impose
+# un retour (rechargement de la liste) : les éléments du bloc sont alors
+# périmés, le lot s'arrête et les cartes restantes passent en séquentiel.
+# ---------------------------------------------------------------------------
+
+import os
+from collections import Counter
+from contextlib import suppress
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.common.selenium_setup import settle
+
+CARD_TABS = int(os.getenv("CARD_TABS", "0"))                     # 0 / 1 : mode séquentiel
+TAB_TIMEOUT_S = float(os.getenv("CARD_TABS_TIMEOUT_S", "15"))   # attente de la navigation d'un onglet
+
+class TabResolver:
+    """Ouvre des cartes dans des onglets (au plus `size` à la fois) et collecte leur URL finale."""
+
+    def __init__(self, dr, size: int = CARD_TABS, timeout: float = TAB_TIMEOUT_S):
+        self.dr = dr
+        self.size = max(size, 1)
+        self.timeout = timeout
+        self.main = dr.current_window_handle
+        self.home = dr.current_url
+        self.results: dict[str, str] = {}
+        self.errors: dict[str, Exception] = {}
+        self.stats = Counter()
+        self.navigated = False               # la liste a été quittée puis rechargée
+        self._pending: dict[str, str] = {}   # onglet → clé de la carte
+
+    def open(self, key: str, target) -> bool:
+        """Ouvre la carte `key` dans un onglet ; False si elle doit être résolue en séquentiel."""
+        links = [target] if target.tag_name == "a" else target.find_elements(By.CSS_SELECTOR, "a[href]")
+        if not links:
+            self.stats["sans lien"] += 1
+            return False
+        link = links[0]
+        avant = set(self.dr.window_handles)
+        self.dr.execute_script("arguments[0].target = arguments[0].target || '_blank';", link)
+        self.dr.execute_script("arguments[0].click();", link)
+        nouveaux = []
+        with suppress(TimeoutException):   # l'onglet apparaît de façon asynchrone
+            nouveaux = WebDriverWait(self.dr, 2, poll_frequency=0.05).until(
+                lambda d: [h for h in d.window_handles if h not in avant])
+        if not nouveaux:
+            # Navigation dans l'onglet courant (lien intercepté) : on revient à la liste,
+            # rechargée ; les éléments trouvés avant le clic ne sont plus utilisables
+            if self.dr.current_url != self.home:
+                self.navigated = True
+                with suppress(Exception):
+                    self.dr.back()
+            self.stats["sans onglet"] += 1
+            return False
+        self._pending[nouveaux[0]] = key
+        self.stats["onglets"] += 1
+        if len(self._pending) >= self.size:
+            self.drain()
+        return True
+
+    def drain(self):
+        """Lit l'URL finale de chaque onglet en attente, le ferme et revient à la liste."""
+        try:
+            for handle, key in self._pending.items():
+                try:
+                    self.dr.switch_to.window(handle)
+                    WebDriverWait(self.dr, self.timeout).until(
+                        lambda d: d.current_url not in ("", "about:blank")
+                        and d.execute_script("return document.readyState") == "complete")
+                    self.results[key] = self.dr.current_url
+                except Exception as e:
+                    self.errors[key] = e
+                finally:
+                    with suppress(Exception):
+                        self.dr.close()
+        finally:
+            self._pending.clear()
+            self.dr.switch_to.window(self.main)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.drain()
+
+def resolve_block(dr, bloc, cards: dict[str, int | None], size: int = CARD_TABS) -> dict[str, str]:
+    """
+    Ouvre en onglets les cartes d'un carrousel déjà chargé (libellé → index Swiper,
+    ou None pour une carte Slick) et retourne {libellé: URL} pour celles résolues.
+    """
+    if not cards:
+        return {}
+    restantes = dict(cards)
+    with TabResolver(dr, size) as tabs:
+        if all(sid is not None for sid in cards.values()):
+            # Swiper : seule la diapo active est cliquable ; un tour complet de flèches suffit
+            par_sid = {sid: lab for lab, sid in cards.items()}
+            total = len(bloc.find_elements(By.CSS_SELECTOR, "swiper-slide:not([class*='-duplicate'])"))
+            for _ in range(max(total, len(cards))):
+                with suppress(Exception):
+                    act = bloc.find_element(By.CSS_SELECTOR, 'swiper-slide.swiper-slide-active')
+                    lab = par_sid.get(int(act.get_attribute('data-swiper-slide-index')))
+                    if lab in restantes:
+                        restantes.pop(lab)
+                        tabs.open(lab, act)
+                if not restantes or tabs.navigated:
+                    break
+                with suppress(Exception):
+                    bloc.find_element(By.CSS_SELECTOR, '.ic-arrow-right-bg').click()
+                settle(0.15, dr)
+        else:
+            # Slick : toutes les cartes visibles de la fenêtre courante, puis flèche suivante
+            for _ in range(160):
+                for s in bloc.find_elements(By.CSS_SELECTOR, "app-slide:not(.slick-cloned)[aria-hidden='false']"):
+                    with suppress(Exception):
+                        nom = s.find_element(By.CSS_SELECTOR, 'h3 span[aria-hidden]').text.strip()
+                        if nom in restantes:
+                            restantes.pop(nom)
+                            tabs.open(nom, s)
+                    if tabs.navigated:
+                        break
+                if not restantes or tabs.navigated:
+                    break
+                try:
+                    nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next.slick-arrow')
+                except Exception:
+                    break
+                if 'slick-disabled' in (nxt.get_attribute('class') or ''):
+                    break
+                nxt.click()
+                settle(0.20, dr)
+    # Un onglet resté sur la page de liste n'a rien résolu
+    return {k: u for k, u in tabs.results.items() if u != tabs.home}
@@ -0,0 +1,191 @@
+# src/common/traffic_archive.py
+# ---------------------------------------------------------------------------
+# Enregistrement / rejeu du trafic réseau d'un run (DRIVER_TRAFFIC=record|replay).
+#  – record : interception CDP Fetch au stade « réponse » ; chaque réponse
+#    (statut, en-têtes, corps) est ajoutée à output/traffic/<nom>/
+#    (index.jsonl + corps adressés par SHA-1), puis la requête continue ; une
+#    réponse dont le corps n'a pas pu être lu n'est pas archivée (elle serait
+#    rejouée vide comme une réponse valide) : au rejeu, c'est une requête absente
+#  – replay : interception au stade « requête » ; la réponse enregistrée est
+#    servie par Fetch.fulfillRequest, sans réseau. Plusieurs réponses pour une
+#    même requête sont rejouées dans l'ordre (la dernière se répète). Une
+#    requête absente échoue (hors ligne strict) ou passe si TRAFFIC_PASSTHROUGH=1
+# La session CDP (événements Fetch.requestPaused) tourne dans un thread trio
+# ouvert par driver.bidi_connection() ; le driver reste synchrone.
+# ---------------------------------------------------------------------------
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import Counter
+from contextlib import suppress
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import trio
+
+TRAFFIC_ROOT = Path("output") / "traffic"
+TRAFFIC_MODE = os.getenv("DRIVER_TRAFFIC", "").lower()      # "", "record" ou "replay"
+PASSTHROUGH = os.getenv("TRAFFIC_PASSTHROUGH", "0") == "1"
+
+# Paramètres anti-cache ignorés dans la clé (sinon chaque rejeu serait un échec)
+VOLATILE_PARAMS = {"_", "cb", "t", "ts", "timestamp", "nocache"}
+# Réponses sans corps par définition : archivées vides sans Fetch.getResponseBody
+_NO_BODY = {204, 205, 304}
+# Le corps est rejoué décodé : ces en-têtes ne décrivent plus ce qui est servi
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_LOCK = threading.Lock()
+_CLEARED: set[Path] = set()
+
+def request_key(method: str, url: str, post_data: str | None = None) -> str:
+    """Clé d'une requête : méthode + URL sans paramètres volatils (+ empreinte du corps POST)."""
+    parts = urlsplit(url)
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k not in VOLATILE_PARAMS])
+    key = f"{method.upper()} {urlunsplit(parts._replace(query=query, fragment=''))}"
+    if post_data:
+        key += " " + hashlib.sha1(post_data.encode("utf-8")).hexdigest()
+    return key
+
+class TrafficArchive:
+    """Archive locale d'un run : index.jsonl (une réponse par ligne) + bodies/<sha1>."""
+
+    def __init__(self, name: str, fresh: bool = False):
+        self.dir = TRAFFIC_ROOT / name
+        self.bodies = self.dir / "bodies"
+        self._entries: dict[str, list[dict]] | None = None
+        self._served = Counter()
+        if fresh:
+            # Un nouvel enregistrement remplace le précédent (une seule fois par processus)
+            with _LOCK:
+                if self.dir not in _CLEARED:
+                    shutil.rmtree(self.dir, ignore_errors=True)
+                    _CLEARED.add(self.dir)
+
+    def add(self, key: str, status: int, headers: list[list[str]], body: bytes):
+        digest = hashlib.sha1(body).hexdigest()
+        with _LOCK:
+            self.bodies.mkdir(parents=True, exist_ok=True)
+            f = self.bodies / digest
+            if not f.exists():
+                f.write_bytes(body)
+            with (self.dir / "index.jsonl").open("a", encoding="utf-8") as fp:
+                fp.write(json.dumps({"key": key, "status": status, "headers": headers, "body": digest},
+                                    ensure_ascii=False) + "\n")
+
+    def lookup(self, key: str) -> tuple[int, list[list[str]], bytes] | None:
+        with _LOCK:
+            if self._entries is None:
+                self._entries = {}
+                with suppress(OSError):
+                    for line in (self.dir / "index.jsonl").read_text(encoding="utf-8").splitlines():
+                        e = json.loads(line)
+                        self._entries.setdefault(e["key"], []).append(e)
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            e = entries[min(self._served[key], len(entries) - 1)]
+            self._served[key] += 1
+        return e["status"], e["headers"], (self.bodies / e["body"]).read_bytes()
+
+class TrafficInterceptor:
+    """Session CDP Fetch attachée à un webdriver.Chrome, dans un thread dédié."""
+
+    def __init__(self, driver, archive: TrafficArchive, mode: str):
+        self.driver = driver
+        self.archive = archive
+        self.mode = mode
+        self.recorded = self.served = self.missed = self.unreadable = 0
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._token = None
+        self._scope: trio.CancelScope | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"traffic-{mode}")
+
+    def start(self, timeout: float = 30):
+        """Démarre l'interception ; ne rend la main qu'une fois Fetch.enable appliqué."""
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._error:
+            raise RuntimeError(f"Interception réseau indisponible ({self.mode}) : {self._error}")
+
+    def stop(self):
+        if self._token and self._scope:
+            with suppress(Exception):
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+        self._thread.join(5)
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except BaseException as e:   # noqa: BLE001 – remonté à start() si avant _ready
+            self._error = e
+            self._ready.set()
+
+    async def _main(self):
+        self._token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as scope:
+            self._scope = scope
+            async with self.driver.bidi_connection() as conn:
+                session, dt = conn.session, conn.devtools
+                stage = dt.fetch.RequestStage.RESPONSE if self.mode == "record" else dt.fetch.RequestStage.REQUEST
+                await session.execute(dt.fetch.enable(
+                    patterns=[dt.fetch.RequestPattern(url_pattern="*", request_stage=stage)]))
+                events = session.listen(dt.fetch.RequestPaused)
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for ev in events:
+                        nursery.start_soon(self._handle, session, dt, ev)
+
+    async def _handle(self, session, dt, ev):
+        req = ev.request
+        post = getattr(req, "post_data", None) or "".join(
+            e.bytes_ or "" for e in (getattr(req, "post_data_entries", None) or []))
+        key = request_key(req.method, req.url, post)
+        try:
+            if self.mode == "record":
+                await self._record(session, dt, ev, key)
+            else:
+                await self._replay(session, dt, ev, key)
+        except Exception:
+            # Une requête mise en pause et jamais relâchée bloquerait la page
+            with suppress(Exception):
+                await session.execute(dt.fetch.continue_request(ev.request_id))
+
+    async def _record(self, session, dt, ev, key):
+        status = ev.response_status_code
+        if status is not None:   # échec réseau (response_error_reason) : rien à enregistrer
+            body = b""
+            if not (300 <= status < 400 or status < 200 or status in _NO_BODY):
+                try:
+                    data, b64 = await session.execute(dt.fetch.get_response_body(ev.request_id))
+                    body = base64.b64decode(data) if b64 else data.encode("utf-8")
+                except Exception:
+                    body = None   # corps illisible : pas d'entrée plutôt qu'une réponse vide
+            if body is None:
+                self.unreadable += 1
+            else:
+                headers = [[h.name, h.value] for h in (ev.response_headers or [])]
+                self.archive.add(key, status, headers, body)
+                self.recorded += 1
+        await session.execute(dt.fetch.continue_request(ev.request_id))
+
+    async def _replay(self, session, dt, ev, key):
+        hit = self.archive.lookup(key)
+        if hit is None:
+            self.missed += 1
+            if PASSTHROUGH:
+                await session.execute(dt.fetch.continue_request(ev.request_id))
+            else:
+                await session.execute(dt.fetch.fail_request(ev.request_id, dt.network.ErrorReason.INTERNET_DISCONNECTED))
+            return
+        status, headers, body = hit
+        await session.execute(dt.fetch.fulfill_request(
+            ev.request_id, response_code=status,
+            response_headers=[dt.fetch.HeaderEntry(name=n, value=v) for n, v in headers
+                              if n.lower() not in _DROP_HEADERS],
+            body=base64.b64encode(body).decode("ascii")))
+        self.served += 1
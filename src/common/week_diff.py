@@ -0,0 +1,132 @@
+# src/common/week_diff.py
+# ---------------------------------------------------------------------------
+# Changements d'une semaine à l'autre, calculés sur l'historique Parquet
+# (src/common/history.py) : pour chaque page exportée aujourd'hui, les lignes
+# du jour sont jointes à celles du run précédent de la même page sur la clé
+# (titre du carrousel, libellé de la carte), via un dictionnaire → temps
+# linéaire, sans rouvrir les archives ZIP ni relire les XLSX.
+# Rapportés (feuille « changements » de l'archive) :
+#  – carrousel ajouté / retiré / déplacé (une ligne par carrousel)
+#  – dans un carrousel présent les deux semaines : carte ajoutée / retirée,
+#    carte déplacée (# différent), URL modifiée
+#  – un carrousel que le run du jour n'a pas terminé (budget épuisé, échec
+#    définitif ; fichiers de output/coverage/ et output/failures/) n'est
+#    jamais déclaré retiré, ni ses cartes : une ligne « carrousel non vérifié »
+#   python -m src.common.week_diff [--date AAAA-MM-JJ]
+# ---------------------------------------------------------------------------
+
+import argparse
+from collections import Counter
+from datetime import datetime
+
+from src.common.budget import unfinished_titles
+from src.common.history import history_dates, history_pages, read_rows
+from src.common.records import CardRow
+from src.common.retry_queue import failed_titles
+
+CHANGE_COLUMNS = ["Page", "Changement", "Titre du carrousel", "titre (card)",
+                  "# Carrousel (préc.)", "# (préc.)", "# Carrousel", "#", "URL (préc.)", "URL détail"]
+
+def _index(rows: list[CardRow]) -> dict[tuple, CardRow]:
+    """(titre, carte, n° d'occurrence) → ligne ; un libellé répété dans un carrousel reste distinct."""
+    seen, out = Counter(), {}
+    for r in rows:
+        k = (r.titre, r.carte)
+        out[(*k, seen[k])] = r
+        seen[k] += 1
+    return out
+
+def _carousels(rows: list[CardRow]) -> dict[str, tuple[int, int]]:
+    """titre → (position, nombre de lignes), dans l'ordre de la page."""
+    out = {}
+    for r in rows:
+        idx, n = out.get(r.titre, (r.carrousel, 0))
+        out[r.titre] = (idx, n + 1)
+    return out
+
+def _card(page: str, kind: str, old: CardRow | None, new: CardRow | None) -> list:
+    r = new or old
+    return [page, kind, r.titre, r.carte,
+            old.carrousel if old else None, old.ordre if old else None,
+            new.carrousel if new else None, new.ordre if new else None,
+            old.url if old else "", new.url if new else ""]
+
+def _norm(titre: str) -> str:
+    return " ".join(titre.split()).casefold()
+
+def diff_page(page: str, old: list[CardRow], new: list[CardRow], unverified: set[str] = frozenset()) -> list[list]:
+    """
+    Lignes de changements (CHANGE_COLUMNS) entre deux runs d'une même page ;
+    `unverified` : titres des carrousels inachevés au dernier run (ni retirés, ni cartes retirées).
+    """
+    car_a, car_b = _carousels(old), _carousels(new)
+    a, b = _index(old), _index(new)
+    partiels = {_norm(t) for t in unverified}
+    out = []
+    for titre, (idx, n) in car_b.items():
+        if titre not in car_a:
+            out.append([page, "carrousel ajouté", titre, f"{n} ligne(s)", None, None, idx, None, "", ""])
+        elif car_a[titre][0] != idx:
+            out.append([page, "carrousel déplacé", titre, "", car_a[titre][0], None, idx, None, "", ""])
+    for titre, (idx, n) in car_a.items():
+        if _norm(titre) in partiels:
+            out.append([page, "carrousel non vérifié", titre, f"{n} ligne(s) au run précédent", idx, None,
+                        car_b.get(titre, (None,))[0], None, "", ""])
+        elif titre not in car_b:
+            out.append([page, "carrousel retiré", titre, f"{n} ligne(s)", idx, None, None, None, "", ""])
+    for k, r in b.items():
+        if r.titre not in car_a:
+            continue
+        o = a.get(k)
+        if o is None:
+            out.append(_card(page, "carte ajoutée", None, r))
+            continue
+        if o.ordre != r.ordre:
+            out.append(_card(page, "carte déplacée", o, r))
+        if o.url != r.url:
+            out.append(_card(page, "URL modifiée", o, r))
+    out += [_card(page, "carte retirée", o, None) for k, o in a.items()
+            if o.titre in car_b and k not in b and _norm(o.titre) not in partiels]
+    return sorted(out, key=_reading_order)
+
+def _reading_order(c: list):
+    """Position du carrousel, lignes sans # (carrousel, « Voir plus ») en tête, puis # de la carte."""
+    carrousel = c[6] if c[6] is not None else c[4]
+    ordre = c[7] if c[7] is not None else c[5]
+    return carrousel, ordre is not None, ordre or 0
+
+def week_changes(date: str | None = None, run_id: str | None = None) -> tuple[list[list], list[str]]:
+    """
+    Changements de toutes les pages exportées à `date` par rapport à leur run précédent ; (lignes, résumé).
+    Les carrousels inachevés ou en échec sont lus dans la couverture et les échecs du run `run_id`
+    (par défaut le run en cours).
+    """
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    rows, resume = [], []
+    for page in history_pages(date):
+        avant = [d for d in history_dates(page) if d < date]
+        if not avant:
+            resume.append(f"{page} : pas de run précédent dans l'historique")
+            continue
+        lignes = diff_page(page, read_rows(page, avant[-1]), read_rows(page, date),
+                           unfinished_titles(page, date, run_id) | failed_titles(page, date, run_id))
+        kinds = Counter(c[1] for c in lignes)
+        detail = ", ".join(f"{n} {k}" for k, n in kinds.most_common())
+        resume.append(f"{page} : {len(lignes)} changement(s) depuis le {avant[-1]}" + (f" ({detail})" if detail else ""))
+        rows += lignes
+    return rows, resume
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Changements depuis le run précédent de chaque page (historique Parquet).")
+    p.add_argument("--date", help="date du run à comparer (défaut : aujourd'hui)")
+    p.add_argument("--run-id", help="run dont la couverture et les échecs sont repris "
+                                    "(défaut : COLLECTOR_RUN_ID, sinon la date du jour)")
+    args = p.parse_args(argv)
+    rows, resume = week_changes(args.date, args.run_id)
+    for ligne in resume:
+        print(ligne)
+    for c in rows:
+        print(" | ".join("" if v is None else str(v) for v in c))
+
+if __name__ == "__main__":
+    main()
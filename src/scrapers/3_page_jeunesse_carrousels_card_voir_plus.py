@@ -1,314 +1,506 @@
-# ---------------------------------------------------------------------------
-# SCRIPT DE COLLECTE DES URLS (Jeunesse) – cartes + bouton « Voir plus »
-# ---------------------------------------------------------------------------
-# Récupère :
-# • Pour chaque carrousel (swiper ou slick) :
-#   – Lien « Voir plus » s’il existe
-#   – Toutes les cartes (Swipable ou Slick)
-# – Noms corrects des cartes (aria-label fallback)
-# – Headless + robustesse (rechargements, timeouts, stale elements)
-# Export CSV + XLSX + durée d’exécution
-#URL   = "https://video.telequebec.tv/jeunesse"                    # <-- URL de la page jeunesse
-
-# ---------------------------------------------------------------------------
-# SCRIPT DE COLLECTE DES URLS (Jeunesse) – cartes + bouton « Voir plus »
-# ---------------------------------------------------------------------------
-# Récupère :
-#  Pour chaque carrousel (swiper ou slick) :
-#  – Lien « Voir plus » s’il existe
-#  – Toutes les cartes (Swiper ou Slick)
-# Noms corrects des cartes (fallback aria-label)
-# Exécution headless + robustesse (rechargements, timeouts, stale elements)
-# Export CSV + XLSX + durée d’exécution
-# ---------------------------------------------------------------------------
-
-import os
-import time
-import csv
-import logging
-from datetime import datetime
-from pathlib import Path
-from contextlib import suppress
-
-import pandas as pd
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from src.common.selenium_setup import new_driver
-
-# -------------------- CONFIG ------------------------------------------------
-URL   = "https://video.telequebec.tv/jeunesse"                    # <-- URL de la page jeunesse
-WAIT  = 15                                 # Timeout de base pour WebDriverWait (secondes)
-DATE  = datetime.now().strftime("%Y-%m-%d")
-ROOT  = Path("output"); ROOT.mkdir(exist_ok=True)
-
-# Mode de log minimal : n’afficher que l’export et la durée (pour les runs orchestrés)
-_LOG_MINIMAL = os.getenv("LOG_MINIMAL", "0") == "1"
-def log(*args, **kwargs):
-    if not _LOG_MINIMAL:
-        print(*args, **kwargs)
-
-# -------------------- OUTILS SELENIUM --------------------------------------
-def accept_cookies(dr, wait):
-    """Accepte la bannière cookies si elle est présente (OneTrust)."""
-    with suppress(Exception):
-        wait.until(
-            EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-        ).click()
-
-def wait_blocks(dr, timeout=35):
-    """Attend chargement complet + présence du body + des blocs de page."""
-    WebDriverWait(dr, timeout).until(
-        lambda d: d.execute_script("return document.readyState") == "complete"
-    )
-    WebDriverWait(dr, timeout).until(
-        EC.presence_of_element_located((By.TAG_NAME, "body"))
-    )
-    WebDriverWait(dr, timeout).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "app-page-block"))
-    )
-
-def safe_get(dr, url, tries=2, base_timeout=35, debug_dir: Path | None = None):
-    """
-    Ouvre l’URL et attend les blocs; en cas de timeout, fait 1 retry avec délai augmenté.
-    Sauvegarde un screenshot en cas d’échec (si debug_dir est fourni).
-    """
-    last_err = None
-    for i in range(tries):
-        dr.get(url)
-        with suppress(Exception):
-            accept_cookies(dr, WebDriverWait(dr, 5))
-        try:
-            wait_blocks(dr, timeout=base_timeout + i*15)  # 35 → 50s au deuxième essai
-            return
-        except TimeoutException as e:
-            last_err = e
-            if debug_dir:
-                with suppress(Exception):
-                    debug_dir.mkdir(exist_ok=True, parents=True)
-                    ts = datetime.now().strftime("%H%M%S")
-                    dr.save_screenshot(str(debug_dir / f"timeout_{ts}.png"))
-    raise last_err
-
-# -------------------- BOUTON « VOIR PLUS » ---------------------------------
-def click_voir_plus(dr, wait, bloc, idx, typ, titre, rows):
-    """Clique sur « Voir plus » s’il existe et journalise l’URL (silencieux si _LOG_MINIMAL)."""
-    xpaths = [
-        ".//a[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]",
-        ".//*[@role='link' and contains(translate(@aria-label,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]",
-    ]
-    link = None
-    for xp in xpaths:
-        with suppress(Exception):
-            link = bloc.find_element(By.XPATH, xp)
-            if link:
-                break
-    if not link or not link.is_displayed():
-        return
-    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", link)
-    with suppress(Exception):
-        dr.execute_script("arguments[0].removeAttribute('target');", link)
-    link.click()
-    time.sleep(2)
-    url    = dr.current_url
-    chemin = url.split(".tv/")[1] if ".tv/" in url else ""
-    log(f"Bouton « Voir plus » → {url}")
-    rows.append([idx, typ, titre, '', 'Voir plus', url, chemin])
-    dr.back()
-    with suppress(TimeoutException):
-        wait_blocks(dr, 10)
-
-# -------------------- MAIN --------------------------------------------------
-def run():
-    dr    = new_driver()
-    wait  = WebDriverWait(dr, WAIT)
-    start = datetime.now()
-    rows  = []
-
-    try:
-        # Page initiale
-        log(f"Démarrage à {start.strftime('%H:%M:%S')}")
-        safe_get(dr, URL, debug_dir=ROOT / "debug")
-
-        car_total = len(dr.find_elements(By.TAG_NAME, 'app-page-block'))
-        log(f"Carrousels détectés : {car_total}")
-        logging.info(f"Carrousels détectés : {car_total}")
-
-
-        for idx in range(1, car_total + 1):
-            # Rechargement « propre » pour éviter les stale elements
-            safe_get(dr, URL, debug_dir=ROOT / "debug")
-
-            bloc = dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
-            dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
-
-            # Type + titre du bloc
-            typ = (
-                "Grande carrousel (swiper)" if bloc.find_elements(By.CSS_SELECTOR, 'swiper-slide') else
-                "Petite carrousel (slick)"  if bloc.find_elements(By.CSS_SELECTOR, 'app-slide')  else
-                "Carrousel inconnu"
-            )
-            try:
-                titre = bloc.find_element(By.CSS_SELECTOR, '.block-title').text.strip()
-            except Exception:
-                titre = f"Carrousel_{idx}"
-
-            log(f"\n{idx}. {typ} : {titre}")
-
-            # 0) Bouton « Voir plus »
-            click_voir_plus(dr, wait, bloc, idx, typ, titre, rows)
-
-            # 1) Grande carrousel (Swiper)
-            if "Grande" in typ:
-                metas = []
-                for sl in bloc.find_elements(By.CSS_SELECTOR, "swiper-slide:not([class*='-duplicate'])"):
-                    with suppress(Exception):
-                        sid = int(sl.get_attribute('data-swiper-slide-index'))
-                        lab = (sl.get_attribute('aria-label') or '').strip()
-                        # Fallbacks sur aria-label interne et texte visible
-                        if not lab or lab.replace(' ', '').replace('/', '').isdigit():
-                            with suppress(Exception):
-                                inner = sl.find_element(By.CSS_SELECTOR, "div[role='link'][aria-label]")
-                                lab   = (inner.get_attribute('aria-label') or '').strip()
-                        if not lab:
-                            with suppress(Exception):
-                                lab = sl.find_element(By.CSS_SELECTOR, 'span[aria-hidden], h2, h3').text.strip()
-                        # Nettoyage du préfixe « Titre de bloc – »
-                        for sep in (' - ', ' – '):
-                            pref = f"{titre}{sep}"
-                            if lab.startswith(pref):
-                                lab = lab[len(pref):].strip(); break
-                        metas.append((sid, lab or f"carte_{sid}"))
-
-                log(f"  Nombre de cartes : {len(metas)}")
-                for ordre, (sid, lab) in enumerate(metas, 1):
-                    safe_get(dr, URL, debug_dir=ROOT / "debug")
-                    car = dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
-                    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", car)
-
-                    # Navigation jusqu’à la carte active souhaitée
-                    swipe = 0
-                    while swipe < 80:  # 120 → 80 pour éviter les boucles longues
-                        try:
-                            act = car.find_element(By.CSS_SELECTOR, 'swiper-slide.swiper-slide-active')
-                            if int(act.get_attribute('data-swiper-slide-index')) == sid:
-                                link = None
-                                with suppress(Exception):
-                                    link = act.find_element(By.CSS_SELECTOR, 'a, div[role="link"]')
-                                if link:
-                                    dr.execute_script("arguments[0].removeAttribute('target');", link)
-                                    link.click()
-                                else:
-                                    act.click()
-                                break
-                        except Exception:
-                            pass
-                        with suppress(Exception):
-                            car.find_element(By.CSS_SELECTOR, '.ic-arrow-right-bg').click()
-                        time.sleep(0.25)
-                        swipe += 1
-
-                    time.sleep(2)
-                    url    = dr.current_url
-                    chemin = url.split('.tv/')[1] if '.tv/' in url else ''
-                    rows.append([idx, typ, titre, ordre, lab, url, chemin])
-
-                    dr.back()
-                    with suppress(TimeoutException):
-                        wait_blocks(dr, 10)
-
-            # 2) Petite carrousel (Slick)
-            elif "Petite" in typ:
-                # Reprise du bloc avant itération Slick
-                safe_get(dr, URL, debug_dir=ROOT / "debug")
-                bloc = dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
-                dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
-
-                noms, vus = [], set()
-                last = -1
-                for _ in range(50):  # max 50 défilements
-                    for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
-                        with suppress(Exception):
-                            nm = s.find_element(By.CSS_SELECTOR, "h3 span[aria-hidden='true']").text.strip()
-                            if nm and nm not in vus:
-                                vus.add(nm)
-                                noms.append(nm)
-                    if len(vus) == last:
-                        break
-                    last = len(vus)
-                    try:
-                        nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next.slick-arrow')
-                    except Exception:
-                        break
-                    if 'slick-disabled' in nxt.get_attribute('class'):
-                        break
-                    nxt.click()
-                    time.sleep(0.35)
-
-                log(f"  Nombre de cartes : {len(noms)}")
-                for ordre, nom in enumerate(noms, 1):
-                    safe_get(dr, URL, debug_dir=ROOT / "debug")
-                    bloc = dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
-                    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
-
-                    found, tries = False, 0
-                    while tries < 120 and not found:
-                        for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
-                            with suppress(Exception):
-                                nm = s.find_element(By.CSS_SELECTOR, 'h3 span[aria-hidden]').text.strip()
-                                if nm == nom:
-                                    link = None
-                                    with suppress(Exception):
-                                        link = s.find_element(By.TAG_NAME, 'a')
-                                    if link:
-                                        dr.execute_script("arguments[0].removeAttribute('target');", link)
-                                        link.click()
-                                    else:
-                                        s.click()
-                                    found = True
-                                    break
-                        if found:
-                            break
-                        try:
-                            nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next.slick-arrow')
-                        except Exception:
-                            break
-                        if 'slick-disabled' in nxt.get_attribute('class'):
-                            break
-                        nxt.click()
-                        time.sleep(0.25)
-                        tries += 1
-
-                    if not found:
-                        continue
-
-                    time.sleep(2)
-                    url    = dr.current_url
-                    chemin = url.split('.tv/')[1] if '.tv/' in url else ''
-                    rows.append([idx, typ, titre, ordre, nom, url, chemin])
-
-                    dr.back()
-                    with suppress(TimeoutException):
-                        wait_blocks(dr, 10)
-
-        # -------------------- EXPORT FICHIERS --------------------------------
-        COLS = ["# Carrousel","Type","Titre du carrousel","#","titre (card)","URL détail","Chemin"]
-        base = f"carrousels_cards_url_page_jeunesse_{DATE}"
-        csv_f = ROOT / f"{base}.csv"
-        xlsx_f = ROOT / f"{base}.xlsx"
-
-        with csv_f.open('w', newline='', encoding='utf-8') as f:
-            csv.writer(f, delimiter=';').writerows([COLS, *rows])
-
-        pd.DataFrame(rows, columns=COLS).to_excel(xlsx_f, index=False)
-
-        # Sortie minimale (toujours affichée)
-        print(f"\nFichiers enregistrés : {csv_f}   {xlsx_f}")
-        print(f"Durée totale : {(datetime.now()-start).seconds} sec")
-
-    finally:
-        dr.quit()
-
-if __name__ == "__main__":
-    run()
+# ---------------------------------------------------------------------------
+# SCRIPT DE COLLECTE DES URLS (Jeunesse) – cartes + bouton « Voir plus »
+# ---------------------------------------------------------------------------
+# Récupère :
+# • Pour chaque carrousel (swiper ou slick) :
+#   – Lien « Voir plus » s’il existe
+#   – Toutes les cartes (Swipable ou Slick)
+# – Noms corrects des cartes (aria-label fallback)
+# – Headless + robustesse (rechargements, timeouts, stale elements)
+# Export CSV + XLSX + durée d’exécution
+#URL   = "https://video.telequebec.tv/jeunesse"                    # <-- URL de la page jeunesse
+
+# ---------------------------------------------------------------------------
+# SCRIPT DE COLLECTE DES URLS (Jeunesse) – cartes + bouton « Voir plus »
+# ---------------------------------------------------------------------------
+# Récupère :
+#  Pour chaque carrousel (swiper ou slick) :
+#  – Lien « Voir plus » s’il existe
+#  – Toutes les cartes (Swiper ou Slick)
+# Noms corrects des cartes (fallback aria-label)
+# Exécution headless + robustesse (rechargements, timeouts, stale elements)
+# Export CSV + XLSX + durée d’exécution
+# ---------------------------------------------------------------------------
+
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from contextlib import suppress
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from src.common.selenium_setup import new_driver, settle
+from src.common.page_loader import load_all_blocks, find_block
+from src.common.export_utils import export_rows
+from src.common.change_detection import (inventory_blocks, load_state, save_state, reusable_rows, change_report,
+                                         number_occurrences)
+from src.common.cli import parse_scraper_args
+from src.common.resolution_store import ResolutionStore
+from src.common.selector_registry import SelectorRegistry, LABEL_STRATEGIES, VOIR_PLUS_STRATEGIES
+from src.common.sharding import in_shard, write_shard
+from src.common.budget import Coverage, nearly_spent, priority_order
+from src.common.retry_queue import RetryQueue, describe
+from src.common.tab_resolver import CARD_TABS, resolve_block
+from src.common.http_extract import HttpExtractUnavailable, engine_for, extract_page, matching_blocks
+from src.common.records import CARD_COLUMNS, CardRow
+from src.common.history import write_history
+from src.common.dom_snapshots import capture_blocks, write_snapshot
+from src.common.log_setup import log_context, setup_logging
+from src.common.profiling import profiled
+from src.common.adaptive_timeouts import AdaptiveTimeouts
+
+# -------------------- CONFIG ------------------------------------------------
+URL   = "https://video.telequebec.tv/jeunesse"                    # <-- URL de la page jeunesse
+WAIT  = 15                                 # Timeout de base pour WebDriverWait (secondes)
+DATE  = datetime.now().strftime("%Y-%m-%d")
+ROOT  = Path("output"); ROOT.mkdir(exist_ok=True)
+PAGE  = "page_jeunesse"                                 # Nom de page (export + état)
+
+# Journal (src/common/log_setup.py) : --log-level / LOG_LEVEL, détail carte par carte en DEBUG
+logger = logging.getLogger(PAGE)
+log = logger.debug
+# Délais d'attente appris par opération (src/common/adaptive_timeouts.py), enregistrés en fin de run
+timeouts = AdaptiveTimeouts(PAGE)
+
+# -------------------- OUTILS SELENIUM --------------------------------------
+def accept_cookies(dr, wait):
+    """Accepte la bannière cookies si elle est présente (OneTrust)."""
+    with suppress(Exception):
+        wait.until(
+            EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+        ).click()
+
+def wait_blocks(dr, timeout=35):
+    """Attend chargement complet + présence du body + des blocs de page."""
+    WebDriverWait(dr, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+    WebDriverWait(dr, timeout).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+    WebDriverWait(dr, timeout).until(
+        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "app-page-block"))
+    )
+
+def safe_get(dr, url, tries=2, base_timeout=35, debug_dir: Path | None = None):
+    """
+    Ouvre l’URL et attend les blocs; en cas de timeout, fait 1 retry avec délai augmenté.
+    Sauvegarde un screenshot en cas d’échec (si debug_dir est fourni).
+    """
+    last_err = None
+    for i in range(tries):
+        dr.get(url)
+        with suppress(Exception):
+            accept_cookies(dr, WebDriverWait(dr, 5))
+        try:
+            # 1er essai : délai appris ; 2e essai : délai historique (35 → 50 s)
+            timeouts.wait("chargement", base_timeout, lambda t: wait_blocks(dr, timeout=t),
+                          None if i == 0 else base_timeout + i*15)
+            return
+        except TimeoutException as e:
+            last_err = e
+            if debug_dir:
+                with suppress(Exception):
+                    debug_dir.mkdir(exist_ok=True, parents=True)
+                    ts = datetime.now().strftime("%H%M%S")
+                    dr.save_screenshot(str(debug_dir / f"timeout_{ts}.png"))
+    raise last_err
+
+# -------------------- BOUTON « VOIR PLUS » ---------------------------------
+def click_voir_plus(dr, wait, bloc, idx, typ, titre, rows, selectors):
+    """Clique sur « Voir plus » s’il existe et journalise l’URL (silencieux si _LOG_MINIMAL)."""
+    link = selectors.find(f"{typ.split()[0]}:voir_plus", bloc, VOIR_PLUS_STRATEGIES)
+    if not link or not link.is_displayed():
+        return
+    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", link)
+    with suppress(Exception):
+        dr.execute_script("arguments[0].removeAttribute('target');", link)
+    link.click()
+    time.sleep(2)
+    url    = dr.current_url
+    log(f"Bouton « Voir plus » → {url}")
+    rows.append(CardRow.make(idx, typ, titre, None, 'Voir plus', url))
+    dr.back()
+    with suppress(TimeoutException):
+        timeouts.wait("retour", 10, lambda t: wait_blocks(dr, t))
+
+# -------------------- CARTES ------------------------------------------------
+def open_grande(dr, idx, sid):
+    """Ouvre la carte Swiper d'index `sid` du carrousel `idx` et retourne l'URL atteinte."""
+    safe_get(dr, URL, debug_dir=ROOT / "debug")
+    car = find_block(dr, idx)
+    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", car)
+
+    # Navigation jusqu’à la carte active souhaitée
+    swipe, clique = 0, False
+    while swipe < 80:  # 120 → 80 pour éviter les boucles longues
+        try:
+            act = car.find_element(By.CSS_SELECTOR, 'swiper-slide.swiper-slide-active')
+            if int(act.get_attribute('data-swiper-slide-index')) == sid:
+                link = None
+                with suppress(Exception):
+                    link = act.find_element(By.CSS_SELECTOR, 'a, div[role="link"]')
+                if link:
+                    dr.execute_script("arguments[0].removeAttribute('target');", link)
+                    link.click()
+                else:
+                    act.click()
+                clique = True
+                break
+        except Exception:
+            pass
+        with suppress(Exception):
+            car.find_element(By.CSS_SELECTOR, '.ic-arrow-right-bg').click()
+        settle(0.25, dr)
+        swipe += 1
+    if not clique:
+        raise NoSuchElementException(f"diapo SID {sid} jamais active après {swipe} défilements")
+
+    time.sleep(2)
+    url = dr.current_url
+    if url == URL:
+        raise WebDriverException("clic sans navigation")
+    dr.back()
+    with suppress(TimeoutException):
+        timeouts.wait("retour", 10, lambda t: wait_blocks(dr, t))
+    return url
+
+def open_petite(dr, idx, nom):
+    """Ouvre la carte Slick `nom` du carrousel `idx` et retourne l'URL atteinte."""
+    safe_get(dr, URL, debug_dir=ROOT / "debug")
+    bloc = find_block(dr, idx)
+    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+
+    found, tries = False, 0
+    while tries < 120 and not found:
+        for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
+            with suppress(Exception):
+                nm = s.find_element(By.CSS_SELECTOR, 'h3 span[aria-hidden]').text.strip()
+                if nm == nom:
+                    link = None
+                    with suppress(Exception):
+                        link = s.find_element(By.TAG_NAME, 'a')
+                    if link:
+                        dr.execute_script("arguments[0].removeAttribute('target');", link)
+                        link.click()
+                    else:
+                        s.click()
+                    found = True
+                    break
+        if found:
+            break
+        try:
+            nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next.slick-arrow')
+        except Exception:
+            break
+        if 'slick-disabled' in nxt.get_attribute('class'):
+            break
+        nxt.click()
+        settle(0.25, dr)
+        tries += 1
+
+    if not found:
+        raise NoSuchElementException(f"carte introuvable après {tries} défilements")
+
+    time.sleep(2)
+    url = dr.current_url
+    if url == URL:
+        raise WebDriverException("clic sans navigation")
+    dr.back()
+    with suppress(TimeoutException):
+        timeouts.wait("retour", 10, lambda t: wait_blocks(dr, t))
+    return url
+
+def cards_in_tabs(dr, idx, cards):
+    """Mode onglets (CARD_TABS > 1) : ouvre d'un coup les cartes `cards` (libellé → SID) du carrousel `idx`."""
+    if CARD_TABS <= 1 or not cards or nearly_spent():
+        return {}
+    safe_get(dr, URL, debug_dir=ROOT / "debug")   # carrousel remis à sa première diapo
+    bloc = find_block(dr, idx)
+    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+    found = resolve_block(dr, bloc, cards)
+    log(f"  Onglets : {len(found)}/{len(cards)} cartes résolues")
+    return found
+
+def add_card(rows, store, idx, typ, titre, ordre, nom, url):
+    rows.append(CardRow.make(idx, typ, titre, ordre, nom, url))
+    store.put(nom, url, PAGE)
+
+# -------------------- CARROUSEL ---------------------------------------------
+def crawl_block(dr, wait, idx, rows, store, selectors, couverture, echecs):
+    """« Voir plus » + toutes les cartes du carrousel `idx` ; une carte en échec va dans `echecs`."""
+    # Rechargement « propre » pour éviter les stale elements
+    safe_get(dr, URL, debug_dir=ROOT / "debug")
+
+    bloc = find_block(dr, idx)
+    dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+
+    # Type + titre du bloc
+    typ = (
+        "Grande carrousel (swiper)" if bloc.find_elements(By.CSS_SELECTOR, 'swiper-slide') else
+        "Petite carrousel (slick)"  if bloc.find_elements(By.CSS_SELECTOR, 'app-slide')  else
+        "Carrousel inconnu"
+    )
+    try:
+        titre = bloc.find_element(By.CSS_SELECTOR, '.block-title').text.strip()
+    except Exception:
+        titre = f"Carrousel_{idx}"
+
+    log(f"\n{idx}. {typ} : {titre}")
+
+    # 0) Bouton « Voir plus »
+    click_voir_plus(dr, wait, bloc, idx, typ, titre, rows, selectors)
+
+    # 1) Grande carrousel (Swiper)
+    if "Grande" in typ:
+        metas = []
+        for sl in bloc.find_elements(By.CSS_SELECTOR, "swiper-slide:not([class*='-duplicate'])"):
+            with suppress(Exception):
+                sid = int(sl.get_attribute('data-swiper-slide-index'))
+                # aria-label, puis aria-label interne, puis texte visible (priorité fixe)
+                lab = selectors.first(sl, LABEL_STRATEGIES) or ''
+                # Nettoyage du préfixe « Titre de bloc – »
+                for sep in (' - ', ' – '):
+                    pref = f"{titre}{sep}"
+                    if lab.startswith(pref):
+                        lab = lab[len(pref):].strip(); break
+                metas.append((sid, lab or f"carte_{sid}"))
+
+        log(f"  Nombre de cartes : {len(metas)}")
+        # Cartes déjà résolues par un autre scraper du run : pas de clic
+        connues = {lab: store.get(lab) for _, lab in metas}
+        onglets = cards_in_tabs(dr, idx, {lab: sid for sid, lab in metas if not connues[lab]})
+
+        for ordre, (sid, lab) in enumerate(metas, 1):
+            if lab in onglets:
+                add_card(rows, store, idx, typ, titre, ordre, lab, onglets[lab])
+                continue
+            deja = connues[lab]
+            if deja:
+                rows.append(CardRow.make(idx, typ, titre, ordre, lab, deja))
+                continue
+
+            if nearly_spent():   # budget presque épuisé : on exporte ce qui est collecté
+                couverture.mark(idx, "partiel")
+                couverture.cards_skipped += len(metas) - ordre + 1
+                break
+
+            try:
+                add_card(rows, store, idx, typ, titre, ordre, lab, open_grande(dr, idx, sid))
+            except Exception as e:   # reprise en fin de run
+                logger.warning(f"Carte en échec : {lab} ({describe(e)})", extra={"carte": lab})
+                echecs.add("carte", e, idx=idx, titre=titre, typ=typ, label=lab, ordre=ordre, sid=sid)
+
+    # 2) Petite carrousel (Slick)
+    elif "Petite" in typ:
+        # Reprise du bloc avant itération Slick
+        safe_get(dr, URL, debug_dir=ROOT / "debug")
+        bloc = find_block(dr, idx)
+        dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+
+        noms, vus = [], set()
+        last = -1
+        for _ in range(50):  # max 50 défilements
+            for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
+                with suppress(Exception):
+                    nm = s.find_element(By.CSS_SELECTOR, "h3 span[aria-hidden='true']").text.strip()
+                    if nm and nm not in vus:
+                        vus.add(nm)
+                        noms.append(nm)
+            if len(vus) == last:
+                break
+            last = len(vus)
+            try:
+                nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next.slick-arrow')
+            except Exception:
+                break
+            if 'slick-disabled' in nxt.get_attribute('class'):
+                break
+            nxt.click()
+            settle(0.35, dr)
+
+        log(f"  Nombre de cartes : {len(noms)}")
+        # Cartes déjà résolues par un autre scraper du run : pas de clic
+        connues = {nom: store.get(nom) for nom in noms}
+        onglets = cards_in_tabs(dr, idx, {nom: None for nom in noms if not connues[nom]})
+
+        for ordre, nom in enumerate(noms, 1):
+            if nom in onglets:
+                add_card(rows, store, idx, typ, titre, ordre, nom, onglets[nom])
+                continue
+            deja = connues[nom]
+            if deja:
+                rows.append(CardRow.make(idx, typ, titre, ordre, nom, deja))
+                continue
+
+            if nearly_spent():   # budget presque épuisé : on exporte ce qui est collecté
+                couverture.mark(idx, "partiel")
+                couverture.cards_skipped += len(noms) - ordre + 1
+                break
+
+            try:
+                add_card(rows, store, idx, typ, titre, ordre, nom, open_petite(dr, idx, nom))
+            except Exception as e:   # reprise en fin de run
+                logger.warning(f"Carte en échec : {nom} ({describe(e)})", extra={"carte": nom})
+                echecs.add("carte", e, idx=idx, titre=titre, typ=typ, label=nom, ordre=ordre)
+
+    couverture.finish(idx)
+
+def crawl_or_queue(dr, wait, idx, rows, store, selectors, couverture, echecs, titre=""):
+    """crawl_block ; en cas d'erreur, les lignes partielles du carrousel sont retirées et il est mis en reprise."""
+    try:
+        with log_context(carrousel=idx):
+            crawl_block(dr, wait, idx, rows, store, selectors, couverture, echecs)
+        return True
+    except Exception as e:
+        logger.warning(f"Carrousel {idx} en échec : {describe(e)}", extra={"carrousel": idx})
+        rows[:] = [r for r in rows if r[0] != idx]
+        echecs.discard(idx)
+        echecs.add("carrousel", e, idx=idx, titre=titre)
+        return False
+
+def retry_failure(dr, f, rows, store, selectors, couverture, echecs):
+    """Rejoue une unité en échec avec le navigateur neuf du tour de reprise."""
+    with log_context(carrousel=f.idx, carte=f.label or None):
+        return _retry_failure(dr, f, rows, store, selectors, couverture, echecs)
+
+def _retry_failure(dr, f, rows, store, selectors, couverture, echecs):
+    if f.unit == "carrousel":
+        try:
+            crawl_block(dr, WebDriverWait(dr, WAIT), f.idx, rows, store, selectors, couverture, echecs)
+        except Exception:
+            rows[:] = [r for r in rows if r[0] != f.idx]
+            echecs.discard(f.idx)   # le carrousel reste en échec en entier
+            raise
+        return True
+    url = open_grande(dr, f.idx, f.sid) if f.sid is not None else open_petite(dr, f.idx, f.label)
+    add_card(rows, store, f.idx, f.typ, f.titre, f.ordre, f.label, url)
+    return True
+
+# -------------------- MAIN --------------------------------------------------
+def run(inventory_only=False, force=False, shard=None, engine=None, snapshot=False):
+    dr = wait = None
+    blocs_html = None   # instantané DOM (--snapshot)
+    start = datetime.now()
+    rows  = []
+    store = ResolutionStore()                              # résolutions partagées entre scrapers
+    selectors = SelectorRegistry(PAGE)                     # ordre appris des sélecteurs
+    echecs = RetryQueue(PAGE)                              # cartes / carrousels à reprendre en fin de run
+
+    # Moteur HTTP : blocs lus dans le JSON du backend ; Selenium seulement pour les blocs non résolus
+    http_blocs = []
+    if (engine or engine_for(PAGE)) == "http":
+        try:
+            http_blocs = extract_page(URL)
+            logger.info(f"Extraction HTTP : {sum(b.resolved for b in http_blocs)}/{len(http_blocs)} carrousels résolus")
+        except HttpExtractUnavailable as e:
+            logger.warning(f"Extraction HTTP indisponible ({e}) : repli Selenium pour toute la page")
+
+    try:
+        log(f"Démarrage à {start.strftime('%H:%M:%S')}")
+        if http_blocs and all(b.resolved for b in http_blocs):
+            # Tout est lu en HTTP : aucun navigateur
+            inventaire = number_occurrences([b.inventory() for b in http_blocs])
+            car_total = len(inventaire)
+        else:
+            # Page initiale
+            dr   = new_driver()
+            wait = WebDriverWait(dr, WAIT)
+            safe_get(dr, URL, debug_dir=ROOT / "debug")
+            car_total = load_all_blocks(dr)   # blocs paresseux inclus
+            # Pré-passe : empreinte de chaque carrousel comparée au run précédent
+            inventaire = inventory_blocks(dr)
+            blocs_html = capture_blocks(dr) if snapshot else None
+        logger.info(f"Carrousels détectés : {car_total}")
+        par_http = matching_blocks(http_blocs, inventaire)   # blocs HTTP alignés sur la page
+        precedent  = {} if force else load_state(PAGE)
+        if inventory_only:
+            logger.info(f"Inventaire {URL} ({len(inventaire)} carrousels)")
+            logger.info("\n".join(change_report(inventaire, precedent)))
+            return
+
+        couverture = Coverage(PAGE, car_total, {b['idx']: b['titre'] for b in inventaire})
+        # Nouveaux / modifiés d'abord, puis ordre de la page (budget de temps du run)
+        for idx in priority_order(range(1, car_total + 1), inventaire, precedent):
+            if not in_shard(idx, shard):   # carrousel traité par un autre shard
+                continue
+
+            # Carrousel inchangé depuis le dernier run : reprise de ses lignes
+            bloc_inv = inventaire[idx - 1] if idx <= len(inventaire) else None
+            reprises = reusable_rows(precedent, bloc_inv) if bloc_inv else None
+            if reprises:
+                log(f"\n{idx}. Carrousel inchangé : {bloc_inv['titre']} → {len(reprises)} lignes reprises")
+                rows.extend(reprises)
+                couverture.mark(idx, "repris")
+                continue
+
+            if idx in par_http:   # lu par le moteur HTTP : ni rendu ni clic
+                log(f"\n{idx}. Carrousel lu en HTTP : {par_http[idx].titre} → {len(par_http[idx].cards)} cartes")
+                rows.extend(par_http[idx].rows())
+                for lab, url in par_http[idx].cards:
+                    store.put(lab, url, PAGE)
+                couverture.finish(idx)
+                continue
+
+            if nearly_spent():   # budget du run presque épuisé : plus de nouveau carrousel
+                couverture.mark(idx, "non visité")
+                continue
+
+            crawl_or_queue(dr, wait, idx, rows, store, selectors, couverture, echecs,
+                           bloc_inv['titre'] if bloc_inv else "")
+
+        # -------------------- REPRISE DES ÉCHECS -----------------------------
+        if echecs:
+            dr.quit()
+            dr = None   # chaque tour de reprise ouvre un navigateur neuf
+            echecs.retry(lambda d, f: retry_failure(d, f, rows, store, selectors, couverture, echecs),
+                         new_driver, logger.info)
+        for f in echecs.pending:
+            if f.unit == "carrousel":
+                couverture.mark(f.idx, "en échec")
+        # carrousels interrompus (budget) ou avec des échecs définitifs : lignes non mémorisées
+        a_refaire = couverture.incomplete | echecs.idxs()
+
+        # -------------------- EXPORT FICHIERS --------------------------------
+        COLS = CARD_COLUMNS
+        # ordre de la page et des cartes (le crawl suit l'ordre de priorité, les reprises arrivent en dernier)
+        rows.sort(key=lambda r: (r[0], r[3] if isinstance(r[3], int) else 0))
+
+        # Sortie minimale (toujours affichée)
+        if shard:
+            part = write_shard(PAGE, f"carrousels_cards_url_{PAGE}", COLS, rows,
+                               [[r[0], n] for n, r in enumerate(rows)], shard, inventaire,
+                               incomplete=a_refaire)
+            logger.info(f"Shard {shard[0]}/{shard[1]} enregistré : {part}")
+        else:
+            zip_f, membres = export_rows(rows, COLS, ROOT, f"carrousels_cards_url_{PAGE}")
+            write_history(PAGE, rows)
+            if blocs_html:   # ré-extraction possible sans navigateur (src/common/dom_snapshots.py)
+                logger.info(f"Instantané DOM enregistré : {write_snapshot(PAGE, URL, blocs_html, rows)}")
+            # recrawlés au prochain run plutôt que repris incomplets
+            save_state(PAGE, inventaire, [r for r in rows if r[0] not in a_refaire])
+            logger.info(f"Fichiers enregistrés : {zip_f} ({', '.join(membres)})")
+        logger.info(couverture.summary())
+        couverture.write(f".part-{shard[0]}-of-{shard[1]}" if shard else "")
+        logger.info(echecs.summary())
+        echecs.write(f".part-{shard[0]}-of-{shard[1]}" if shard else "")
+        logger.info(f"Durée totale : {(datetime.now()-start).seconds} sec")
+
+    finally:
+        logger.info(f"Résolutions partagées : {store.hits} reprises, {store.misses} à cliquer")
+        logger.info(selectors.summary())
+        selectors.save()
+        logger.info(timeouts.summary())
+        timeouts.save()
+        store.close()
+        if dr is not None:
+            dr.quit()
+
+if __name__ == "__main__":
+    args = parse_scraper_args()
+    setup_logging(PAGE, args.log_level, scraper=PAGE)
+    with profiled(PAGE, args.profile):
+        run(inventory_only=args.inventory, force=args.force, shard=args.shard, engine=args.engine, snapshot=args.snapshot)
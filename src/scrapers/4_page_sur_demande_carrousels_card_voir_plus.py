@@ -1,190 +1,340 @@
-#URL   = "https://video.telequebec.tv/sur%20demande"                    # <-- URL de la page d’accueil
-# ---------------------------------------------------------------------------
-# SCRIPT DE COLLECTE DES URLS (« Sur demande ») – cartes + bouton « Voir plus »
-# ---------------------------------------------------------------------------
-# • Pour chaque carrousel (swiper/slick) :
-#   – Lien « Voir plus » s’il existe
-#   – Toutes les cartes (Swiper/Slick)
-# • Noms corrects des cartes (fallback aria-label)
-# • Exécution headless + robustesse (rechargements, timeouts, stale elements)
-# • Export CSV + XLSX + durée d’exécution
-# ---------------------------------------------------------------------------
-
-import os
-import time
-import csv
-import logging
-from datetime import datetime
-from pathlib import Path
-from contextlib import suppress
-from typing import Union
-
-import pandas as pd
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from src.common.selenium_setup import new_driver
-
-# -------------------- CONFIG ------------------------------------------------
-URL   = "https://video.telequebec.tv/sur%20demande"                    
-WAIT  = 30
-DATE  = datetime.now( ).strftime("%Y-%m-%d")
-ROOT  = Path("output"); ROOT.mkdir(exist_ok=True)
-
-_LOG_MINIMAL = os.getenv("LOG_MINIMAL", "0") == "1"
-def log(*args, **kwargs):
-    if not _LOG_MINIMAL:
-        print(*args, **kwargs)
-
-# -------------------- OUTILS SELENIUM --------------------------------------
-def accept_cookies(dr, wait):
-    with suppress(Exception):
-        wait.until(EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))).click()
-
-def wait_blocks(dr, timeout=60):
-    WebDriverWait(dr, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    WebDriverWait(dr, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    WebDriverWait(dr, timeout).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "app-page-block")))
-
-def safe_get(dr, url, tries=2, base_timeout=60, debug_dir: Union[Path, None] = None):
-    last_err = None
-    for i in range(tries):
-        try:
-            dr.get(url)
-            with suppress(Exception):
-                accept_cookies(dr, WebDriverWait(dr, 5))
-            wait_blocks(dr, timeout=base_timeout + i*15)
-            return
-        except (TimeoutException, WebDriverException) as e:
-            last_err = e
-            if debug_dir:
-                with suppress(Exception):
-                    debug_dir.mkdir(exist_ok=True, parents=True)
-                    ts = datetime.now().strftime("%H%M%S")
-                    dr.save_screenshot(str(debug_dir / f"timeout_{ts}.png"))
-    raise last_err
-
-# -------------------- MAIN --------------------------------------------------
-def run():
-    start = datetime.now()
-    rows  = []
-    
-    # --- ÉTAPE 1: OBTENIR LA LISTE COMPLÈTE DES TÂCHES ---
-    log("ÉTAPE 1: Démarrage du navigateur pour obtenir la liste des tâches...")
-    dr = new_driver()
-    all_tasks = []
-    try:
-        safe_get(dr, URL, debug_dir=ROOT / "debug")
-        log("Début du défilement pour charger tous les blocs...")
-        last_height = dr.execute_script("return document.body.scrollHeight")
-        while True:
-            dr.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
-            new_height = dr.execute_script("return document.body.scrollHeight")
-            if new_height == last_height: break
-            last_height = new_height
-        log("Fin du défilement.")
-
-        car_total = len(dr.find_elements(By.TAG_NAME, 'app-page-block'))
-        log(f"Carrousels détectés : {car_total}")
-
-        for idx in range(1, car_total + 1):
-            bloc = dr.find_element(By.XPATH, f"//app-page-block[{idx}]")
-            dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
-            typ = "Grande" if bloc.find_elements(By.CSS_SELECTOR, 'swiper-slide') else "Petite"
-            titre = bloc.find_element(By.CSS_SELECTOR, '.block-title').text.strip() or f"Carrousel_{idx}"
-            
-            # Tâche pour "Voir plus"
-            with suppress(Exception):
-                link = bloc.find_element(By.XPATH, ".//a[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]")
-                if link.is_displayed():
-                    all_tasks.append({'type': 'voir_plus', 'idx': idx, 'typ_name': typ, 'titre': titre})
-
-            # Tâches pour les cartes
-            if "Grande" in typ:
-                for sl in bloc.find_elements(By.CSS_SELECTOR, "swiper-slide:not([class*='-duplicate'])"):
-                    with suppress(Exception):
-                        sid = int(sl.get_attribute('data-swiper-slide-index'))
-                        all_tasks.append({'type': 'grande_carte', 'idx': idx, 'typ_name': typ, 'titre': titre, 'sid': sid})
-            elif "Petite" in typ:
-                noms, vus = [], set()
-                for _ in range(50):
-                    last_len = len(vus)
-                    for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
-                        with suppress(Exception):
-                            nm = s.find_element(By.CSS_SELECTOR, "h3 span[aria-hidden='true']").text.strip()
-                            if nm and nm not in vus: vus.add(nm); noms.append(nm)
-                    if len(vus) == last_len: break
-                    with suppress(Exception):
-                        nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next:not(.slick-disabled)')
-                        nxt.click(); time.sleep(0.35)
-                for nom in noms:
-                    all_tasks.append({'type': 'petite_carte', 'idx': idx, 'typ_name': typ, 'titre': titre, 'nom': nom})
-    finally:
-        log("Liste des tâches créée. Fermeture du premier navigateur.")
-        dr.quit()
-
-    # --- ÉTAPE 2: EXÉCUTER CHAQUE TÂCHE DANS UN NOUVEAU NAVIGATEUR ---
-    log(f"\nÉTAPE 2: Exécution de {len(all_tasks)} tâches une par une...")
-    for i, task in enumerate(all_tasks):
-        log(f"  Tâche {i+1}/{len(all_tasks)}: {task['type']} pour carrousel {task['idx']}")
-        dr = new_driver()
-        try:
-            safe_get(dr, URL, debug_dir=ROOT / "debug")
-            bloc = dr.find_element(By.XPATH, f"//app-page-block[{task['idx']}]")
-            dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
-
-            if task['type'] == 'voir_plus':
-                link = bloc.find_element(By.XPATH, ".//a[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'voir plus')]")
-                dr.execute_script("arguments[0].removeAttribute('target');", link)
-                link.click(); time.sleep(2)
-                url = dr.current_url
-                rows.append([task['idx'], task['typ_name'], task['titre'], '', 'Voir plus', url, url.split('.tv/')[1] if '.tv/' in url else ''])
-
-            elif task['type'] == 'grande_carte':
-                swipe = 0
-                while swipe < 80:
-                    with suppress(Exception):
-                        act = bloc.find_element(By.CSS_SELECTOR, 'swiper-slide.swiper-slide-active')
-                        if int(act.get_attribute('data-swiper-slide-index')) == task['sid']:
-                            act.click(); break
-                    with suppress(Exception):
-                        bloc.find_element(By.CSS_SELECTOR, '.ic-arrow-right-bg').click()
-                    time.sleep(0.25); swipe += 1
-                time.sleep(2); url = dr.current_url
-                rows.append([task['idx'], task['typ_name'], task['titre'], '', f"Carte SID {task['sid']}", url, url.split('.tv/')[1] if '.tv/' in url else ''])
-
-            elif task['type'] == 'petite_carte':
-                tries = 0
-                while tries < 120:
-                    found = False
-                    for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
-                        with suppress(Exception):
-                            if s.find_element(By.CSS_SELECTOR, 'h3 span[aria-hidden]').text.strip() == task['nom']:
-                                s.click(); found = True; break
-                    if found: break
-                    with suppress(Exception):
-                        bloc.find_element(By.CSS_SELECTOR, '.slick-next:not(.slick-disabled)').click()
-                    time.sleep(0.25); tries += 1
-                time.sleep(2); url = dr.current_url
-                rows.append([task['idx'], task['typ_name'], task['titre'], '', task['nom'], url, url.split('.tv/')[1] if '.tv/' in url else ''])
-        except Exception as e:
-            log(f"    !!!! ERREUR sur la tâche {i+1}: {e}")
-        finally:
-            dr.quit()
-
-    # --- ÉTAPE 3: EXPORT ---
-    log("\nÉTAPE 3: Exportation des résultats...")
-    COLS = ["# Carrousel","Type","Titre du carrousel","#","titre (card)","URL détail","Chemin"]
-    base = f"carrousels_cards_url_page_en_sur_demande_{DATE}"
-    csv_f = ROOT / f"{base}.csv"
-    xlsx_f = ROOT / f"{base}.xlsx"
-    with csv_f.open('w', newline='', encoding='utf-8') as f:
-        csv.writer(f, delimiter=';').writerows([COLS, *rows])
-    pd.DataFrame(rows, columns=COLS).to_excel(xlsx_f, index=False)
-    print(f"\nFichiers enregistrés : {csv_f}   {xlsx_f}")
-    print(f"Durée totale : {(datetime.now()-start).seconds} sec")
-
-if __name__ == "__main__":
-    run()
+#URL   = "https://video.telequebec.tv/sur%20demande"                    # <-- URL de la page d’accueil
+# ---------------------------------------------------------------------------
+# SCRIPT DE COLLECTE DES URLS (« Sur demande ») – cartes + bouton « Voir plus »
+# ---------------------------------------------------------------------------
+# • Pour chaque carrousel (swiper/slick) :
+#   – Lien « Voir plus » s’il existe
+#   – Toutes les cartes (Swiper/Slick)
+# • Noms corrects des cartes (fallback aria-label)
+# • Exécution headless + robustesse (rechargements, timeouts, stale elements)
+# • Export CSV + XLSX + durée d’exécution
+# ---------------------------------------------------------------------------
+
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from contextlib import suppress
+from typing import Union
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from src.common.selenium_setup import new_driver, settle
+from src.common.page_loader import load_all_blocks, find_block
+from src.common.export_utils import export_rows
+from src.common.change_detection import (inventory_blocks, load_state, save_state, reusable_rows, change_report,
+                                         number_occurrences)
+from src.common.cli import parse_scraper_args
+from src.common.resolution_store import ResolutionStore
+from src.common.selector_registry import SelectorRegistry, VOIR_PLUS_STRATEGIES
+from src.common.sharding import in_shard, write_shard
+from src.common.budget import Coverage, nearly_spent, priority_order
+from src.common.retry_queue import RetryQueue, describe
+from src.common.http_extract import HttpExtractUnavailable, engine_for, extract_page, matching_blocks
+from src.common.records import CARD_COLUMNS, CardRow
+from src.common.history import write_history
+from src.common.dom_snapshots import capture_blocks, write_snapshot
+from src.common.log_setup import log_context, setup_logging
+from src.common.profiling import profiled
+from src.common.adaptive_timeouts import AdaptiveTimeouts
+
+# -------------------- CONFIG ------------------------------------------------
+URL   = "https://video.telequebec.tv/sur%20demande"                    
+WAIT  = 30
+DATE  = datetime.now( ).strftime("%Y-%m-%d")
+ROOT  = Path("output"); ROOT.mkdir(exist_ok=True)
+PAGE  = "page_en_sur_demande"
+
+# Journal (src/common/log_setup.py) : --log-level / LOG_LEVEL, détail tâche par tâche en DEBUG
+logger = logging.getLogger(PAGE)
+log = logger.debug
+# Délais d'attente appris par opération (src/common/adaptive_timeouts.py), enregistrés en fin de run
+timeouts = AdaptiveTimeouts(PAGE)
+
+# -------------------- OUTILS SELENIUM --------------------------------------
+def accept_cookies(dr, wait):
+    with suppress(Exception):
+        wait.until(EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))).click()
+
+def wait_blocks(dr, timeout=60):
+    WebDriverWait(dr, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    WebDriverWait(dr, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    WebDriverWait(dr, timeout).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "app-page-block")))
+
+def safe_get(dr, url, tries=2, base_timeout=60, debug_dir: Union[Path, None] = None):
+    last_err = None
+    for i in range(tries):
+        try:
+            dr.get(url)
+            with suppress(Exception):
+                accept_cookies(dr, WebDriverWait(dr, 5))
+            # 1er essai : délai appris ; essais suivants : délai historique augmenté
+            timeouts.wait("chargement", base_timeout, lambda t: wait_blocks(dr, timeout=t),
+                          None if i == 0 else base_timeout + i*15)
+            return
+        except (TimeoutException, WebDriverException) as e:
+            last_err = e
+            if debug_dir:
+                with suppress(Exception):
+                    debug_dir.mkdir(exist_ok=True, parents=True)
+                    ts = datetime.now().strftime("%H%M%S")
+                    dr.save_screenshot(str(debug_dir / f"timeout_{ts}.png"))
+    raise last_err
+
+# -------------------- TÂCHES ------------------------------------------------
+def task_label(task):
+    return {'voir_plus': 'Voir plus', 'grande_carte': f"Carte SID {task.get('sid')}"}.get(task['type'], task.get('nom', ''))
+
+def run_task(task, selectors, store):
+    """Exécute une tâche dans un navigateur neuf ; retourne ses lignes ou lève l'erreur rencontrée."""
+    dr = new_driver()
+    try:
+        safe_get(dr, URL, debug_dir=ROOT / "debug")
+        bloc = find_block(dr, task['idx'])
+        dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+
+        if task['type'] == 'voir_plus':
+            link = selectors.find(f"{task['typ_name']}:voir_plus", bloc, VOIR_PLUS_STRATEGIES)
+            if link is None:
+                raise WebDriverException("bouton « Voir plus » introuvable")
+            dr.execute_script("arguments[0].removeAttribute('target');", link)
+            link.click(); time.sleep(2)
+
+        elif task['type'] == 'grande_carte':
+            swipe, found = 0, False
+            while swipe < 80 and not found:
+                with suppress(Exception):
+                    act = bloc.find_element(By.CSS_SELECTOR, 'swiper-slide.swiper-slide-active')
+                    if int(act.get_attribute('data-swiper-slide-index')) == task['sid']:
+                        act.click(); found = True
+                if found: break
+                with suppress(Exception):
+                    bloc.find_element(By.CSS_SELECTOR, '.ic-arrow-right-bg').click()
+                settle(0.25, dr); swipe += 1
+            if not found:
+                raise NoSuchElementException(f"diapo SID {task['sid']} jamais active après {swipe} défilements")
+            time.sleep(2)
+
+        elif task['type'] == 'petite_carte':
+            tries, found = 0, False
+            while tries < 120:
+                for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
+                    with suppress(Exception):
+                        if s.find_element(By.CSS_SELECTOR, 'h3 span[aria-hidden]').text.strip() == task['nom']:
+                            s.click(); found = True; break
+                if found: break
+                with suppress(Exception):
+                    bloc.find_element(By.CSS_SELECTOR, '.slick-next:not(.slick-disabled)').click()
+                settle(0.25, dr); tries += 1
+            if not found:
+                raise NoSuchElementException(f"carte introuvable après {tries} défilements")
+            time.sleep(2)
+
+        url = dr.current_url
+        if url == URL:
+            raise WebDriverException("clic sans navigation")
+        if task['type'] == 'petite_carte':
+            store.put(task['nom'], url, PAGE)
+        return [CardRow.make(task['idx'], task['typ_name'], task['titre'], None, task_label(task), url)]
+    finally:
+        dr.quit()
+
+# -------------------- MAIN --------------------------------------------------
+def run(inventory_only=False, force=False, shard=None, engine=None, snapshot=False):
+    start = datetime.now()
+    rows  = []
+    ordre = []   # clé d'ordre d'origine de chaque ligne : [carrousel, tâche]
+    selectors = SelectorRegistry(PAGE)   # ordre appris des sélecteurs
+
+    # Moteur HTTP : blocs lus dans le JSON du backend ; tâches Selenium seulement pour les blocs non résolus
+    http_blocs = []
+    if (engine or engine_for(PAGE)) == "http":
+        try:
+            http_blocs = extract_page(URL)
+            logger.info(f"Extraction HTTP : {sum(b.resolved for b in http_blocs)}/{len(http_blocs)} carrousels résolus")
+        except HttpExtractUnavailable as e:
+            logger.warning(f"Extraction HTTP indisponible ({e}) : repli Selenium pour toute la page")
+    tout_http = bool(http_blocs) and all(b.resolved for b in http_blocs)
+    
+    # --- ÉTAPE 1: OBTENIR LA LISTE COMPLÈTE DES TÂCHES ---
+    dr = None
+    blocs_html = None   # instantané DOM (--snapshot)
+    all_tasks = []
+    try:
+        if tout_http:   # aucun navigateur : tout est lu en HTTP
+            inventaire = number_occurrences([b.inventory() for b in http_blocs])
+            car_total = len(inventaire)
+        else:
+            log("ÉTAPE 1: Démarrage du navigateur pour obtenir la liste des tâches...")
+            dr = new_driver()
+            safe_get(dr, URL, debug_dir=ROOT / "debug")
+            log("Début du défilement pour charger tous les blocs...")
+            car_total = load_all_blocks(dr)   # s'arrête après une fenêtre de calme sans nouveau bloc
+            log("Fin du défilement.")
+            # Pré-passe : empreinte de chaque carrousel comparée au run précédent
+            inventaire = inventory_blocks(dr)
+            blocs_html = capture_blocks(dr) if snapshot else None
+
+        logger.info(f"Carrousels détectés : {car_total}")
+        par_http = matching_blocks(http_blocs, inventaire)   # blocs HTTP alignés sur la page
+        precedent  = {} if force else load_state(PAGE)
+        if inventory_only:
+            logger.info(f"Inventaire {URL} ({len(inventaire)} carrousels)")
+            logger.info("\n".join(change_report(inventaire, precedent)))
+            return
+
+        couverture = Coverage(PAGE, car_total, {b['idx']: b['titre'] for b in inventaire})
+        # Répartition par carrousel (comme les scrapers 1–3) : le nombre de tâches d'un carrousel
+        # dépend du DOM vu par chaque shard, une numérotation globale des tâches ne serait pas stable.
+        # Le budget de temps ne s'applique qu'à l'exécution des tâches.
+        for idx in range(1, car_total + 1):
+            bloc_inv = inventaire[idx - 1] if idx <= len(inventaire) else None
+            reprises = reusable_rows(precedent, bloc_inv) if bloc_inv else None
+            if reprises:
+                if in_shard(idx, shard):
+                    log(f"  Carrousel {idx} inchangé : {len(reprises)} lignes reprises")
+                    rows.extend(reprises)
+                    ordre += [[idx, k] for k in range(len(reprises))]
+                    couverture.mark(idx, "repris")
+                continue
+
+            if idx in par_http:   # lu par le moteur HTTP : aucune tâche navigateur
+                if in_shard(idx, shard):
+                    lues = par_http[idx].rows()
+                    log(f"  Carrousel {idx} lu en HTTP : {len(lues)} lignes")
+                    rows.extend(lues)
+                    ordre += [[idx, k] for k in range(len(lues))]
+                    couverture.mark(idx, "complet")
+                continue
+
+            if not in_shard(idx, shard):   # carrousel traité par un autre shard : aucune tâche
+                continue
+
+            bloc = find_block(dr, idx)
+            dr.execute_script("arguments[0].scrollIntoView({block:'center'});", bloc)
+            typ = "Grande" if bloc.find_elements(By.CSS_SELECTOR, 'swiper-slide') else "Petite"
+            titre = bloc.find_element(By.CSS_SELECTOR, '.block-title').text.strip() or f"Carrousel_{idx}"
+            
+            # Tâche pour "Voir plus"
+            with suppress(Exception):
+                link = selectors.find(f"{typ}:voir_plus", bloc, VOIR_PLUS_STRATEGIES)
+                if link and link.is_displayed():
+                    all_tasks.append({'type': 'voir_plus', 'idx': idx, 'typ_name': typ, 'titre': titre})
+
+            # Tâches pour les cartes
+            if "Grande" in typ:
+                for sl in bloc.find_elements(By.CSS_SELECTOR, "swiper-slide:not([class*='-duplicate'])"):
+                    with suppress(Exception):
+                        sid = int(sl.get_attribute('data-swiper-slide-index'))
+                        all_tasks.append({'type': 'grande_carte', 'idx': idx, 'typ_name': typ, 'titre': titre, 'sid': sid})
+            elif "Petite" in typ:
+                noms, vus = [], set()
+                for _ in range(50):
+                    last_len = len(vus)
+                    for s in bloc.find_elements(By.CSS_SELECTOR, 'app-slide'):
+                        with suppress(Exception):
+                            nm = s.find_element(By.CSS_SELECTOR, "h3 span[aria-hidden='true']").text.strip()
+                            if nm and nm not in vus: vus.add(nm); noms.append(nm)
+                    if len(vus) == last_len: break
+                    with suppress(Exception):
+                        nxt = bloc.find_element(By.CSS_SELECTOR, '.slick-next:not(.slick-disabled)')
+                        nxt.click(); settle(0.35, dr)
+                for nom in noms:
+                    all_tasks.append({'type': 'petite_carte', 'idx': idx, 'typ_name': typ, 'titre': titre, 'nom': nom})
+    finally:
+        if dr is not None:
+            log("Liste des tâches créée. Fermeture du premier navigateur.")
+            dr.quit()
+
+    # --- ÉTAPE 2: EXÉCUTER CHAQUE TÂCHE DANS UN NOUVEAU NAVIGATEUR ---
+    log(f"\nÉTAPE 2: Exécution de {len(all_tasks)} tâches une par une...")
+    store = ResolutionStore()  # résolutions partagées avec les autres scrapers du run
+    echecs = RetryQueue(PAGE)  # tâches en échec, rejouées en fin d'étape 2
+    for idx, b in par_http.items():
+        if in_shard(idx, shard):
+            for lab, url in b.cards:
+                store.put(lab, url, PAGE)
+    # Nouveaux / modifiés d'abord, puis ordre de la page (budget de temps du run)
+    rang = {k: n for n, k in enumerate(priority_order(range(1, car_total + 1), inventaire, precedent))}
+    taches, sautees = {}, {}   # par carrousel : tâches de ce shard / non lancées faute de temps
+    for i in sorted(range(len(all_tasks)), key=lambda i: (rang[all_tasks[i]['idx']], i)):
+        task = all_tasks[i]
+        taches[task['idx']] = taches.get(task['idx'], 0) + 1
+        if nearly_spent():   # budget du run presque épuisé : on exporte ce qui est collecté
+            sautees[task['idx']] = sautees.get(task['idx'], 0) + 1
+            couverture.cards_skipped += 1
+            couverture.stop()
+            continue
+        log(f"  Tâche {i+1}/{len(all_tasks)}: {task['type']} pour carrousel {task['idx']}")
+        n0 = len(rows)
+        # Carte déjà résolue par un autre scraper du run : pas de navigateur à lancer
+        deja = store.get(task['nom']) if task['type'] == 'petite_carte' else None
+        if deja:
+            rows.append(CardRow.make(task['idx'], task['typ_name'], task['titre'], None, task['nom'], deja))
+            ordre.append([task['idx'], i])
+            continue
+        try:
+            with log_context(carrousel=task['idx'], carte=task_label(task)):
+                rows += run_task(task, selectors, store)
+            ordre += [[task['idx'], i]] * (len(rows) - n0)
+        except Exception as e:   # reprise en fin de run, avec un navigateur neuf
+            logger.warning(f"ERREUR sur la tâche {i+1} : {describe(e)}", extra={"carrousel": task['idx'], "carte": task_label(task)})
+            echecs.add("carte", e, idx=task['idx'], titre=task['titre'], typ=task['typ_name'],
+                       label=task_label(task), ordre=i + 1)
+
+    # --- REPRISE DES TÂCHES EN ÉCHEC ---
+    def retry_task(_, f):
+        task = all_tasks[f.ordre - 1]
+        with log_context(carrousel=task['idx'], carte=task_label(task)):
+            got = run_task(task, selectors, store)
+        rows.extend(got)
+        ordre.extend([[task['idx'], f.ordre - 1]] * len(got))
+        return True
+    echecs.retry(retry_task, log=logger.info)   # run_task ouvre son propre navigateur
+    logger.info(f"Résolutions partagées : {store.hits} reprises, {store.misses} à cliquer")
+    store.close()
+    logger.info(selectors.summary())
+    selectors.save()
+    logger.info(timeouts.summary())
+    timeouts.save()
+    echouees = {}
+    for f in echecs.pending:
+        echouees[f.idx] = echouees.get(f.idx, 0) + 1
+    for idx, n in taches.items():
+        saut, echec = sautees.get(idx, 0), echouees.get(idx, 0)
+        couverture.mark(idx, "complet" if not saut + echec else "non visité" if saut == n
+                        else "en échec" if echec == n else "partiel")
+    # carrousels interrompus (budget) ou avec des échecs définitifs : lignes non mémorisées
+    a_refaire = couverture.incomplete | echecs.idxs()
+
+    # --- ÉTAPE 3: EXPORT ---
+    log("\nÉTAPE 3: Exportation des résultats...")
+    COLS = CARD_COLUMNS
+    # lignes reprises + recrawlées, dans l'ordre d'origine des carrousels et des tâches
+    paires = sorted(zip(ordre, rows), key=lambda kr: kr[0])
+    rows = [r for _, r in paires]
+    if shard:
+        part = write_shard(PAGE, f"carrousels_cards_url_{PAGE}", COLS, rows, [k for k, _ in paires], shard, inventaire,
+                           incomplete=a_refaire)
+        logger.info(f"Shard {shard[0]}/{shard[1]} enregistré : {part}")
+    else:
+        zip_f, membres = export_rows(rows, COLS, ROOT, f"carrousels_cards_url_{PAGE}")
+        write_history(PAGE, rows)
+        if blocs_html:   # ré-extraction possible sans navigateur (src/common/dom_snapshots.py)
+            logger.info(f"Instantané DOM enregistré : {write_snapshot(PAGE, URL, blocs_html, rows)}")
+        # recrawlés au prochain run plutôt que repris incomplets
+        save_state(PAGE, inventaire, [r for r in rows if r[0] not in a_refaire])
+        logger.info(f"Fichiers enregistrés : {zip_f} ({', '.join(membres)})")
+    logger.info(couverture.summary())
+    couverture.write(f".part-{shard[0]}-of-{shard[1]}" if shard else "")
+    logger.info(echecs.summary())
+    echecs.write(f".part-{shard[0]}-of-{shard[1]}" if shard else "")
+    logger.info(f"Durée totale : {(datetime.now()-start).seconds} sec")
+
+if __name__ == "__main__":
+    args = parse_scraper_args()
+    setup_logging(PAGE, args.log_level, scraper=PAGE)
+    with profiled(PAGE, args.profile):
+        run(inventory_only=args.inventory, force=args.force, shard=args.shard, engine=args.engine, snapshot=args.snapshot)
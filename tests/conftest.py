@@ -0,0 +1,14 @@
+# tests/conftest.py
+# ---------------------------------------------------------------------------
+# Tests sans Chrome ni réseau : faux WebDriver (src/common/fake_driver.py) et
+# serveurs locaux. Lancer depuis la racine du dépôt :
+#   pip install -r requirements-dev.txt
+#   python -m pytest -q
+# ---------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:   # « import src.… » aussi avec la commande pytest seule
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,31 @@
+# tests/test_adaptive_timeouts.py
+
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.common import adaptive_timeouts
+from src.common.adaptive_timeouts import AdaptiveTimeouts
+
+def _expire(t):
+    raise TimeoutException()
+
+def test_expiration_remonte_le_delai(tmp_path, monkeypatch):
+    monkeypatch.setattr(adaptive_timeouts, "ENABLED", True)
+    monkeypatch.setattr(adaptive_timeouts, "MIN_SAMPLES", 20)
+    path = tmp_path / "timeouts.json"
+    path.write_text(json.dumps({"page_jeunesse": {"retour": [1.0] * 40}, "page_acceuil": {"retour": [3.0]}}))
+    to = AdaptiveTimeouts("page_jeunesse", path)
+    assert to.get("retour", 10) == 2.0                     # appris : max(1.0 × 1.5, TIMEOUT_MIN_S)
+
+    with pytest.raises(TimeoutException):
+        to.wait("retour", 10, _expire)
+    assert to._samples["retour"][-1] == 10 * adaptive_timeouts.MAX_FACTOR
+    assert to.get("retour", 10) == 10                      # délai historique pour la suite du run
+
+    to.save()
+    data = json.loads(path.read_text())
+    assert data["page_acceuil"] == {"retour": [3.0]}      # autres pages intactes
+    assert data["page_jeunesse"]["retour"][-1] == 20
+    assert not path.with_name("timeouts.json.lock").exists()
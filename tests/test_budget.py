@@ -0,0 +1,20 @@
+# tests/test_budget.py
+
+from src.common.budget import Coverage, coverage_report
+
+def test_rapport_limite_au_run_en_cours(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "run-matin")
+    ancien = Coverage("page_acceuil", 3)
+    ancien.mark(1, "non visité")
+    ancien.write()
+    Coverage("page_jeunesse", 2).write(".part-1-of-2")
+
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "run-soir")
+    cov = Coverage("page_acceuil", 3)
+    for i in (1, 2, 3):
+        cov.finish(i)
+    cov.write()
+
+    assert coverage_report() == [cov.summary()]
+    assert len(coverage_report(run_id="run-matin")) == 1   # seul le shard du matin reste sur disque
@@ -0,0 +1,44 @@
+# tests/test_change_detection.py
+
+from src.common.change_detection import (change_report, fingerprint, load_state, number_occurrences,
+                                         reusable_rows, save_state)
+from src.common.records import CardRow
+
+def _inventory(*titres):
+    blocks = [{"idx": i, "titre": t, "type": "Petite", "labels": [f"{t} A", f"{t} B"], "voir_plus": ""}
+              for i, t in enumerate(titres, 1)]
+    for b in blocks:
+        b["fingerprint"] = fingerprint(b)
+    return number_occurrences(blocks)
+
+def _rows(idx, titre, suffixe):
+    return [list(CardRow.make(idx, "Petite", titre, n, f"{titre} {lab}", f"https://video.telequebec.tv/{suffixe}/{n}"))
+            for n, lab in enumerate("AB", 1)]
+
+def test_carrousels_identiques_repris_chacun(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # « Populaire » apparaît deux fois (même empreinte), avec des URL propres à chaque occurrence
+    avant = _inventory("Populaire", "Séries", "Populaire")
+    save_state("page", avant, _rows(1, "Populaire", "p1") + _rows(2, "Séries", "s") + _rows(3, "Populaire", "p2"))
+
+    # un nouveau carrousel en tête décale les positions
+    apres = _inventory("Nouveau", "Populaire", "Séries", "Populaire")
+    precedent = load_state("page")
+    assert reusable_rows(precedent, apres[0]) is None
+    assert [r.url for r in reusable_rows(precedent, apres[1])] == [f"https://video.telequebec.tv/p1/{n}" for n in (1, 2)]
+    assert [r.url for r in reusable_rows(precedent, apres[3])] == [f"https://video.telequebec.tv/p2/{n}" for n in (1, 2)]
+    assert {r.carrousel for r in reusable_rows(precedent, apres[3])} == {4}
+    assert [l.split("]")[0] for l in change_report(apres, precedent)] == [
+        "  1. [nouveau", "  2. [inchangé", "  3. [inchangé", "  4. [inchangé"]
+
+def test_carrousel_a_refaire_recrawle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    inventaire = _inventory("Populaire", "Séries", "Populaire")
+    rows = _rows(1, "Populaire", "p1") + _rows(2, "Séries", "s") + _rows(3, "Populaire", "p2")
+    a_refaire = {1}   # première occurrence interrompue : ses lignes ne sont pas mémorisées
+    save_state("page", inventaire, [r for r in rows if r[0] not in a_refaire])
+
+    precedent = load_state("page")
+    assert reusable_rows(precedent, inventaire[0]) is None
+    assert [r.url for r in reusable_rows(precedent, inventaire[2])] == [f"https://video.telequebec.tv/p2/{n}" for n in (1, 2)]
+    assert len(reusable_rows(precedent, inventaire[1])) == 2
@@ -0,0 +1,56 @@
+# tests/test_detail_enricher.py
+# Pages de détail servies par un serveur HTTP local minimal.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.common.detail_enricher import DETAIL_COLUMNS, DetailCache, enrich_urls, parse_detail
+
+SERIE = """<html><head>
+<script type="application/ld+json">%s</script>
+</head><body></body></html>""" % json.dumps({
+    "@type": "WebPage",
+    "mainEntity": {"@type": "TVSeries", "numberOfSeasons": "3", "episode": [{}, {}, {}, {}],
+                   "availabilityStarts": "2026-09-01T05:00:00Z", "availabilityEnds": "2027-08-31"}})
+FILM = '<html><head><meta property="og:type" content="video.movie"></head></html>'
+PAGES = {"/serie": SERIE, "/film": FILM}
+
+class _Pages(BaseHTTPRequestHandler):
+    def do_GET(self):
+        html = PAGES.get(self.path)
+        self.send_response(200 if html else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write((html or "absente").encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def site():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Pages)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+def test_parse_detail():
+    d = parse_detail("u", SERIE)
+    assert d.cells() == ["Série", 3, 4, "2026-09-01", "2027-08-31"]
+    assert parse_detail("u", FILM).cells() == ["Film", None, None, "", ""]
+
+def test_pages_illisibles_hors_colonnes(site, tmp_path):
+    urls = [f"{site}/serie", f"{site}/film", f"{site}/retiree", f"{site}/serie"]
+    with DetailCache(tmp_path / "details.sqlite") as cache:
+        details = enrich_urls(urls, cache, fixtures="")
+        assert len(details) == 3
+        assert details[f"{site}/serie"].cells()[:3] == ["Série", 3, 4]
+        absente = details[f"{site}/retiree"]
+        assert absente.error == "HTTP 404"
+        assert absente.cells() == ["", None, None, "", ""]
+        assert len(absente.cells()) == len(DETAIL_COLUMNS)
+        # seules les pages lues sont mises en cache
+        assert cache.get(f"{site}/film") is not None and cache.get(f"{site}/retiree") is None
@@ -0,0 +1,30 @@
+# tests/test_dom_snapshots.py
+# Aller-retour instantané DOM → ré-extraction sur le faux WebDriver.
+
+import importlib
+
+import pytest
+
+from src.common.dom_snapshots import capture_blocks, load_snapshot, reextract, write_snapshot
+from src.common.fake_driver import FakeDriver, run_scraper_on_fake, synthetic_page
+from src.common.records import CardRow
+from tests.test_fake_scrapers import SCRAPERS
+
+@pytest.mark.parametrize("module", SCRAPERS)
+def test_reextraction_retrouve_les_lignes(tmp_path, monkeypatch, module):
+    monkeypatch.chdir(tmp_path)
+    mod = importlib.import_module(module)
+    page = synthetic_page()
+    (_, lignes), = run_scraper_on_fake(module, {mod.URL: page}).exports.values()
+    # URL résolues par le run (après redirections) : différentes des href de la page
+    resolues = [CardRow.make(*r[:5], r.url.replace(".tv/", ".tv/resolu/")) for r in map(CardRow.from_row, lignes)]
+
+    dr = FakeDriver({mod.URL: page})
+    dr.get(mod.URL)
+    write_snapshot(mod.PAGE, mod.URL, capture_blocks(dr), resolues, date="2026-01-05")
+    assert load_snapshot(mod.PAGE)["date"] == "2026-01-05"
+
+    rows, bilan = reextract(mod.PAGE, write=False)
+    assert rows == resolues
+    assert bilan["orphelines"] == 0 and bilan["modifiees"] == 0
+    assert not (tmp_path / "output").joinpath("rapport_hebdomadaire_2026-01-05.zip").exists()
@@ -0,0 +1,46 @@
+# tests/test_export_utils.py
+
+import zipfile
+
+import pytest
+
+from src.common.export_utils import append_to_archive, export_rows, read_exports, replace_exports
+from src.common.records import CARD_COLUMNS, CardRow
+
+def test_relecture_garde_les_titres_numeriques(tmp_path):
+    rows = [CardRow.make(1, "Grande", "1917", None, "Voir plus", "https://video.telequebec.tv/categorie/1917"),
+            CardRow.make(1, "Grande", "1917", 2, "1917", "https://video.telequebec.tv/2024")]
+    zip_f, _ = export_rows(rows, CARD_COLUMNS, tmp_path, "carrousels_cards_url_test", date="2026-01-05")
+    (header, lus), = read_exports(zip_f).values()
+    assert lus == [[1, "Grande", "1917", "", "Voir plus", "https://video.telequebec.tv/categorie/1917", "categorie/1917"],
+                   [1, "Grande", "1917", 2, "1917", "https://video.telequebec.tv/2024", "2024"]]
+
+    # réécriture (enrichissement, vérification des liens) : types inchangés
+    replace_exports(zip_f, {"carrousels_cards_url_test_2026-01-05": (header, lus)})
+    assert read_exports(zip_f)["carrousels_cards_url_test_2026-01-05"][1] == lus
+
+def test_remplacement_echoue_garde_l_archive(tmp_path, monkeypatch):
+    zip_f = tmp_path / "rapport.zip"
+    append_to_archive(zip_f, {"a.csv": b"ancien a", "b.csv": b"ancien b"})
+
+    ecrire = zipfile.ZipFile.writestr
+    def writestr(self, info, data, *args, **kwargs):
+        if data == b"nouveau a":
+            raise OSError("disque plein")
+        return ecrire(self, info, data, *args, **kwargs)
+    monkeypatch.setattr(zipfile.ZipFile, "writestr", writestr)
+
+    # a.csv existe déjà : remplacement (réécriture complète) qui échoue en cours de route
+    with pytest.raises(OSError):
+        append_to_archive(zip_f, {"c.csv": b"nouveau c", "a.csv": b"nouveau a"})
+    with zipfile.ZipFile(zip_f) as zf:
+        assert zf.testzip() is None
+        assert {n: zf.read(n) for n in zf.namelist()} == {"a.csv": b"ancien a", "b.csv": b"ancien b"}
+    assert not zip_f.with_suffix(".zip.tmp").exists()
+    assert not (tmp_path / "rapport.zip.lock").exists()
+
+    monkeypatch.undo()
+    append_to_archive(zip_f, {"a.csv": b"nouveau a"})
+    with zipfile.ZipFile(zip_f) as zf:
+        assert sorted(zf.namelist()) == ["a.csv", "b.csv"]
+        assert zf.read("a.csv") == b"nouveau a"
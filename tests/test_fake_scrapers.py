@@ -0,0 +1,27 @@
+# tests/test_fake_scrapers.py
+# Chaque scraper tourne de bout en bout sur la page synthétique du faux WebDriver.
+
+import pytest
+
+from src.common.fake_driver import run_scraper_on_fake
+from src.common.records import CARD_COLUMNS
+
+SCRAPERS = [
+    "src.scrapers.1_page_acceuil_carrousels_card_voir_plus",
+    "src.scrapers.2_page_en_vedette_carrousels_card_voir_plus",
+    "src.scrapers.3_page_jeunesse_carrousels_card_voir_plus",
+    "src.scrapers.4_page_sur_demande_carrousels_card_voir_plus",
+]
+
+@pytest.mark.parametrize("module", SCRAPERS)
+def test_scraper_exporte_toutes_les_cartes(module):
+    res = run_scraper_on_fake(module)
+    # 6 carrousels de 12 cartes + un « Voir plus » chacun
+    assert res.rows == 6 * (12 + 1)
+    (header, rows), = res.exports.values()
+    assert header == CARD_COLUMNS
+    assert all(r[5].startswith("https://") for r in rows)
+
+@pytest.mark.parametrize("module", SCRAPERS[:2])
+def test_scraper_mode_onglets(module):
+    assert run_scraper_on_fake(module, tabs=4).rows == 6 * (12 + 1)
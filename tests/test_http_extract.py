@@ -0,0 +1,45 @@
+# tests/test_http_extract.py
+# Moteur HTTP contre le serveur local de fixtures (archive de trafic écrite par le test).
+
+import json
+
+from src.common import http_extract
+from src.common.traffic_archive import TrafficArchive, request_key
+
+SITE = "https://video.telequebec.tv"
+PAGE = {"blocks": [
+    {"title": "À la une", "items": [{"title": "Série A", "url": "/serie-a"},
+                                    {"title": "Série B", "link": {"url": f"{SITE}/serie-b"}}]},
+    {"title": "Nouveautés", "id": "b2"},
+    {"title": "Documentaires", "id": "b3"},
+    {"title": "Jeunesse", "id": "b4"},
+    {"title": "Partenaires", "items": [{"title": "Pub", "url": "https://ads.example.com/x"},
+                                       {"title": "Vide", "href": "javascript:void(0)"}]},
+]}
+BLOCKS = {
+    "b2": [1, 2],                                                    # tableau : autre forme de JSON
+    "b3": {"items": [{"title": "Doc", "path": "/documentaire"}]},
+    "b4": {"items": [{"title": "Jeu", "slug": "jeu"}]},             # slug nu, sans chemin
+}
+
+def _archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_extract, "PAGE_API", "https://api.test/pages?path={path}")
+    monkeypatch.setattr(http_extract, "BLOCK_API", "https://api.test/blocks/{id}")
+    archive = TrafficArchive("http_test")
+    headers = [["Content-Type", "application/json"]]
+    archive.add(request_key("GET", "https://api.test/pages?path=%2F"), 200, headers, json.dumps(PAGE).encode())
+    for bid, data in BLOCKS.items():
+        archive.add(request_key("GET", f"https://api.test/blocks/{bid}"), 200, headers, json.dumps(data).encode())
+
+def test_blocs_resolus_et_replis(tmp_path, monkeypatch):
+    _archive(tmp_path, monkeypatch)
+    blocks = http_extract.extract_page(f"{SITE}/", fixtures="http_test")
+
+    assert [b.titre for b in blocks] == ["À la une", "Nouveautés", "Documentaires", "Jeunesse", "Partenaires"]
+    une, nouveautes, docs, jeunesse, partenaires = blocks
+    assert une.resolved and une.cards == [("Série A", f"{SITE}/serie-a"), ("Série B", f"{SITE}/serie-b")]
+    assert docs.resolved and docs.cards == [("Doc", f"{SITE}/documentaire")]
+    assert not nouveautes.resolved and not nouveautes.cards
+    assert not jeunesse.resolved and jeunesse.cards == [("Jeu", "")]
+    assert not partenaires.resolved
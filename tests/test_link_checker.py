@@ -0,0 +1,60 @@
+# tests/test_link_checker.py
+# Validation contre un serveur HTTP local minimal.
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.common.link_checker import validate_urls
+
+class _Site(BaseHTTPRequestHandler):
+    def _reply(self, status):
+        self.server.hits.append((self.command, self.path, time.monotonic()))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._reply(405 if self.path == "/sans-head" else 200 if self.path.startswith("/ok") else 404)
+
+    def do_GET(self):
+        self._reply(200)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def site():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    srv.hits = []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_head_repli_get_et_erreur(site):
+    base = f"http://127.0.0.1:{site.server_address[1]}"
+    ferme = f"http://127.0.0.1:{_closed_port()}/x"
+    res = validate_urls([f"{base}/ok", f"{base}/sans-head", f"{base}/absente", ferme, "", "javascript:void(0)"],
+                        per_host_rps=0, timeout=5)
+
+    assert set(res) == {f"{base}/ok", f"{base}/sans-head", f"{base}/absente", ferme}
+    assert (res[f"{base}/ok"].status, res[f"{base}/sans-head"].status, res[f"{base}/absente"].status) == (200, 200, 404)
+    assert [c for c, p, _ in site.hits if p == "/sans-head"] == ["HEAD", "GET"]    # GET en repli
+    assert [c for c, p, _ in site.hits if p == "/ok"] == ["HEAD"]
+    assert res[ferme].status is None and res[ferme].error                           # ex. ClientConnectorError
+
+def test_debit_par_hote(site):
+    base = f"http://127.0.0.1:{site.server_address[1]}"
+    validate_urls([f"{base}/ok{i}" for i in range(6)], concurrency=6, per_host_rps=20, timeout=5)
+    t = sorted(ts for _, _, ts in site.hits)
+    assert len(t) == 6
+    assert min(b - a for a, b in zip(t, t[1:])) >= 0.04   # 1/20 s entre deux requêtes au même hôte
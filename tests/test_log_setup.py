@@ -0,0 +1,59 @@
+# tests/test_log_setup.py
+
+import io
+import json
+import logging
+
+import pytest
+
+from src.common.log_setup import log_context, relay, setup_logging
+
+@pytest.fixture
+def racine():
+    """Rend au logger racine ses handlers (ceux de pytest) après setup_logging."""
+    root = logging.getLogger()
+    avant, niveau = root.handlers[:], root.level
+    yield root
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+    root.handlers[:], root.level = avant, niveau
+
+def _events(path):
+    return [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+
+def test_file_et_relais_json(tmp_path, racine):
+    path = setup_logging("run", level="INFO", log_dir=tmp_path, json_console=False)
+    qh, = racine.handlers
+    with log_context(carrousel=3, carte="Les Appendices"):
+        logging.getLogger("run").info("carte résolue")
+    logging.getLogger("run").debug("ignoré (niveau INFO)")
+
+    # sortie JSON d'un scraper relayée ligne à ligne, plus une trace non JSON
+    sortie = io.StringIO(
+        json.dumps({"ts": "2026-01-05T08:00:00.000", "level": "WARNING", "logger": "page_acceuil",
+                    "msg": "délai dépassé", "carrousel": 2}) + "\n"
+        "\n"
+        "Traceback (most recent call last):\n"
+    )
+    relay(sortie, "page_acceuil", level=logging.ERROR)
+
+    qh.close()   # vide la file : tout est écrit dans le fichier
+    qh.close()   # logging.shutdown peut fermer une seconde fois
+    assert not qh.running
+
+    events = _events(path)
+    assert [(e["level"], e["msg"]) for e in events] == [
+        ("INFO", "carte résolue"), ("WARNING", "délai dépassé"), ("ERROR", "Traceback (most recent call last):")]
+    assert events[0]["carrousel"] == 3 and events[0]["carte"] == "Les Appendices"
+    assert events[1]["ts"] == "2026-01-05T08:00:00.000"
+    assert events[1]["scraper"] == events[2]["scraper"] == "page_acceuil"
+    assert events[1]["carrousel"] == 2
+
+def test_console_json_sans_fichier(tmp_path, racine, capsys):
+    assert setup_logging("page_acceuil", scraper="page_acceuil", log_dir=tmp_path, json_console=True) is None
+    logging.getLogger("x").warning("bloc absent")
+    racine.handlers[0].close()
+    d, = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert (d["level"], d["msg"], d["scraper"]) == ("WARNING", "bloc absent", "page_acceuil")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+# tests/test_mail_utils.py
+# Envoi contre un serveur SMTP local minimal (sans STARTTLS).
+
+import base64
+import email
+import smtplib
+import socketserver
+import threading
+
+import pytest
+
+from src.common.mail_utils import open_smtp, send_archive
+
+class _SmtpStub(socketserver.StreamRequestHandler):
+    """EHLO / AUTH / MAIL / RCPT / DATA / QUIT ; commandes et messages reçus dans self.server."""
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 stub")
+        while line := self.rfile.readline():
+            cmd = line.decode("ascii").strip()
+            verb = cmd.split()[0].upper()
+            self.server.commands.append(verb)
+            if verb == "EHLO":
+                self.reply("250-stub\r\n250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self.reply("235 ok")
+            elif verb == "DATA":
+                self.reply("354 go")
+                data = b""
+                while (l := self.rfile.readline()) != b".\r\n":
+                    data += l[1:] if l.startswith(b"..") else l
+                self.server.messages.append(data)
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+@pytest.fixture
+def smtp_stub():
+    srv = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpStub)
+    srv.commands, srv.messages = [], []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def test_sans_starttls_refuse_avant_login(smtp_stub):
+    with pytest.raises(smtplib.SMTPNotSupportedError):
+        open_smtp("127.0.0.1", smtp_stub.server_address[1], "apikey", "secret", timeout=5)
+    assert "AUTH" not in smtp_stub.commands
+
+@pytest.mark.parametrize("corps", ["Bonjour", "Bilan de couverture…\n" * 1500])
+def test_envoi_en_volumes(smtp_stub, tmp_path, corps):
+    archive = tmp_path / "rapport.zip"
+    contenu = bytes(range(256)) * 600   # 150 Ko, avec des « . » en début de ligne possibles
+    archive.write_bytes(contenu)
+    limite = 64 * 1024
+    server = open_smtp("127.0.0.1", smtp_stub.server_address[1], timeout=5, allow_plaintext=True)
+    try:
+        n = send_archive(server, "a@test", ["b@test"], [], "Rapport", corps, archive,
+                         max_message_bytes=limite, log=lambda *a: None)
+    finally:
+        server.quit()
+
+    # un long corps texte (~45 Ko encodés) réduit la place laissée à chaque volume
+    assert n == len(smtp_stub.messages) > 1
+    volumes = []
+    for raw in smtp_stub.messages:
+        assert len(raw) <= limite
+        msg = email.message_from_bytes(raw)
+        piece = [p for p in msg.walk() if p.get_filename()][0]
+        volumes.append(base64.b64decode(piece.get_payload()))
+    assert b"".join(volumes) == contenu
@@ -0,0 +1,23 @@
+# tests/test_page_loader.py
+
+import pytest
+
+from src.common.fake_driver import FakeDriver, synthetic_page
+from src.common.page_loader import load_all_blocks
+
+URL = "https://video.telequebec.tv/"
+
+def test_delai_de_script_retabli(monkeypatch):
+    dr = FakeDriver({URL: synthetic_page()})
+    dr.get(URL)
+    dr.set_script_timeout(7)
+    assert load_all_blocks(dr, max_ms=60_000) == 6
+    assert dr.timeouts.script == 7
+
+    def expire(*a):
+        assert dr.script_timeout == 70   # délai du chargement pendant le script
+        raise TimeoutError("script expiré")
+    monkeypatch.setattr(dr, "execute_async_script", expire)
+    with pytest.raises(TimeoutError):
+        load_all_blocks(dr, max_ms=60_000)
+    assert dr.timeouts.script == 7
@@ -0,0 +1,51 @@
+# tests/test_pipeline.py
+
+import threading
+import time
+
+from src.common.pipeline import ECHEC, OK, SAUTEE, Dag
+
+def test_dependances_et_sauts():
+    ordre = []
+    dag = Dag(workers=4, log=lambda *a: None)
+    a = dag.add("a", lambda: ordre.append("a"))
+    b = dag.add("b", lambda: False, after=[a])
+    dag.add("c", lambda: ordre.append("c"), after=[b])            # dépendance en échec : sautée
+    dag.add("d", lambda: ordre.append("d"), after=["c"])          # saut en cascade
+    dag.add("e", lambda: 1 / 0, after=[a])                        # exception : échec
+    dag.add("f", lambda: ordre.append("f"), wait=[b, "e"])        # attend seulement la fin
+    assert dag.run() == {"a": OK, "b": ECHEC, "c": SAUTEE, "d": SAUTEE, "e": ECHEC, "f": OK}
+    assert ordre == ["a", "f"]
+
+def test_ressource_une_etape_a_la_fois_dans_l_ordre():
+    en_cours, pic, ordre = [0], [0], []
+    verrou = threading.Lock()
+
+    def etape(nom):
+        def fn():
+            with verrou:
+                en_cours[0] += 1
+                pic[0] = max(pic[0], en_cours[0])
+                ordre.append(nom)
+            time.sleep(0.02)
+            with verrou:
+                en_cours[0] -= 1
+        return fn
+
+    dag = Dag(workers=4, log=lambda *a: None)
+    for n in ("s1", "s2", "s3"):
+        dag.add(n, etape(n), resource="navigateur")
+    post = dag.add("post", etape("post"), after=["s1"])
+    dag.run()
+    assert pic[0] == 2                                   # un scraper + un post-traitement au plus
+    assert [n for n in ordre if n != "post"] == ["s1", "s2", "s3"]
+    assert dag.stages[post].started >= dag.stages["s1"].ended
+
+def test_dependance_inconnue():
+    dag = Dag(log=lambda *a: None)
+    try:
+        dag.add("x", lambda: True, after=["absente"])
+    except ValueError as e:
+        assert "absente" in str(e)
+    else:
+        raise AssertionError("ValueError attendue")
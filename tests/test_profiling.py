@@ -0,0 +1,37 @@
+# tests/test_profiling.py
+
+import re
+import time
+
+import pytest
+
+from src.common.fake_driver import FakeDriver
+from src.common.profiling import profiled
+
+def _split(rapport: str) -> dict[str, float]:
+    return {cat: float(s) for cat, s in re.findall(r"(WebDriver HTTP|pauses|Python) ([\d.]+) s", rapport)}
+
+@pytest.mark.parametrize("mode, suffixes", [("sampling", {".collapsed", ".txt"}),
+                                            ("deterministic", {".collapsed", ".txt", ".prof"})])
+def test_pauses_et_webdriver_mesures(tmp_path, mode, suffixes):
+    dr = FakeDriver({}, latency=0.02)
+    with profiled("page_test", mode, tmp_path):
+        time.sleep(0.2)
+        for _ in range(5):
+            dr.get("about:blank")
+    assert time.sleep.__name__ == "sleep"   # time.sleep rétabli
+
+    fichiers = {f.suffix: f for f in tmp_path.iterdir()}
+    assert set(fichiers) == suffixes
+    assert all(f.stem.startswith("page_test_") for f in fichiers.values())
+    rapport = fichiers[".txt"].read_text(encoding="utf-8").splitlines()[0]
+    split = _split(rapport)
+    assert split["pauses"] >= 0.1 and split["WebDriver HTTP"] > 0
+    piles = fichiers[".collapsed"].read_text(encoding="utf-8").splitlines()
+    assert piles and all(re.fullmatch(r".+ \d+", p) for p in piles)
+    assert any("_pause (profiling.py" in p for p in piles)
+
+def test_sans_mode_aucun_fichier(tmp_path):
+    with profiled("page_test", None, tmp_path):
+        time.sleep(0.01)
+    assert not tmp_path.exists() or not any(tmp_path.iterdir())
@@ -0,0 +1,38 @@
+# tests/test_resolution_store.py
+
+from src.common.resolution_store import ResolutionStore, normalize_label
+
+def test_partage_entre_connexions(tmp_path):
+    db = tmp_path / "resolutions.sqlite"
+    with ResolutionStore(db, run_id="run-1") as accueil, ResolutionStore(db, run_id="run-1") as vedette:
+        accueil.put("Les Appendices – Saison 2", "https://video.telequebec.tv/appendices", "page_acceuil")
+        # même carte, autre écriture du libellé : résolue sans clic par le scraper suivant
+        assert vedette.get("les appendices saison 2") == "https://video.telequebec.tv/appendices"
+        # la première résolution est conservée
+        vedette.put("Les Appendices - Saison 2", "https://video.telequebec.tv/autre", "page_en_vedette")
+        assert accueil.get("Les Appendices – Saison 2") == "https://video.telequebec.tv/appendices"
+        assert vedette.get("Inconnue") is None
+        assert (vedette.hits, vedette.misses) == (1, 1)
+    with ResolutionStore(db, run_id="run-2") as autre_run:
+        assert autre_run.get("Les Appendices – Saison 2") is None
+
+def test_libelles_de_repli_jamais_partages(tmp_path):
+    assert normalize_label("Carte SID 3") == normalize_label("carte_3") == ""
+    with ResolutionStore(tmp_path / "r.sqlite", run_id="run-1") as store:
+        store.put("carte_3", "https://video.telequebec.tv/a")
+        store.put("Carte SID 3", "https://video.telequebec.tv/b")
+        assert store.get("carte_3") is None and store.get("Carte SID 3") is None
+        assert store.db.execute("SELECT COUNT(*) FROM resolutions").fetchone() == (0,)
+        # un vrai titre contenant « carte » reste une clé valide
+        store.put("Carte blanche 3", "https://video.telequebec.tv/carte-blanche")
+        assert store.get("carte blanche 3") == "https://video.telequebec.tv/carte-blanche"
+
+def test_purge_des_autres_runs(tmp_path):
+    db = tmp_path / "r.sqlite"
+    with ResolutionStore(db, run_id="2026-01-05_08-00-00") as ancien:
+        ancien.put("Découverte", "https://video.telequebec.tv/ancien")
+    with ResolutionStore(db, run_id="2026-01-12_08-00-00") as courant:
+        courant.put("Découverte", "https://video.telequebec.tv/courant")
+        courant.purge_other_runs()
+        assert courant.db.execute("SELECT run_id, url FROM resolutions").fetchall() == [
+            ("2026-01-12_08-00-00", "https://video.telequebec.tv/courant")]
@@ -0,0 +1,19 @@
+# tests/test_retry_queue.py
+
+from src.common.retry_queue import RetryQueue, failure_rows
+
+def test_echecs_limites_au_run_en_cours(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "run-matin")
+    ancien = RetryQueue("page_jeunesse")
+    ancien.add("carrousel", TimeoutError("expiré"), idx=2, titre="Dessins animés")
+    ancien.write()
+
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "run-soir")
+    q = RetryQueue("page_acceuil")
+    q.add("carte", ValueError("introuvable"), idx=1, titre="À la une", label="Carte 3", ordre=3)
+    q.write()
+
+    rows = failure_rows()
+    assert len(rows) == 1 and rows[0][0] == "page_acceuil"
+    assert [r[0] for r in failure_rows(run_id="run-matin")] == ["page_jeunesse"]
@@ -0,0 +1,60 @@
+# tests/test_run.py
+# Post-traitements de run.py sur une archive locale (lecture des pages et des liens simulée).
+
+import run
+from src.common.detail_enricher import DETAIL_COLUMNS, Detail
+from src.common.export_utils import export_rows, read_exports
+from src.common.link_checker import LinkStatus
+from src.common.records import CARD_COLUMNS, CardRow
+
+DATE = "2026-01-05"
+
+def _export(tmp_path, page="page_test", titre="À la une"):
+    rows = [CardRow.make(1, "Grande carrousel (swiper)", titre, n, f"Série {n}", f"https://video.telequebec.tv/{page}/{n}")
+            for n in (1, 2)]
+    zip_f, _ = export_rows(rows, CARD_COLUMNS, tmp_path, f"carrousels_cards_url_{page}", date=DATE)
+    return zip_f
+
+def _fake_network(monkeypatch):
+    monkeypatch.setattr(run, "validate_urls", lambda urls, **kw: {u: LinkStatus(u, 200, 12) for u in urls})
+    monkeypatch.setattr(run, "enrich_urls", lambda urls, cache: {u: Detail(u, "Série", 2) for u in urls})
+
+def test_enrichissement_et_liens_relances(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # cache des détails dans output/state/
+    _fake_network(monkeypatch)
+    zip_f = _export(tmp_path)
+    attendu = CARD_COLUMNS + DETAIL_COLUMNS + [run.STATUS_COL, run.LATENCY_COL]
+    for _ in range(2):            # run relancé : colonnes remplacées, jamais perdues
+        assert run.enrich_details(zip_f) and run.check_links(zip_f)
+        (cols, rows), = read_exports(zip_f).values()
+        assert cols == attendu
+        assert rows[0][len(CARD_COLUMNS):] == ["Série", "2", "", "", "", "200", "12"]
+
+def test_relance_du_jour_chaque_etape_traite_sa_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _fake_network(monkeypatch)
+    # archive du matin : les deux pages déjà enrichies et validées
+    zip_f = _export(tmp_path, "page_a")
+    _export(tmp_path, "page_b")
+    assert run.enrich_details(zip_f) and run.check_links(zip_f)
+
+    def scraper(page):
+        return lambda: bool(_export(tmp_path, page, titre="Relance"))   # export neuf, sans colonnes ajoutées
+
+    dag = run.Dag(workers=3, log=lambda *a: None)
+    for page in ("page_a", "page_b"):
+        fin = dag.add(f"scraper:{page}", scraper(page), resource="navigateur")
+        run.add_post_stages(dag, zip_f, fin, page, lambda page=page: {page})
+    assert set(dag.run().values()) == {"ok"}
+
+    attendu = CARD_COLUMNS + DETAIL_COLUMNS + [run.STATUS_COL, run.LATENCY_COL]
+    for cols, rows in read_exports(zip_f).values():
+        assert cols == attendu and rows[0][2] == "Relance"
+
+def test_validation_limitee_aux_pages_de_l_etape(tmp_path):
+    zip_f = _export(tmp_path, "page_a")
+    _export(tmp_path, "page_en_sur_demande")
+    bases = []
+    assert run.validate_exports(zip_f, {"page_en_sur_demande"}, bases)
+    assert bases == [f"carrousels_cards_url_page_en_sur_demande_{DATE}"]
+    assert run.validate_exports(zip_f, set(), bases) and len(bases) == 1   # aucune page relancée
@@ -0,0 +1,31 @@
+# tests/test_selector_registry.py
+
+import json
+import threading
+
+from src.common.selector_registry import SelectorRegistry
+
+STRATEGIES = {"a": lambda r: r.get("a"), "b": lambda r: r.get("b")}
+
+def test_find_apprend_l_ordre(tmp_path):
+    reg = SelectorRegistry("p", tmp_path / "selectors.json")
+    assert reg.find("Grande:voir_plus", {"b": "lien"}, STRATEGIES) == "lien"
+    assert reg.order("Grande:voir_plus", list(STRATEGIES)) == ["b", "a"]
+
+def test_first_garde_la_priorite(tmp_path):
+    reg = SelectorRegistry("p", tmp_path / "selectors.json")
+    assert reg.first({"b": "texte"}, STRATEGIES) == "texte"            # repli
+    assert reg.first({"a": "aria", "b": "texte"}, STRATEGIES) == "aria"  # priorité inchangée
+    assert reg.stats["repli"] == 1 and reg.stats["premier essai"] == 1
+
+def test_sauvegardes_paralleles(tmp_path):
+    path = tmp_path / "selectors.json"
+    regs = [SelectorRegistry(f"page{i}", path) for i in range(8)]
+    for i, reg in enumerate(regs):
+        reg.find(f"s{i}", {"b": 1}, STRATEGIES)
+    threads = [threading.Thread(target=reg.save) for reg in regs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(json.loads(path.read_text(encoding="utf-8"))) == [f"page{i}" for i in range(8)]
@@ -0,0 +1,137 @@
+# tests/test_selenium_setup.py
+# ManagedDriver sans Chrome : webdriver.Chrome est remplacé par un bouchon ou par le faux WebDriver lxml.
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from src.common import selenium_setup
+from src.common.fake_driver import FakeDriver, synthetic_page
+
+class _Chrome:
+    cdp_ok = True
+
+    def __init__(self, options=None):
+        self.execute = lambda command, params=None: {}
+
+    def execute_cdp_cmd(self, cmd, params):
+        if not self.cdp_ok:
+            raise RuntimeError("CDP indisponible")
+        return {}
+
+@pytest.fixture
+def chrome(monkeypatch):
+    monkeypatch.setattr(selenium_setup.webdriver, "Chrome", _Chrome)
+    monkeypatch.setattr(selenium_setup, "NO_ANIMATIONS", True)
+    return _Chrome
+
+@pytest.mark.parametrize("cdp_ok, pause", [(True, selenium_setup.SETTLE_NO_ANIM), (False, 0.3)])
+def test_pause_raccourcie_seulement_si_injection_reussie(chrome, monkeypatch, cdp_ok, pause):
+    monkeypatch.setattr(chrome, "cdp_ok", cdp_ok)
+    dr = selenium_setup.ManagedDriver("test")
+    assert dr.animations_off is cdp_ok
+    slept = []
+    monkeypatch.setattr(selenium_setup, "time", SimpleNamespace(sleep=slept.append))
+    selenium_setup.settle(0.3, dr)
+    selenium_setup.settle(0.3)   # sans navigateur connu : pause complète
+    assert slept == [pause, 0.3]
+
+class _PoolDriver:
+    """ManagedDriver minimal ; le lancement échoue tant que `fail` est vrai."""
+    fail = False
+
+    def __init__(self, label=None):
+        if _PoolDriver.fail:
+            raise RuntimeError("Chrome introuvable")
+        self.label, self.current_url = label, "about:blank"
+
+    def quit(self):
+        pass
+
+def test_pool_garde_la_place_si_le_lancement_echoue(monkeypatch):
+    monkeypatch.setattr(selenium_setup, "ManagedDriver", _PoolDriver)
+    monkeypatch.setattr(_PoolDriver, "fail", True)
+    pool = selenium_setup.DriverPool(1)
+    pool.start()
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=1)                   # relance ratée : la place est rendue
+
+    _PoolDriver.fail = False
+    dr = pool.acquire(timeout=1)
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)                # seul navigateur emprunté
+
+    _PoolDriver.fail = True
+    pool.release(dr)                              # remise à zéro impossible, relance ratée
+    _PoolDriver.fail = False
+    assert isinstance(pool.acquire(timeout=1), _PoolDriver)
+
+URL = "https://video.telequebec.tv/"
+
+class _FakeChrome(FakeDriver):
+    """webdriver.Chrome simulé par le faux WebDriver lxml, avec un processus et un tas JS mesurables."""
+    heap = 50 * 2**20
+
+    def __init__(self, options=None):
+        super().__init__({URL: synthetic_page(cards=4)})
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+        self.quitted = False
+
+    def execute_script(self, js, *args):
+        if "performance.memory" in js:
+            self._cmd("executeScript")
+            return self.heap
+        return super().execute_script(js, *args)
+
+    def quit(self):
+        super().quit()
+        self.quitted = True
+
+@pytest.fixture
+def fake_chrome(monkeypatch, tmp_path):
+    monkeypatch.setattr(selenium_setup.webdriver, "Chrome", _FakeChrome)
+    monkeypatch.setattr(selenium_setup, "NO_ANIMATIONS", False)
+    monkeypatch.setattr(selenium_setup, "TELEMETRY_DIR", tmp_path)
+    monkeypatch.setattr(selenium_setup, "SAMPLE_SECONDS", 0)
+    monkeypatch.setattr(selenium_setup, "MAX_COMMANDS", 10)
+    monkeypatch.setattr(selenium_setup, "MAX_RSS_MB", 0)
+    monkeypatch.setattr(selenium_setup, "MAX_HEAP_MB", 0)
+    return tmp_path
+
+def test_commandes_comptees_et_recyclage(fake_chrome):
+    avant = selenium_setup._STATS["commands"]
+    dr = selenium_setup.ManagedDriver("test")
+    dr.get(URL)
+    cartes = dr.find_elements(By.CSS_SELECTOR, "app-page-block h3")
+    assert all(c.text for c in cartes[:3])   # commandes des WebElement comprises
+    assert dr._commands == 1 + 1 + 3
+    assert selenium_setup._STATS["commands"] - avant == 5
+    assert dr.recycle_reason() is None
+
+    premier = dr._dr
+    while dr._commands < 10:
+        dr.find_elements(By.TAG_NAME, "h2")
+    assert dr.recycle_reason() == "10 commandes"
+    dr.get(URL)                               # point sûr : recyclage avant le chargement
+    assert premier.quitted and dr._dr is not premier
+    assert dr.recycles == 1
+    assert dr._commands == 1                  # compteur du nouveau navigateur
+    assert dr.find_elements(By.CSS_SELECTOR, "app-page-block")   # page rechargée
+
+def test_echantillons_memoire(fake_chrome, monkeypatch):
+    monkeypatch.setattr(selenium_setup, "SAMPLE_SECONDS", 1e-9)   # un relevé après chaque commande
+    monkeypatch.setattr(selenium_setup, "MAX_COMMANDS", 0)
+    monkeypatch.setattr(selenium_setup, "MAX_HEAP_MB", 40)
+    dr = selenium_setup.ManagedDriver("test")
+    dr.get(URL)
+    assert dr.last_heap_mb == 50.0 and dr.last_rss_mb > 0
+    assert dr._commands == 2                  # get + relevé du tas (le relevé ne se relance pas lui-même)
+    assert dr.recycle_reason() == "tas JS 50.0 Mo"
+
+    dr.get(URL)
+    assert dr.recycles == 1
+    releves = [json.loads(l) for f in fake_chrome.glob("memory_test_*.jsonl") for l in f.read_text().splitlines()]
+    assert releves and all(r["label"] == "test" and r["heap_mb"] == 50.0 for r in releves)
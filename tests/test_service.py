@@ -0,0 +1,54 @@
+# tests/test_service.py
+
+import json
+import logging
+import threading
+import time
+
+from src.common.service import _ClientHandler
+
+class _SlowClient:
+    """wfile d'un client qui lit lentement."""
+
+    def __init__(self, delay: float):
+        self.delay, self.lines = delay, []
+
+    def write(self, data: bytes):
+        time.sleep(self.delay)
+        self.lines.append(json.loads(data))
+
+    def flush(self):
+        pass
+
+def test_evenements_envoyes_hors_du_thread_du_scraper():
+    client = _SlowClient(0.05)
+    handler = _ClientHandler(client)
+    log = logging.getLogger("test_service")
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    try:
+        t0 = time.perf_counter()
+        for i in range(10):
+            log.info(f"carte {i}")
+        assert time.perf_counter() - t0 < 0.25      # 10 × 50 ms si l'écriture était synchrone
+        autre = threading.Thread(target=log.info, args=("autre demande",))   # autre thread : filtré
+        autre.start()
+        autre.join()
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    assert [d["msg"] for d in client.lines] == [f"carte {i}" for i in range(10)]
+
+def test_file_pleine_evenements_perdus():
+    client = _SlowClient(0.2)
+    handler = _ClientHandler(client, maxsize=2)
+    log = logging.getLogger("test_service_plein")
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    try:
+        for i in range(10):
+            log.info(f"carte {i}")
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    assert handler.dropped > 0 and len(client.lines) + handler.dropped == 10
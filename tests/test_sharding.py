@@ -0,0 +1,77 @@
+# tests/test_sharding.py
+
+from collections import Counter
+
+from src.common.export_utils import archive_path, read_exports
+from src.common.fake_driver import run_scraper_on_fake
+from src.common.history import read_rows
+from src.common.records import CARD_COLUMNS, CardRow
+from src.common.sharding import merge_shards, write_shard
+
+DATE = "2026-01-05"
+INVENTAIRE = [{"idx": 1, "titre": "1917", "fingerprint": "a"}, {"idx": 2, "titre": "Bloc 2", "fingerprint": "b"}]
+
+def test_fusion_avec_titre_numerique(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    par_shard = {
+        1: [CardRow.make(1, "Grande", "1917", 1, "1917", "https://video.telequebec.tv/1917")],
+        2: [CardRow.make(2, "Petite", "Bloc 2", 1, "2001", "https://video.telequebec.tv/emission/2001")],
+    }
+    for i, rows in par_shard.items():
+        write_shard("page_test", "carrousels_cards_url_page_test", CARD_COLUMNS, rows,
+                    [[r.carrousel, n] for n, r in enumerate(rows)], (i, 2), INVENTAIRE, date=DATE)
+
+    assert merge_shards("output", DATE, log=lambda *a: None)
+
+    (_, lus), = read_exports(archive_path("output", DATE)).values()
+    assert [r[4] for r in lus] == ["1917", "2001"]
+    assert [r.carte for r in read_rows("page_test", DATE)] == ["1917", "2001"]
+
+def test_from_row_garde_le_texte():
+    r = CardRow.from_row([3, "Grande", 1917, "", 2001, "https://video.telequebec.tv/x", "x"])
+    assert (r.titre, r.ordre, r.carte) == ("1917", None, "2001")
+
+def _shards(n, run_id, monkeypatch, only=None):
+    monkeypatch.setenv("COLLECTOR_RUN_ID", run_id)
+    rows = [CardRow.make(k, "Petite", f"Bloc {k}", 1, f"Carte {k}", f"https://video.telequebec.tv/c/{k}")
+            for k in (1, 2)]
+    inventaire = [{"idx": k, "titre": f"Bloc {k}", "fingerprint": str(k)} for k in (1, 2)]
+    for i in only or range(1, n + 1):
+        mine = [r for r in rows if (r.carrousel - 1) % n == i - 1]
+        write_shard("page_test", "carrousels_cards_url_page_test", CARD_COLUMNS, mine,
+                    [[r.carrousel, 0] for r in mine], (i, n), inventaire, date=DATE)
+
+def test_tentative_precedente_ignoree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _shards(3, DATE, monkeypatch, only=[1])   # tentative abandonnée en 3 shards
+    _shards(2, DATE, monkeypatch)
+    assert merge_shards("output", DATE, log=lambda *a: None)
+    (_, lus), = read_exports(archive_path("output", DATE)).values()
+    assert [r[4] for r in lus] == ["Carte 1", "Carte 2"]   # pas de doublon
+    assert not list((tmp_path / "output" / "shards" / DATE).glob("*.json"))
+
+def test_deux_jeux_complets_refuses(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _shards(1, DATE, monkeypatch)
+    _shards(2, DATE, monkeypatch)
+    assert not merge_shards("output", DATE, log=lambda *a: None)
+
+def test_runs_differents_refuses(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _shards(2, "run-a", monkeypatch, only=[1])
+    _shards(2, "run-b", monkeypatch, only=[2])
+    assert not merge_shards("output", DATE, log=lambda *a: None)
+
+def test_scraper_4_shards_sur_des_pages_differentes(tmp_path, monkeypatch):
+    """Chaque shard voit un nombre de cartes différent : chaque carrousel reste traité par un seul shard."""
+    module = "src.scrapers.4_page_sur_demande_carrousels_card_voir_plus"
+    for i, cards in ((1, 12), (2, 11)):
+        run_scraper_on_fake(module, shard=(i, 2), workdir=tmp_path, run_id="run-shards", cards=cards)
+    monkeypatch.chdir(tmp_path)
+    assert merge_shards("output", log=lambda *a: None)
+
+    (_, rows), = read_exports(archive_path("output")).values()
+    par_carrousel = Counter(r[0] for r in rows)
+    # carrousels impairs : shard 1 (12 cartes + Voir plus), pairs : shard 2 (11 + Voir plus)
+    assert par_carrousel == {k: 13 if k % 2 else 12 for k in range(1, 7)}
+    assert len({(r[0], r[4]) for r in rows}) == len(rows)   # aucune carte en double
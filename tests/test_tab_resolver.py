@@ -0,0 +1,81 @@
+# tests/test_tab_resolver.py
+# Clic qui navigue dans l'onglet courant : le lot s'arrête, sans réutiliser d'éléments périmés.
+
+from types import SimpleNamespace
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from src.common import tab_resolver
+
+HOME = "https://ici.tou.tv/"
+
+class _Driver:
+    def __init__(self):
+        self.current_url = HOME
+        self.current_window_handle = "liste"
+        self.window_handles = ["liste"]
+        self.switch_to = SimpleNamespace(window=lambda h: None)
+        self.loads = 0                       # rechargements de la liste
+        self.clicks = []
+
+    def execute_script(self, script, el=None):
+        if "click" in script:
+            el.check()
+            self.clicks.append(el.href)
+            self.current_url = el.href       # lien intercepté : pas de nouvel onglet
+
+    def back(self):
+        self.current_url = HOME
+        self.loads += 1
+
+class _Element:
+    def __init__(self, dr, **kw):
+        self.dr, self.load, self.tag_name = dr, dr.loads, "a"
+        self.__dict__.update(kw)
+
+    def check(self):
+        if self.dr.loads != self.load:
+            raise StaleElementReferenceException("élément périmé")
+
+class _Slide(_Element):
+    def find_element(self, by, css):
+        self.check()
+        return SimpleNamespace(text=self.nom)
+
+    def find_elements(self, by, css):
+        self.check()
+        return [self.link]
+
+class _Bloc(_Element):
+    def find_elements(self, by, css):
+        self.check()
+        return self.slides
+
+    def find_element(self, by, css):
+        self.arrows += 1
+        self.check()
+        return SimpleNamespace(get_attribute=lambda a: "", click=lambda: None)
+
+class _NoTab:
+    def __init__(self, *a, **kw):
+        pass
+
+    def until(self, cond):
+        raise TimeoutException()
+
+def test_navigation_en_place_arrete_le_lot(monkeypatch):
+    monkeypatch.setattr(tab_resolver, "WebDriverWait", _NoTab)
+    monkeypatch.setattr(tab_resolver, "settle", lambda s, dr=None: None)
+    dr = _Driver()
+    slides = []
+    for i in (1, 2, 3):
+        s = _Slide(dr, nom=f"Émission {i}", tag_name="app-slide")
+        s.link = _Element(dr, href=f"{HOME}emission-{i}")
+        slides.append(s)
+    bloc = _Bloc(dr, slides=slides, arrows=0)
+
+    found = tab_resolver.resolve_block(dr, bloc, {s.nom: None for s in slides}, size=4)
+
+    assert found == {}
+    assert dr.clicks == [f"{HOME}emission-1"] and dr.loads == 1
+    assert bloc.arrows == 0 and dr.current_url == HOME
@@ -0,0 +1,48 @@
+# tests/test_traffic_archive.py
+# Enregistrement d'une réponse avec une session CDP factice (sans Chrome).
+
+from types import SimpleNamespace
+
+import pytest
+import trio
+
+from src.common.traffic_archive import TrafficArchive, TrafficInterceptor
+
+DT = SimpleNamespace(fetch=SimpleNamespace(get_response_body=lambda rid: ("body", rid),
+                                           continue_request=lambda rid: ("continue", rid)))
+
+class _Session:
+    def __init__(self, body):
+        self.body, self.sent = body, []
+
+    async def execute(self, cmd):
+        self.sent.append(cmd[0])
+        if cmd[0] == "body":
+            if isinstance(self.body, Exception):
+                raise self.body
+            return self.body, False
+
+def _record(tmp_path, monkeypatch, body, status=200):
+    monkeypatch.chdir(tmp_path)
+    archive = TrafficArchive("test", fresh=True)
+    inter = TrafficInterceptor(None, archive, "record")
+    ev = SimpleNamespace(response_status_code=status, response_headers=[], request_id="r1")
+    session = _Session(body)
+    trio.run(inter._record, session, DT, ev, "GET https://video.telequebec.tv/api")
+    assert session.sent[-1] == "continue"   # la requête n'est jamais laissée en pause
+    return inter, archive
+
+def test_reponse_enregistree(tmp_path, monkeypatch):
+    inter, archive = _record(tmp_path, monkeypatch, '{"ok": 1}')
+    assert inter.recorded == 1
+    assert archive.lookup("GET https://video.telequebec.tv/api") == (200, [], b'{"ok": 1}')
+
+def test_corps_illisible_non_archive(tmp_path, monkeypatch):
+    inter, archive = _record(tmp_path, monkeypatch, RuntimeError("No resource with given identifier"))
+    assert (inter.recorded, inter.unreadable) == (0, 1)
+    assert archive.lookup("GET https://video.telequebec.tv/api") is None   # rejeu : requête absente
+
+@pytest.mark.parametrize("status", [204, 302])
+def test_sans_corps_archive_vide(tmp_path, monkeypatch, status):
+    inter, archive = _record(tmp_path, monkeypatch, RuntimeError("pas de corps"), status)
+    assert archive.lookup("GET https://video.telequebec.tv/api") == (status, [], b"")
@@ -0,0 +1,57 @@
+# tests/test_week_diff.py
+
+from src.common.budget import Coverage, unfinished_titles
+from src.common.records import CardRow
+from src.common.retry_queue import RetryQueue, failed_titles
+from src.common.week_diff import diff_page
+
+GRANDE = "Grande carrousel (swiper)"
+
+def _rows(*carrousels):
+    return [CardRow.make(idx, GRANDE, titre, n, f"{titre} {n}", f"https://video.telequebec.tv/{idx}/{n}")
+            for idx, titre, cartes in carrousels for n in range(1, cartes + 1)]
+
+def test_carrousels_inacheves_non_retires(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cov = Coverage("page_acceuil", 4, {1: "À la une", 2: "Nouveautés", 3: "Séries", 4: "Films"})
+    cov.finish(1)
+    cov.mark(2, "partiel")
+    cov.mark(3, "non visité")
+    cov.finish(4)
+    cov.write()
+    echecs = RetryQueue("page_acceuil")
+    echecs.add("carte", TimeoutError("expiré"), idx=4, titre="Films", label="Films 2", ordre=2)
+    echecs.write()
+    unverified = unfinished_titles("page_acceuil") | failed_titles("page_acceuil")
+    assert unverified == {"Nouveautés", "Séries", "Films"}
+
+    old = _rows((1, "À la une", 3), (2, "Nouveautés", 3), (3, "Séries", 2), (4, "Films", 2), (5, "Archives", 1))
+    new = _rows((1, "À la une", 2), (2, "Nouveautés", 1), (4, "Films", 1))
+    kinds = {(c[1], c[2]) for c in diff_page("page_acceuil", old, new, unverified)}
+
+    assert kinds == {("carte retirée", "À la une"), ("carrousel retiré", "Archives"),
+                     ("carrousel non vérifié", "Nouveautés"), ("carrousel non vérifié", "Séries"),
+                     ("carrousel non vérifié", "Films")}
+
+def test_titres_non_verifies_du_run_en_cours(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # run précédent du même jour (page entière), puis run en cours (un shard)
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "2026-01-05_08-00-00")
+    cov = Coverage("page_acceuil", 2, {1: "Séries", 2: "Films"})
+    cov.mark(1, "partiel")
+    cov.write()
+    echecs = RetryQueue("page_acceuil")
+    echecs.add("carrousel", TimeoutError("expiré"), idx=2, titre="Films")
+    echecs.write()
+
+    monkeypatch.setenv("COLLECTOR_RUN_ID", "2026-01-05_14-00-00")
+    cov = Coverage("page_acceuil", 2, {1: "Séries", 2: "Films"})
+    cov.finish(1)
+    cov.mark(2, "non visité")
+    cov.write(".part-1")
+    RetryQueue("page_acceuil").write(".part-1")
+
+    assert unfinished_titles("page_acceuil") == {"Films"}
+    assert failed_titles("page_acceuil") == set()
+    assert unfinished_titles("page_acceuil", run_id="2026-01-05_08-00-00") == {"Séries"}
+    assert failed_titles("page_acceuil", run_id="2026-01-05_08-00-00") == {"Films"}